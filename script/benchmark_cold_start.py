@@ -0,0 +1,138 @@
+"""Benchmark: API cold start, measured as time until ``GET /`` returns 200.
+
+Starts the server the way Electron does and polls it until it answers, then
+stops it. By default it runs the source tree (``python main.py``). With
+--binary it runs a PyInstaller build instead (``dist/seta_api_server/...``):
+
+    python script/benchmark_cold_start.py
+    python script/benchmark_cold_start.py --binary seta-api/dist/seta_api_server/seta_api_server
+    python script/benchmark_cold_start.py --runs 10 --report
+
+--report also times the first PDF export, which pays for the report
+libraries that are no longer imported at start-up.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import date
+
+from benchmark_common import APP_DIR
+
+PORT = 8765
+RUNS = 5
+TIMEOUT = 120.0
+POLL_INTERVAL = 0.02
+
+
+def wait_for_200(url, process, timeout=TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(POLL_INTERVAL)
+    raise TimeoutError(f"No 200 from {url} within {timeout} s")
+
+
+def seed_user(data_dir):
+    """Creates the local database with one user and expense; returns the user id."""
+    sys.path.insert(0, str(APP_DIR))
+    import models
+    import passwords
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    engine = create_engine(f"sqlite:///{data_dir}/seta_local.db")
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        user = models.User(
+            username="cold",
+            email="cold@example.com",
+            password_hash=passwords.hash_password("Benchmark123."),
+            first_name="Cold",
+            last_name="Start",
+            contact_number="0",
+            is_active=True,
+            email_verified=True,
+        )
+        db.add(user)
+        db.flush()
+        db.add(
+            models.Expense(
+                user_id=user.id,
+                amount=12.5,
+                date=date(2024, 1, 2),
+                category_name="Food",
+            )
+        )
+        db.commit()
+        user_id = user.id
+    engine.dispose()
+    return user_id
+
+
+def cold_start(command, cwd, report):
+    data_dir = tempfile.mkdtemp(prefix="seta_cold_")
+    user_id = seed_user(data_dir) if report else None
+    env = {**os.environ, "SETA_USER_DATA_PATH": data_dir, "SETA_API_PORT": str(PORT)}
+    base_url = f"http://127.0.0.1:{PORT}"
+    began = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_200(f"{base_url}/", process)
+        ready = time.perf_counter() - began
+        if not report:
+            return ready, None
+        began = time.perf_counter()
+        with urllib.request.urlopen(
+            f"{base_url}/expenses/{user_id}/report?format=pdf", timeout=TIMEOUT
+        ) as response:
+            response.read()
+        return ready, time.perf_counter() - began
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--binary", help="PyInstaller-built seta_api_server")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--report", action="store_true", help="Time a first PDF too")
+    args = parser.parse_args()
+
+    if args.binary:
+        command, cwd, label = [os.path.abspath(args.binary)], None, args.binary
+    else:
+        command, cwd, label = [sys.executable, "main.py"], APP_DIR, "source"
+    results = [cold_start(command, cwd, args.report) for _ in range(args.runs)]
+    ready = [seconds for seconds, _ in results]
+    print(
+        f"{label}: first 200 after {statistics.median(ready):.3f} s median "
+        f"(min {min(ready):.3f}, max {max(ready):.3f}, {args.runs} runs)"
+    )
+    if args.report:
+        reports = [seconds for _, seconds in results]
+        print(f"first PDF report: {statistics.median(reports):.3f} s median")
+
+
+if __name__ == "__main__":
+    main()
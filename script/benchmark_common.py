@@ -0,0 +1,98 @@
+"""Shared setup for the in-process benchmarks in this directory.
+
+Points the API at a throw-away user-data directory *before* importing it, so
+benchmarks never touch the real ``seta_local.db``.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+APP_DIR = REPO_ROOT / "seta-api" / "app"
+SAMPLE_DATA_DIR = REPO_ROOT / "sample_data"
+# Columns of each data type in the custom reports
+REPORT_COLUMNS = {
+    "expenses": ["date", "category_name", "amount", "description", "created_at"],
+    "income": ["date", "source", "amount", "description", "account_id"],
+    "recurring_expenses": ["name", "category_name", "amount", "frequency"],
+    "budgets": ["category_name", "amount_limit", "period", "start_date"],
+    "goals": ["name", "target_amount", "current_amount", "target_date"],
+    "accounts": ["name", "account_type", "starting_balance", "currency"],
+}
+
+
+def load_app(data_dir=None):
+    """Imports ``main`` against a temporary data directory and returns it."""
+    if data_dir is None:
+        data_dir = tempfile.mkdtemp(prefix="seta_bench_")
+    os.environ["SETA_USER_DATA_PATH"] = str(data_dir)
+    sys.path.insert(0, str(APP_DIR))
+    os.chdir(APP_DIR)
+    import main  # noqa: E402
+
+    return main
+
+
+def create_user(main, username="bench"):
+    """Creates a verified user directly through the sync session."""
+    import models
+    import passwords
+
+    with main.SessionLocal() as db:
+        user = models.User(
+            username=username,
+            email=f"{username}@example.com",
+            password_hash=passwords.hash_password("Benchmark123."),
+            first_name="Bench",
+            last_name="Mark",
+            contact_number="0",
+            is_active=True,
+            email_verified=True,
+        )
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+def restore_sample(client, user_id, sample_file):
+    """Restores a ``sample_data`` backup into ``user_id`` via /import/all."""
+    path = SAMPLE_DATA_DIR / sample_file
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        response = client.post(
+            f"/import/all/{user_id}",
+            files={"file": (path.name, f, "application/json")},
+        )
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def shutdown(main):
+    """Closes pooled connections so aiosqlite worker threads let Python exit."""
+    import asyncio
+
+    asyncio.run(main.async_engine.dispose())
+    main.engine.dispose()
+
+
+def percentile(samples, pct):
+    """The ``pct``-th (0-100) percentile of ``samples``, nearest rank; NaN if empty."""
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def format_for_output(value):
+    """Formats a value as the report endpoints did before streaming output."""
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d")
+    if value is None:
+        return ""
+    if hasattr(value, "value"):
+        return str(value.value)
+    return str(value)
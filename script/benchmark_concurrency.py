@@ -0,0 +1,94 @@
+"""Load benchmark: latency of light requests while heavy report requests run.
+
+Start the API (``uvicorn app.main:app --port 8000`` from ``seta-api``) against a
+database that already holds a large user (e.g. one restored from
+``sample_data/20000_sample_data.json``), then run:
+
+    python script/benchmark_concurrency.py --user-id 1
+
+Run it once on the old (sync-session) build and once on the current build and
+compare the p99 of the light requests: with a blocking DB session every light
+request queues behind the heavy ones on the event loop.
+"""
+
+import argparse
+import concurrent.futures
+import statistics
+import threading
+import time
+
+import requests
+
+from benchmark_common import percentile
+
+# --- Configuration ---
+BASE_URL = "http://localhost:8000"
+HEAVY_WORKERS = 4
+LIGHT_WORKERS = 8
+DURATION_SECONDS = 20
+# --- End Configuration ---
+
+
+def hammer(url, stop_event, latencies, errors):
+    session = requests.Session()
+    while not stop_event.is_set():
+        start = time.perf_counter()
+        try:
+            response = session.get(url, timeout=120)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+        except requests.RequestException as e:
+            errors.append(str(e))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def report(label, latencies, errors, duration):
+    print(f"\n{label}: {len(latencies)} requests, {len(errors)} errors")
+    if latencies:
+        print(f"  throughput : {len(latencies) / duration:8.1f} req/s")
+        print(f"  p50        : {percentile(latencies, 50):8.1f} ms")
+        print(f"  p95        : {percentile(latencies, 95):8.1f} ms")
+        print(f"  p99        : {percentile(latencies, 99):8.1f} ms")
+        print(f"  mean       : {statistics.mean(latencies):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--duration", type=float, default=DURATION_SECONDS)
+    parser.add_argument("--heavy", type=int, default=HEAVY_WORKERS)
+    parser.add_argument("--light", type=int, default=LIGHT_WORKERS)
+    args = parser.parse_args()
+
+    heavy_url = f"{args.base_url}/reports/{args.user_id}/all"
+    light_url = f"{args.base_url}/users/{args.user_id}"
+
+    stop_event = threading.Event()
+    heavy_latencies, heavy_errors = [], []
+    light_latencies, light_errors = [], []
+
+    print(
+        f"Running {args.heavy} heavy ({heavy_url}) and {args.light} light "
+        f"({light_url}) workers for {args.duration:.0f}s..."
+    )
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=args.heavy + args.light
+    ) as executor:
+        for _ in range(args.heavy):
+            executor.submit(
+                hammer, heavy_url, stop_event, heavy_latencies, heavy_errors
+            )
+        for _ in range(args.light):
+            executor.submit(
+                hammer, light_url, stop_event, light_latencies, light_errors
+            )
+        time.sleep(args.duration)
+        stop_event.set()
+
+    report("Heavy /reports/{id}/all", heavy_latencies, heavy_errors, args.duration)
+    report("Light /users/{id}", light_latencies, light_errors, args.duration)
+
+
+if __name__ == "__main__":
+    main()
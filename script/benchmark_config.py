@@ -0,0 +1,108 @@
+"""Benchmark: cached config reads, plus a concurrent-save stress test.
+
+Times ``get_database_url()`` and ``get_engine_settings()`` served from the
+in-memory config against re-reading and parsing seta_config.json on every
+call (the old behaviour). Then several processes save the config in a loop
+while another keeps parsing the file, which must never see a partial write:
+
+    python script/benchmark_config.py
+    python script/benchmark_config.py --calls 200000 --writers 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from benchmark_common import APP_DIR
+
+CALLS = 100_000
+WRITERS = 4
+SAVES_PER_WRITER = 200
+
+
+def load_config_manager(data_dir):
+    os.environ["SETA_USER_DATA_PATH"] = str(data_dir)
+    sys.path.insert(0, str(APP_DIR))
+    import config_manager
+
+    return config_manager
+
+
+def per_call(fn, calls):
+    began = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - began) / calls * 1e6
+
+
+def writer(data_dir, index, saves):
+    import logging
+
+    logging.disable(logging.INFO)
+    config_manager = load_config_manager(data_dir)
+    for n in range(saves):
+        url = f"sqlite:///writer{index}-{n}.db" + "x" * (n % 50)
+        config_manager.update_database_config("custom", url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=CALLS)
+    parser.add_argument("--writers", type=int, default=WRITERS)
+    args = parser.parse_args()
+
+    import logging
+
+    logging.disable(logging.INFO)
+    data_dir = tempfile.mkdtemp(prefix="seta_bench_config_")
+    config_manager = load_config_manager(data_dir)
+    config_manager.load_config()
+
+    def uncached_url():
+        return config_manager.resolve_database_url(
+            config_manager._read_config_file()["database"]
+        )
+
+    def uncached_settings():
+        return config_manager.get_engine_settings(config_manager._read_config_file())
+
+    print(f"{'accessor':<22}{'cached us':>10}{'re-read us':>11}")
+    for name, cached, uncached in (
+        ("get_database_url", config_manager.get_database_url, uncached_url),
+        ("get_engine_settings", config_manager.get_engine_settings, uncached_settings),
+    ):
+        print(
+            f"{name:<22}{per_call(cached, args.calls):>10.2f}"
+            f"{per_call(uncached, args.calls // 10):>11.2f}"
+        )
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=writer, args=(data_dir, index, SAVES_PER_WRITER))
+        for index in range(args.writers)
+    ]
+    for process in processes:
+        process.start()
+    reads = torn = 0
+    while any(process.is_alive() for process in processes):
+        try:
+            with open(config_manager.CONFIG_FILE_PATH) as f:
+                json.load(f)
+        except json.JSONDecodeError:
+            torn += 1
+        reads += 1
+    for process in processes:
+        process.join()
+    leftovers = [name for name in os.listdir(data_dir) if name.endswith(".tmp")]
+    print(
+        f"{args.writers} processes x {SAVES_PER_WRITER} saves: {reads} reads, "
+        f"{torn} partial files, {len(leftovers)} temp files left"
+    )
+
+
+if __name__ == "__main__":
+    main()
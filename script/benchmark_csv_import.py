@@ -0,0 +1,73 @@
+"""Benchmark: chunked ``/expenses/import/{user_id}`` on a large bank export.
+
+Generates a synthetic expense CSV (1M rows by default), uploads it to an
+in-process API backed by a temporary local database and reports rows/s and
+the process' peak RSS:
+
+    python script/benchmark_csv_import.py
+    python script/benchmark_csv_import.py --rows 200000
+"""
+
+import argparse
+import random
+import resource
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmark_common import create_user, load_app, shutdown
+
+CATEGORIES = ["Food & Dining", "Housing", "Travel", "Transport", "Utilities"]
+
+
+def write_csv(path, rows):
+    start = date(2020, 1, 1)
+    rng = random.Random(42)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("date,category_name,amount,description\n")
+        for i in range(rows):
+            f.write(
+                f"{start + timedelta(days=rng.randrange(1800))},"
+                f"{rng.choice(CATEGORIES)},{rng.uniform(1, 500):.2f},Row {i}\n"
+            )
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    main = load_app()
+    from fastapi.testclient import TestClient
+
+    client = TestClient(main.app)
+    user_id = create_user(main)
+
+    with tempfile.NamedTemporaryFile(suffix=".csv") as csv_file:
+        write_csv(csv_file.name, args.rows)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        with open(csv_file.name, "rb") as f:
+            response = client.post(
+                f"/expenses/import/{user_id}",
+                files={"file": ("bank_export.csv", f, "text/csv")},
+            )
+        elapsed = time.perf_counter() - start
+    response.raise_for_status()
+    result = response.json()
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(
+        f"rows imported : {result['imported_count']} ({len(result['errors'])} errors)"
+    )
+    print(
+        f"elapsed       : {elapsed:.2f} s ({result['imported_count'] / elapsed:,.0f} rows/s)"
+    )
+    print(
+        f"peak RSS      : {peak_rss / 1024:.0f} MB (before upload {rss_before / 1024:.0f} MB)"
+    )
+    shutdown(main)
+
+
+if __name__ == "__main__":
+    main_()
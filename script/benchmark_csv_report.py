@@ -0,0 +1,115 @@
+"""Benchmark: pandas vs streaming CSV output of the custom reports.
+
+Restores the large sample backups into a temporary local database and
+compares the old DataFrame path (format every row, ``pd.concat``, write the
+whole file to a ``StringIO``) with the server-side-cursor generator now
+behind ``POST /reports/{user_id}/custom_unlicensed_output``:
+
+    python script/benchmark_csv_report.py
+    python script/benchmark_csv_report.py --sample 20000_sample_data.json
+
+Reports time to first byte, total time, output size and the tracemalloc peak.
+"""
+
+import argparse
+import asyncio
+import io
+import time
+import tracemalloc
+
+from benchmark_common import (
+    REPORT_COLUMNS,
+    create_user,
+    format_for_output,
+    load_app,
+    restore_sample,
+    shutdown,
+)
+
+SAMPLES = ["15000_sample_data.json", "20000_sample_data.json"]
+DATA_TYPES = ["expenses", "income", "recurring", "budgets", "goals", "accounts"]
+
+
+async def legacy_csv(main, user_id):
+    """The pre-streaming CSV branch, kept here for comparison."""
+    import pandas as pd
+
+    start = time.perf_counter()
+    async with main.AsyncSessionLocal() as db:
+        data = await main.load_user_data(
+            db, user_id, list(REPORT_COLUMNS), REPORT_COLUMNS
+        )
+    frames = []
+    for section, columns in REPORT_COLUMNS.items():
+        df = pd.DataFrame(
+            [
+                {col: format_for_output(row.get(col)) for col in columns}
+                for row in data[section]
+            ],
+            columns=columns,
+        )
+        df["data_source"] = section
+        frames.append(df)
+    stream = io.StringIO()
+    pd.concat(frames, ignore_index=True).to_csv(stream, index=False)
+    body = stream.getvalue().encode("utf-8")
+    # Nothing reaches the client until the whole file exists
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, len(body)
+
+
+async def streaming_csv(main, user_id):
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    parts = [
+        (main.user_section_query(user_id, section, columns), section)
+        for section, columns in REPORT_COLUMNS.items()
+    ]
+    header = main.csv_report_header(
+        columns + ["data_source"] for columns in REPORT_COLUMNS.values()
+    )
+    async for chunk in main.stream_csv_report(
+        user_id, header, parts, format_for_output
+    ):
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+    return first_byte, time.perf_counter() - start, size
+
+
+def measure(coro_fn, main, user_id):
+    tracemalloc.start()
+    first_byte, total, size = asyncio.run(coro_fn(main, user_id))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    asyncio.run(main.async_engine.dispose())
+    return first_byte, total, size, peak
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sample", action="append", help="sample_data file name")
+    args = parser.parse_args()
+
+    main = load_app()
+    from fastapi.testclient import TestClient
+
+    print(
+        f"{'sample':<26}{'mode':<11}{'ttfb s':>8}{'total s':>9}{'MB out':>8}{'peak MB':>9}"
+    )
+    for sample in args.sample or SAMPLES:
+        user_id = create_user(main, username=f"bench_{sample.split('_')[0]}")
+        with TestClient(main.app) as client:
+            restore_sample(client, user_id, sample)
+        for label, fn in (("pandas", legacy_csv), ("streaming", streaming_csv)):
+            first_byte, total, size, peak = measure(fn, main, user_id)
+            print(
+                f"{sample:<26}{label:<11}{first_byte:>8.3f}{total:>9.3f}"
+                f"{size / 1e6:>8.2f}{peak / 1e6:>9.1f}"
+            )
+    shutdown(main)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,106 @@
+"""Benchmark: switching databases live vs restarting the API.
+
+Creates two SQLite databases with the same schema, then measures
+
+* a cold start: a fresh interpreter importing ``main`` against the other
+  database and serving its first request (what "please restart" costs), and
+* a live switch: ``PUT /settings/database`` back and forth between the two
+  databases inside one running app, plus the first request afterwards.
+
+    python script/benchmark_db_switch.py
+    python script/benchmark_db_switch.py --rounds 50
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmark_common import APP_DIR, create_user, load_app, shutdown
+
+ROUNDS = 20
+COLD_STARTS = 3
+
+COLD_START = """
+import os, sys, time
+began = time.perf_counter()
+sys.path.insert(0, os.getcwd())
+import main
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    client.get("/users/1")
+print(time.perf_counter() - began)
+"""
+
+
+def cold_start(data_dir: Path, database_url: str):
+    """(wall, in-process) seconds for a new process to start on
+    ``database_url`` and answer its first request."""
+    config = {"database": {"type": "custom", "url": database_url}}
+    (data_dir / "seta_config.json").write_text(json.dumps(config))
+    began = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_START],
+        cwd=APP_DIR,
+        env={**os.environ, "SETA_USER_DATA_PATH": str(data_dir)},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    wall = time.perf_counter() - began
+    return wall, float(output.strip().splitlines()[-1])
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    args = parser.parse_args()
+
+    main = load_app()
+    import models
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+
+    user_id = create_user(main, username="bench_switch")
+    work_dir = Path(tempfile.mkdtemp(prefix="seta_bench_switch_"))
+    urls = []
+    for name in ("a", "b"):
+        url = f"sqlite:///{work_dir / name}.db"
+        engine = create_engine(url)
+        models.Base.metadata.create_all(engine)
+        engine.dispose()
+        urls.append(url)
+
+    cold = [cold_start(work_dir, urls[1]) for _ in range(COLD_STARTS)]
+    print(
+        f"cold start + first request: {statistics.median(w for w, _ in cold):.3f} s "
+        f"wall, {statistics.median(s for _, s in cold):.3f} s in-process "
+        f"(median of {COLD_STARTS})"
+    )
+
+    switches, first_requests = [], []
+    with TestClient(main.app) as client:
+        for round_ in range(args.rounds):
+            payload = {"db_type": "custom", "db_url": urls[round_ % 2]}
+            began = time.perf_counter()
+            client.put("/settings/database", json=payload).raise_for_status()
+            switched = time.perf_counter()
+            client.get(f"/users/{user_id}")
+            switches.append(switched - began)
+            first_requests.append(time.perf_counter() - switched)
+        client.put("/settings/database", json={"db_type": "local"}).raise_for_status()
+    print(
+        f"live switch: {statistics.median(switches) * 1000:.1f} ms, first request "
+        f"after it {statistics.median(first_requests) * 1000:.1f} ms "
+        f"(median of {args.rounds})"
+    )
+    shutdown(main)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,225 @@
+"""Benchmark: email outbox latency, delivery throughput and retries.
+
+Runs the API in-process against a local SMTP stand-in (aiosmtpd, which the
+API itself does not need: ``pip install aiosmtpd``), so no mail leaves the
+machine. Measures how long /signup and /request-password-reset take now
+that they only queue their mail, how fast the outbox worker delivers it and
+over how many SMTP sessions, and compares that with opening a connection
+per mail (what sending inline did). The server can answer slowly, take a
+while to greet a new connection (standing in for TLS and login to a remote
+server) and reject the first messages with a temporary 451 to exercise the
+retries:
+
+    python script/benchmark_email_outbox.py
+    python script/benchmark_email_outbox.py --users 100 --smtp-delay 0.2 --fail 5
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import socket
+import statistics
+import threading
+import time
+from datetime import timedelta
+from email.message import EmailMessage
+
+from benchmark_common import load_app, percentile, shutdown
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    raise SystemExit("This benchmark needs aiosmtpd: pip install aiosmtpd")
+
+USERS = 50
+SMTP_DELAY = 0.05
+HANDSHAKE_DELAY = 0.2
+FAIL = 3
+TIMEOUT = 120.0
+
+
+class Handler:
+    """Accepts every mail after ``delay``; answers 451 to the first ``fail``."""
+
+    def __init__(self, delay, handshake_delay, fail):
+        self.delay = delay
+        self.handshake_delay = handshake_delay
+        self.fail = fail
+        self.received = 0
+        self.rejected = 0
+        self.sessions = set()
+        self.lock = threading.Lock()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.handshake_delay)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.delay)
+        with self.lock:
+            self.sessions.add(id(session))
+            if self.rejected < self.fail:
+                self.rejected += 1
+                return "451 Try again later"
+            self.received += 1
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_posts(client, requests):
+    latencies = []
+    for path, payload in requests:
+        started = time.perf_counter()
+        client.post(path, json=payload).raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def wait_for_outbox(main, timeout=TIMEOUT):
+    """Waits until nothing is pending; returns (status, attempts, sent_at) rows."""
+    import mailer
+    import models
+    from sqlalchemy import select
+
+    deadline = time.perf_counter() + timeout
+    while True:
+        with main.SessionLocal() as db:
+            rows = db.execute(
+                select(
+                    models.EmailOutbox.status,
+                    models.EmailOutbox.attempts,
+                    models.EmailOutbox.sent_at,
+                )
+            ).all()
+        if all(status != mailer.PENDING for status, *_ in rows):
+            return rows
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"Mail still pending after {timeout} s")
+        time.sleep(0.01)
+
+
+async def send_one_per_connection(settings, count):
+    import aiosmtplib
+
+    started = time.perf_counter()
+    for n in range(count):
+        message = EmailMessage()
+        message["From"] = settings.sender
+        message["To"] = f"inline{n}@example.com"
+        message["Subject"] = "Inline"
+        message.set_content("<p>Inline</p>", subtype="html")
+        await aiosmtplib.send(
+            message, hostname=settings.host, port=settings.port, start_tls=False
+        )
+    return time.perf_counter() - started
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=USERS)
+    parser.add_argument(
+        "--smtp-delay", type=float, default=SMTP_DELAY, help="Seconds per mail"
+    )
+    parser.add_argument(
+        "--handshake-delay",
+        type=float,
+        default=HANDSHAKE_DELAY,
+        help="Seconds to greet a new connection",
+    )
+    parser.add_argument("--fail", type=int, default=FAIL, help="451s to answer first")
+    args = parser.parse_args()
+
+    import logging
+
+    logging.disable(logging.WARNING)
+    main = load_app()
+    import mailer
+
+    handler = Handler(args.smtp_delay, args.handshake_delay, args.fail)
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    settings = dataclasses.replace(
+        main.MAIL_SETTINGS,
+        host="127.0.0.1",
+        port=controller.port,
+        username=None,
+        start_tls=False,
+        use_tls=False,
+    )
+    main.mail_outbox.settings = settings
+    # Retry the rejected mail within the run instead of after minutes
+    mailer.BACKOFF_BASE = timedelta(seconds=0.1)
+    mailer.POLL_INTERVAL = 0.1
+
+    from fastapi.testclient import TestClient
+
+    with TestClient(main.app) as client:
+        users = [f"outbox_bench_{n}" for n in range(args.users)]
+        started = time.perf_counter()
+        signup = time_posts(
+            client,
+            [
+                (
+                    "/signup",
+                    {
+                        "username": username,
+                        "email": f"{username}@example.com",
+                        "password": "Benchmark123.",
+                        "first_name": "Out",
+                        "last_name": "Box",
+                        "contact_number": "0",
+                    },
+                )
+                for username in users
+            ],
+        )
+        reset = time_posts(
+            client,
+            [
+                ("/request-password-reset", {"email": f"{username}@example.com"})
+                for username in users
+            ],
+        )
+        queued = time.perf_counter() - started
+        rows = wait_for_outbox(main)
+        delivered = time.perf_counter() - started
+
+    mails = len(rows)
+    sent = sum(status == mailer.SENT for status, *_ in rows)
+    retried = sum(attempts > 1 for _, attempts, _ in rows)
+    sent_at = sorted(at for _, _, at in rows if at is not None)
+    print(
+        f"{mails} mails, SMTP server answering in {args.smtp_delay * 1000:.0f} ms, "
+        f"greeting in {args.handshake_delay * 1000:.0f} ms"
+    )
+    for name, latencies in (("signup", signup), ("password reset", reset)):
+        print(
+            f"  {name:<16}p50 {statistics.median(latencies):6.1f} ms  "
+            f"p95 {percentile(latencies, 95):6.1f} ms"
+        )
+    span = (sent_at[-1] - sent_at[0]).total_seconds() if len(sent_at) > 1 else 0
+    print(
+        f"  all queued after {queued:.2f} s, all delivered after {delivered:.2f} s "
+        f"(outbox worker: {(len(sent_at) - 1) / span if span else 0:.1f} mails/s)"
+    )
+    print(
+        f"  {sent} sent, {mails - sent} failed, {retried} retried after "
+        f"{handler.rejected} 451s, {len(handler.sessions)} SMTP session(s)"
+    )
+
+    count = min(mails, 20)
+    seconds = asyncio.run(send_one_per_connection(settings, count))
+    print(f"  one connection per mail: {count / seconds:.1f} mails/s")
+
+    controller.stop()
+    shutdown(main)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,111 @@
+"""Benchmark: pandas/openpyxl vs streaming Excel output of the reports.
+
+Restores the large sample backups into a temporary local database and
+compares the old path (format every row to strings, one DataFrame per type,
+``pd.ExcelWriter(engine="openpyxl")`` into a BytesIO) with
+``xlsx_report_response`` now behind the Excel report outputs:
+
+    python script/benchmark_excel_report.py
+    python script/benchmark_excel_report.py --sample 20000_sample_data.json
+
+Reports build time, output size and the tracemalloc peak, and checks that
+the streamed workbook opens with openpyxl.
+"""
+
+import argparse
+import asyncio
+import io
+import time
+import tracemalloc
+
+from benchmark_common import (
+    REPORT_COLUMNS,
+    create_user,
+    format_for_output,
+    load_app,
+    restore_sample,
+    shutdown,
+)
+
+SAMPLES = ["15000_sample_data.json", "20000_sample_data.json"]
+
+
+async def legacy_excel(main, user_id):
+    """The pre-streaming Excel branch, kept here for comparison."""
+    import pandas as pd
+
+    start = time.perf_counter()
+    async with main.AsyncSessionLocal() as db:
+        data = await main.load_user_data(
+            db, user_id, list(REPORT_COLUMNS), REPORT_COLUMNS
+        )
+    stream = io.BytesIO()
+    with pd.ExcelWriter(stream, engine="openpyxl") as writer:
+        for section, columns in REPORT_COLUMNS.items():
+            df = pd.DataFrame(
+                [
+                    {col: format_for_output(row.get(col)) for col in columns}
+                    for row in data[section]
+                ],
+                columns=columns,
+            )
+            df.to_excel(writer, sheet_name=section.capitalize()[:30], index=False)
+    return time.perf_counter() - start, stream.getvalue()
+
+
+async def streaming_excel(main, user_id):
+    start = time.perf_counter()
+    async with main.AsyncSessionLocal() as db:
+        response = await main.xlsx_report_response(
+            db,
+            [
+                (
+                    section.capitalize()[:30],
+                    columns,
+                    main.user_section_query(user_id, section, columns),
+                )
+                for section, columns in REPORT_COLUMNS.items()
+            ],
+            "bench",
+        )
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    return time.perf_counter() - start, body
+
+
+def measure(coro_fn, main, user_id):
+    tracemalloc.start()
+    elapsed, body = asyncio.run(coro_fn(main, user_id))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    asyncio.run(main.async_engine.dispose())
+    return elapsed, body, peak
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sample", action="append", help="sample_data file name")
+    args = parser.parse_args()
+
+    main = load_app()
+    from fastapi.testclient import TestClient
+    from openpyxl import load_workbook
+
+    print(f"{'sample':<26}{'mode':<11}{'total s':>9}{'MB out':>8}{'peak MB':>9}")
+    for sample in args.sample or SAMPLES:
+        user_id = create_user(main, username=f"bench_{sample.split('_')[0]}")
+        with TestClient(main.app) as client:
+            restore_sample(client, user_id, sample)
+        for label, fn in (("pandas", legacy_excel), ("streaming", streaming_excel)):
+            elapsed, body, peak = measure(fn, main, user_id)
+            print(
+                f"{sample:<26}{label:<11}{elapsed:>9.3f}"
+                f"{len(body) / 1e6:>8.2f}{peak / 1e6:>9.1f}"
+            )
+        workbook = load_workbook(io.BytesIO(body), read_only=True)
+        rows = sum(sum(1 for _ in sheet.iter_rows(min_row=2)) for sheet in workbook)
+        print(f"{'':<26}streamed workbook: {rows} rows in {workbook.sheetnames}")
+    shutdown(main)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,112 @@
+"""Benchmark: in-memory vs streaming ``/export/all/{user_id}``.
+
+Restores the large sample backups into a temporary local database and
+compares the old build-everything-then-JSONResponse export with the
+``stream_user_export`` generator now behind the endpoint:
+
+    python script/benchmark_export.py
+    python script/benchmark_export.py --sample 20000_sample_data.json
+
+Reports time to first byte, total time, output size and the tracemalloc peak.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmark_common import create_user, load_app, restore_sample, shutdown
+
+SAMPLES = ["15000_sample_data.json", "20000_sample_data.json"]
+
+
+async def legacy_export(main, user_id):
+    """The pre-streaming implementation, kept here for comparison."""
+    from fastapi.encoders import jsonable_encoder
+    from sqlalchemy import select
+
+    start = time.perf_counter()
+    export_data_raw = {}
+    async with main.AsyncSessionLocal() as db:
+        # One ORM query and a model_validate per row for each section
+        for key, model, _rows, order_by in main.EXPORT_SECTIONS:
+            response_model = main.AllDataReportResponse.model_fields[
+                key
+            ].annotation.__args__[0]
+            orm_rows = (
+                await db.scalars(
+                    select(model).where(model.user_id == user_id).order_by(order_by)
+                )
+            ).all()
+            export_data_raw[key] = [
+                response_model.model_validate(row).model_dump(mode="json")
+                for row in orm_rows
+            ]
+    export_data_raw["export_metadata"] = {
+        "version": "1.0",
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+        "user_id": user_id,
+    }
+    # JSONResponse.render() equivalent
+    body = json.dumps(
+        jsonable_encoder(export_data_raw),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    # Nothing reaches the client until the whole body exists
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, len(body)
+
+
+async def streaming_export(main, user_id):
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    async for chunk in main.stream_user_export(user_id):
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+    return first_byte, time.perf_counter() - start, size
+
+
+def measure(coro_fn, main, user_id):
+    tracemalloc.start()
+    first_byte, total, size = asyncio.run(coro_fn(main, user_id))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_byte, total, size, peak
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sample", action="append", help="sample_data file name")
+    args = parser.parse_args()
+
+    main = load_app()
+    from fastapi.testclient import TestClient
+
+    client = TestClient(main.app)
+
+    print(
+        f"{'sample':<26}{'mode':<11}{'ttfb s':>8}{'total s':>9}{'MB out':>8}{'peak MB':>9}"
+    )
+    for sample in args.sample or SAMPLES:
+        user_id = create_user(main, username=f"bench_{sample.split('_')[0]}")
+        restore_sample(client, user_id, sample)
+        for label, fn in (
+            ("in-memory", legacy_export),
+            ("streaming", streaming_export),
+        ):
+            first_byte, total, size, peak = measure(fn, main, user_id)
+            print(
+                f"{sample:<26}{label:<11}{first_byte:>8.3f}{total:>9.3f}"
+                f"{size / 1e6:>8.2f}{peak / 1e6:>9.1f}"
+            )
+    shutdown(main)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,135 @@
+"""Benchmark: vectorized cash-flow forecast vs a day-by-day loop.
+
+Projects five years of daily balances for synthetic users with many
+accounts and recurring rules, once with ``forecast.occurrence_offsets`` and
+``forecast.project_balances`` (arrays, one cumulative sum) and once with a
+plain Python loop over the days, and checks that both agree. Then times
+``GET /forecast/{user_id}?months=60`` on a restored sample backup:
+
+    python script/benchmark_forecast.py
+    python script/benchmark_forecast.py --accounts 50 --accounts 1000
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from benchmark_common import create_user, load_app, restore_sample, shutdown
+
+ACCOUNTS = [10, 100, 500]
+RULES_PER_ACCOUNT = 8
+MONTHS = 60
+SAMPLE = "20000_sample_data.json"
+
+
+def synthetic_rules(accounts, models, seed=1):
+    rng = random.Random(seed)
+    frequencies = list(models.FrequencyEnum)
+    return [
+        (
+            account,
+            rng.choice(frequencies),
+            date(2020, 1, 1) + timedelta(days=rng.randrange(2000)),
+            None if rng.random() < 0.7 else date(2027, 1, 1),
+            round(rng.uniform(5, 500), 2),
+        )
+        for account in range(accounts)
+        for _ in range(RULES_PER_ACCOUNT)
+    ]
+
+
+def vectorized(rules, accounts, start, end, opening, daily_net):
+    import forecast
+    import numpy as np
+
+    days = (end - start).days + 1
+    series, offsets, amounts = [], [], []
+    for account, frequency, first, last, amount in rules:
+        rule_offsets = forecast.occurrence_offsets(frequency, first, last, start, end)
+        series.append(np.full(len(rule_offsets), account))
+        offsets.append(rule_offsets)
+        amounts.append(np.full(len(rule_offsets), -amount))
+    return forecast.project_balances(
+        np.array(opening),
+        np.array(daily_net),
+        np.concatenate(series).astype(np.int64),
+        np.concatenate(offsets),
+        np.concatenate(amounts),
+        days,
+    )
+
+
+def day_loop(rules, accounts, start, end, opening, daily_net):
+    """Reference: walk every day of every account."""
+    import recurrence
+
+    due = {}
+    for account, frequency, first, last, amount in rules:
+        for day in recurrence.occurrences(frequency, first, last, start, end):
+            due[account, day] = due.get((account, day), 0.0) - amount
+    days = (end - start).days + 1
+    balances = []
+    for account in range(accounts):
+        balance, row = opening[account], []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            balance += daily_net[account] + due.get((account, day), 0.0)
+            row.append(balance)
+        balances.append(row)
+    return balances
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, action="append")
+    parser.add_argument("--sample", default=SAMPLE, help="sample_data file name")
+    args = parser.parse_args()
+
+    main = load_app()
+    import models
+    import numpy as np
+
+    start = date(2025, 1, 1)
+    end = date(2029, 12, 31)
+    print(
+        f"{'accounts':>9}{'rules':>7}{'days':>6}{'numpy s':>9}{'loop s':>8}{'max diff':>10}"
+    )
+    for accounts in args.accounts or ACCOUNTS:
+        rules = synthetic_rules(accounts, models)
+        rng = random.Random(accounts)
+        opening = [rng.uniform(0, 10000) for _ in range(accounts)]
+        daily_net = [rng.uniform(-20, 20) for _ in range(accounts)]
+        timings = []
+        for fn in (vectorized, day_loop):
+            began = time.perf_counter()
+            result = fn(rules, accounts, start, end, opening, daily_net)
+            timings.append((time.perf_counter() - began, np.asarray(result)))
+        diff = np.abs(timings[0][1] - timings[1][1]).max()
+        print(
+            f"{accounts:>9}{len(rules):>7}{(end - start).days + 1:>6}"
+            f"{timings[0][0]:>9.3f}{timings[1][0]:>8.3f}{diff:>10.2e}"
+        )
+
+    from fastapi.testclient import TestClient
+
+    user_id = create_user(main, username="bench_forecast")
+    with TestClient(main.app) as client:
+        restore_sample(client, user_id, args.sample)
+        url = f"/forecast/{user_id}?months={MONTHS}"
+        client.get(url).raise_for_status()
+        began = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - began
+        response.raise_for_status()
+        body = response.json()
+    print(
+        f"GET {url} on {args.sample}: {elapsed:.3f} s, "
+        f"{len(body['accounts'])} series x {len(body['total'])} days, "
+        f"{len(response.content) / 1e6:.2f} MB"
+    )
+    shutdown(main)
+
+
+if __name__ == "__main__":
+    main_()
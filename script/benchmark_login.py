@@ -0,0 +1,118 @@
+"""Benchmark: password KDF cost and /login throughput.
+
+Prints the cost of one hash for each candidate setting, then drives
+concurrent logins against an in-process API (temporary local database)
+with the default hasher, measuring login throughput with a cold and a warm
+verification cache and the latency of a light request meanwhile:
+
+    python script/benchmark_login.py
+    python script/benchmark_login.py --users 16 --logins 64 --concurrency 8
+"""
+
+import argparse
+import concurrent.futures
+import statistics
+import threading
+import time
+
+from benchmark_common import create_user, load_app, shutdown
+
+PASSWORD = "Benchmark123."
+
+
+def time_hash(hasher, repeat=3):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hasher.hash(PASSWORD)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def run_logins(client, usernames, total, concurrency):
+    def login(i):
+        response = client.post(
+            "/login",
+            json={"username": usernames[i % len(usernames)], "password": PASSWORD},
+        )
+        response.raise_for_status()
+
+    stop = threading.Event()
+    light_latencies = []
+
+    def light():
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get("/")
+            light_latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+
+    probe = threading.Thread(target=light)
+    probe.start()
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(login, range(total)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    probe.join()
+    return total / elapsed, max(light_latencies, default=float("nan"))
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    main = load_app()
+    import passwords
+
+    print("Cost of one hash:")
+    candidates = [
+        ("legacy sha256", passwords.LegacySHA256Hasher()),
+        ("scrypt n=2^14", passwords.ScryptHasher(n=2**14)),
+        ("scrypt n=2^15", passwords.ScryptHasher(n=2**15)),
+        ("scrypt n=2^16", passwords.ScryptHasher(n=2**16)),
+        ("pbkdf2 310k", passwords.PBKDF2Hasher(iterations=310_000)),
+        ("pbkdf2 600k", passwords.PBKDF2Hasher(iterations=600_000)),
+    ]
+    for label, hasher in candidates:
+        default = (
+            " (default)"
+            if vars(hasher) == vars(passwords.default_hasher)
+            and type(hasher) is type(passwords.default_hasher)
+            else ""
+        )
+        print(f"  {label:<15}{time_hash(hasher) * 1000:8.1f} ms{default}")
+
+    from fastapi.testclient import TestClient
+
+    # One client (one event loop) shared by all request threads
+    with TestClient(main.app) as client:
+        usernames = [f"login_bench_{i}" for i in range(args.users)]
+        for username in usernames:
+            create_user(main, username=username)
+
+        print(
+            f"\n{args.logins} logins over {args.users} users, "
+            f"{args.concurrency} concurrent clients:"
+        )
+        passwords.verification_cache.clear()
+        cold_rate, cold_light = run_logins(
+            client, usernames, args.users, args.concurrency
+        )
+        print(
+            f"  cold cache : {cold_rate:7.1f} logins/s  (max GET / latency {cold_light:.0f} ms)"
+        )
+        warm_rate, warm_light = run_logins(
+            client, usernames, args.logins, args.concurrency
+        )
+        print(
+            f"  warm cache : {warm_rate:7.1f} logins/s  (max GET / latency {warm_light:.0f} ms)"
+        )
+    shutdown(main)
+
+
+if __name__ == "__main__":
+    main_()
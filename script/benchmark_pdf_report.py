@@ -0,0 +1,142 @@
+"""Benchmark: single-Table vs chunked vs parallel PDF output of the reports.
+
+Restores the large sample backups into a temporary local database and
+renders the licensed custom report layout three ways: the old path (one
+reportlab ``Table`` per data type holding every row), ``pdf_reports``'s
+chunked tables in one thread, and ``pdf_reports.build_report`` rendering
+the sections in the process pool and merging them:
+
+    python script/benchmark_pdf_report.py
+    python script/benchmark_pdf_report.py --sample 20000_sample_data.json
+
+Reports render time, page count and output size.
+"""
+
+import argparse
+import asyncio
+import io
+import time
+
+from benchmark_common import (
+    REPORT_COLUMNS,
+    create_user,
+    format_for_output,
+    load_app,
+    restore_sample,
+    shutdown,
+)
+
+SAMPLES = ["15000_sample_data.json", "20000_sample_data.json"]
+TITLE = [("SETA Custom Report", "h1"), ("Generated on: benchmark", "Normal")]
+
+
+def load_sections(main, user_id):
+    async def load():
+        async with main.AsyncSessionLocal() as db:
+            return await main.load_user_data(
+                db, user_id, list(REPORT_COLUMNS), REPORT_COLUMNS
+            )
+
+    data = asyncio.run(load())
+    asyncio.run(main.async_engine.dispose())
+    return [
+        (
+            f"Data Type: {section.capitalize()}",
+            columns,
+            [
+                [format_for_output(row.get(col)) for col in columns]
+                for row in data[section]
+            ],
+        )
+        for section, columns in REPORT_COLUMNS.items()
+        if data[section]
+    ]
+
+
+def legacy_pdf(sections):
+    """The pre-chunking PDF branch, kept here for comparison."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table
+
+    import pdf_reports
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        leftMargin=0.5 * inch,
+        rightMargin=0.5 * inch,
+        topMargin=0.5 * inch,
+        bottomMargin=0.5 * inch,
+    )
+    styles = getSampleStyleSheet()
+    story = [Paragraph(text, styles[style]) for text, style in TITLE]
+    story.append(Spacer(1, 0.2 * inch))
+    for heading, header, rows in sections:
+        story.append(Paragraph(heading, styles["h2"]))
+        story.append(Spacer(1, 0.1 * inch))
+        table = Table([header] + rows, repeatRows=1)
+        table.setStyle(pdf_reports.LAYOUTS["custom"][0])
+        story.append(table)
+        story.append(Spacer(1, 0.2 * inch))
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def chunked_pdf(sections):
+    import pdf_reports
+
+    return pdf_reports.render_report("custom", TITLE, sections)
+
+
+def parallel_pdf(sections):
+    import pdf_reports
+
+    pdf_reports.PARALLEL_MIN_ROWS = 0
+    return asyncio.run(pdf_reports.build_report("custom", TITLE, sections))
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sample", action="append", help="sample_data file name")
+    args = parser.parse_args()
+
+    main = load_app()
+    import pdf_reports
+    from fastapi.testclient import TestClient
+    from PyPDF2 import PdfReader
+
+    print(f"process pool workers: {pdf_reports.MAX_WORKERS}")
+    print(
+        f"{'sample':<26}{'mode':<10}{'rows':>7}{'total s':>9}{'pages':>7}{'MB out':>8}"
+    )
+    for sample in args.sample or SAMPLES:
+        user_id = create_user(main, username=f"bench_{sample.split('_')[0]}")
+        with TestClient(main.app) as client:
+            restore_sample(client, user_id, sample)
+        sections = load_sections(main, user_id)
+        rows = sum(len(section[2]) for section in sections)
+        # Start the workers up front so their spawn time isn't measured
+        workers = pdf_reports.MAX_WORKERS
+        list(pdf_reports.get_executor().map(time.sleep, [0.5] * workers))
+        for label, fn in (
+            ("table", legacy_pdf),
+            ("chunked", chunked_pdf),
+            ("parallel", parallel_pdf),
+        ):
+            start = time.perf_counter()
+            body = fn(sections)
+            elapsed = time.perf_counter() - start
+            pages = len(PdfReader(io.BytesIO(body)).pages)
+            print(
+                f"{sample:<26}{label:<10}{rows:>7}{elapsed:>9.3f}"
+                f"{pages:>7}{len(body) / 1e6:>8.2f}"
+            )
+    pdf_reports.shutdown()
+    shutdown(main)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,83 @@
+"""Benchmark: per-object ORM restore vs bulk ``/import/all/{user_id}``.
+
+Restores the large sample backups into a temporary local database, once
+with the old validate-then-``add_all`` loop and once through the endpoint's
+chunked executemany path:
+
+    python script/benchmark_restore.py
+    python script/benchmark_restore.py --sample 20000_sample_data.json
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmark_common import SAMPLE_DATA_DIR, create_user, load_app, shutdown
+
+SAMPLES = ["15000_sample_data.json", "20000_sample_data.json"]
+
+
+async def legacy_restore(main, user_id, backup):
+    """The pre-bulk implementation (minus the deletes), kept for comparison."""
+    import models
+
+    data_map = {
+        "accounts": (models.Account, main.AccountCreate),
+        "expenses": (models.Expense, main.CreateExpense),
+        "income": (models.Income, main.IncomeCreate),
+        "recurring_expenses": (models.RecurringExpense, main.RecurringExpenseCreate),
+        "budgets": (models.Budget, main.BudgetCreate),
+        "goals": (models.Goal, main.GoalCreate),
+    }
+    async with main.AsyncSessionLocal() as db:
+        for key, (model, create_model) in data_map.items():
+            items = []
+            for item in backup[key]:
+                item = {
+                    k: v
+                    for k, v in item.items()
+                    if k not in ("id", "created_at", "updated_at", "account_id")
+                }
+                item["user_id"] = user_id
+                items.append(model(**create_model(**item).model_dump()))
+            db.add_all(items)
+            await db.flush()
+        await db.commit()
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sample", action="append", help="sample_data file name")
+    args = parser.parse_args()
+
+    main = load_app()
+    from fastapi.testclient import TestClient
+
+    client = TestClient(main.app)
+
+    print(f"{'sample':<26}{'rows':>7}{'ORM add_all s':>15}{'bulk s':>9}")
+    for sample in args.sample or SAMPLES:
+        raw = (SAMPLE_DATA_DIR / sample).read_bytes()
+        backup = json.loads(raw)
+        rows = sum(len(v) for k, v in backup.items() if isinstance(v, list))
+
+        user_id = create_user(main, username=f"legacy_{sample.split('_')[0]}")
+        start = time.perf_counter()
+        asyncio.run(legacy_restore(main, user_id, backup))
+        legacy = time.perf_counter() - start
+
+        user_id = create_user(main, username=f"bulk_{sample.split('_')[0]}")
+        start = time.perf_counter()
+        client.post(
+            f"/import/all/{user_id}",
+            files={"file": (sample, raw, "application/json")},
+        ).raise_for_status()
+        bulk = time.perf_counter() - start
+
+        print(f"{sample:<26}{rows:>7}{legacy:>15.2f}{bulk:>9.2f}")
+    shutdown(main)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,123 @@
+"""Benchmark: per-row Pydantic validation vs ``JsonRows`` bulk serialization.
+
+Restores a sample backup into a temporary local database, then for each
+user-owned table compares the previous read path (ORM objects, a
+``model_validate`` per row, then FastAPI re-validating against
+``response_model`` and dumping JSON) with the column-projected
+``JsonRows`` path now behind the bulk read endpoints:
+
+    python script/benchmark_serialization.py
+    python script/benchmark_serialization.py --sample 15000_sample_data.json
+
+Reports rows/s for serialization alone and including the query, plus
+end-to-end timings of the bulk endpoints.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+from benchmark_common import create_user, load_app, restore_sample, shutdown
+
+REPEAT = 3
+
+
+def best_of(fn, repeat=REPEAT):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+async def load_section(main, user_id, model, rows, order_by):
+    from sqlalchemy import select
+
+    def scoped(statement):
+        return statement.where(model.user_id == user_id).order_by(order_by)
+
+    async with main.AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        orm_rows = (await db.scalars(scoped(select(model)))).all()
+        orm_query = time.perf_counter() - start
+        start = time.perf_counter()
+        mapping_rows = (await db.execute(scoped(rows.select(model)))).mappings().all()
+        column_query = time.perf_counter() - start
+    await main.async_engine.dispose()
+    return orm_rows, orm_query, mapping_rows, column_query
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sample", default="20000_sample_data.json")
+    args = parser.parse_args()
+
+    main = load_app()
+    from fastapi.testclient import TestClient
+    from pydantic import TypeAdapter
+
+    import report_cache
+
+    user_id = create_user(main)
+    with TestClient(main.app) as client:
+        restore_sample(client, user_id, args.sample)
+
+        print(f"Sample: {args.sample}\n")
+        print(
+            f"{'section':<20}{'rows':>7}{'per-row rows/s':>17}{'JsonRows rows/s':>17}"
+            f"{'speed-up':>10}{'  (incl. query)':>17}"
+        )
+        for key, model, rows, order_by in main.EXPORT_SECTIONS:
+            orm_rows, orm_query, mapping_rows, column_query = asyncio.run(
+                load_section(main, user_id, model, rows, order_by)
+            )
+            if not orm_rows:
+                continue
+            response_model = main.AllDataReportResponse.model_fields[
+                key
+            ].annotation.__args__[0]
+            response_adapter = TypeAdapter(List[response_model])
+
+            def legacy():
+                validated = [response_model.model_validate(row) for row in orm_rows]
+                # FastAPI's serialize_response: validate again, then dump
+                return response_adapter.dump_json(
+                    response_adapter.validate_python(validated)
+                )
+
+            legacy_time, legacy_body = best_of(legacy)
+            fast_time, fast_body = best_of(lambda: rows.dump(mapping_rows))
+            assert len(legacy_body) == len(fast_body), key
+            count = len(orm_rows)
+            with_query = (legacy_time + orm_query) / (fast_time + column_query)
+            print(
+                f"{key:<20}{count:>7}{count / legacy_time:>17,.0f}"
+                f"{count / fast_time:>17,.0f}{legacy_time / fast_time:>9.1f}x"
+                f"{with_query:>16.1f}x"
+            )
+
+        print("\nEndpoints (report cache bypassed):")
+        for path in (
+            f"/expenses/{user_id}",
+            f"/income/{user_id}",
+            f"/reports/{user_id}/all",
+            f"/reports/{user_id}/general_summary",
+        ):
+
+            def get():
+                report_cache.bump(user_id)
+                response = client.get(path)
+                response.raise_for_status()
+                return response
+
+            elapsed, response = best_of(get)
+            print(
+                f"  {path:<32}{elapsed * 1000:8.0f} ms {len(response.content):>10,} B"
+            )
+    shutdown(main)
+
+
+if __name__ == "__main__":
+    main_()
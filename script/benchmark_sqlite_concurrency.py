@@ -0,0 +1,152 @@
+"""Benchmark: SQLite read latency while a writer commits continuously.
+
+Runs the same workload against two temporary databases built by
+``config_manager.create_db_engine``: one with SQLite's stock settings
+(rollback journal, synchronous=FULL) and one with the configured PRAGMAs
+(WAL, synchronous=NORMAL, mmap, cache...). A writer thread inserts
+expenses in small transactions while reader threads run dashboard-style
+range sums; in rollback-journal mode every commit locks readers out.
+
+    python script/benchmark_sqlite_concurrency.py
+    python script/benchmark_sqlite_concurrency.py --rows 100000 --readers 8
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+TEMP_DIR = tempfile.mkdtemp(prefix="seta_bench_")
+os.environ["SETA_USER_DATA_PATH"] = TEMP_DIR
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "seta-api" / "app"))
+
+import config_manager  # noqa: E402
+import models  # noqa: E402
+from benchmark_common import percentile  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+
+USER_ID = 1
+START = date(2015, 1, 1)
+STOCK_PRAGMAS = {
+    name: None for name in config_manager.DEFAULT_ENGINE_SETTINGS["sqlite"]
+}
+STOCK_PRAGMAS.update(journal_mode="DELETE", synchronous="FULL")
+
+
+def expense_rows(count, rng):
+    return [
+        {
+            "user_id": USER_ID,
+            "amount": round(rng.uniform(1, 500), 2),
+            "date": START + timedelta(days=rng.randrange(3650)),
+            "category_name": rng.choice(["Food", "Rent", "Travel", "Bills", "Fun"]),
+        }
+        for _ in range(count)
+    ]
+
+
+def run(label, pragmas, args):
+    settings = config_manager.get_engine_settings({})
+    settings["sqlite"] = pragmas
+    path = Path(TEMP_DIR) / f"{label}.db"
+    engine = config_manager.create_db_engine(
+        f"sqlite:///{path.as_posix()}", settings=settings
+    )
+    models.Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(models.User.__table__),
+            [
+                {
+                    "id": USER_ID,
+                    "username": "bench",
+                    "email": "bench@example.com",
+                    "password_hash": "x",
+                    "first_name": "B",
+                    "last_name": "B",
+                    "contact_number": "0",
+                }
+            ],
+        )
+        connection.execute(
+            insert(models.Expense.__table__), expense_rows(args.rows, rng)
+        )
+
+    stop = threading.Event()
+    read_latencies, read_errors = [], []
+    commits = []
+
+    def writer():
+        rng = random.Random(7)
+        while not stop.is_set():
+            start = time.perf_counter()
+            with engine.begin() as connection:
+                connection.execute(
+                    insert(models.Expense.__table__), expense_rows(args.batch, rng)
+                )
+            commits.append(time.perf_counter() - start)
+
+    def reader(seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            first = START + timedelta(days=rng.randrange(3285))
+            query = select(func.sum(models.Expense.amount), func.count()).where(
+                models.Expense.user_id == USER_ID,
+                models.Expense.date >= first,
+                models.Expense.date < first + timedelta(days=365),
+            )
+            start = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    connection.execute(query).one()
+            except Exception as e:  # "database is locked" once busy_timeout runs out
+                read_errors.append(str(e))
+                continue
+            read_latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=writer)] + [
+        threading.Thread(target=reader, args=(i,)) for i in range(args.readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    print(f"\n{label}: {pragmas}")
+    print(
+        f"  writer commits : {len(commits) / args.duration:8.1f} /s ({args.batch} rows each)"
+    )
+    print(
+        f"  reads          : {len(read_latencies) / args.duration:8.1f} /s, {len(read_errors)} errors"
+    )
+    print(f"  read p50       : {percentile(read_latencies, 50):8.2f} ms")
+    print(f"  read p99       : {percentile(read_latencies, 99):8.2f} ms")
+    print(f"  read max       : {max(read_latencies, default=float('nan')):8.2f} ms")
+    if read_latencies:
+        print(f"  read mean      : {statistics.mean(read_latencies):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000, help="Rows preloaded")
+    parser.add_argument("--batch", type=int, default=50, help="Rows per write commit")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    run("stock", STOCK_PRAGMAS, args)
+    run("tuned", config_manager.DEFAULT_ENGINE_SETTINGS["sqlite"], args)
+
+
+if __name__ == "__main__":
+    main()
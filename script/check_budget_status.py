@@ -0,0 +1,96 @@
+"""Checks GET /budgets/{user_id}/status for a user with many budgets.
+
+The budget windows are summed in UNION ALL queries, and SQLite refuses
+compound SELECTs of more than 500 terms. This creates more budgets than
+that (monthly ones over a few categories, with varied start days) and some
+expenses in a temporary local database. It then compares every budget's
+spent and expense_count with a plain Python sum:
+
+    python script/check_budget_status.py
+    python script/check_budget_status.py --budgets 2000
+
+Exits with status 1 on an error response or a mismatch.
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+
+from benchmark_common import create_user, load_app, shutdown
+
+BUDGETS = 600
+CATEGORIES = ["Food", "Transport", "Rent", "Fun"]
+AS_OF = date(2024, 6, 15)
+
+
+def seed(main, user_id, budgets):
+    """Adds the budgets and a year of expenses; returns the expenses."""
+    import models
+    from models import FrequencyEnum
+
+    expenses = [
+        (CATEGORIES[n % len(CATEGORIES)], date(2024, 1, 1) + timedelta(days=n), n + 1)
+        for n in range(366)
+    ]
+    with main.SessionLocal() as db:
+        for n in range(budgets):
+            db.add(
+                models.Budget(
+                    user_id=user_id,
+                    category_name=CATEGORIES[n % len(CATEGORIES)],
+                    amount_limit=1000,
+                    period=FrequencyEnum.monthly,
+                    start_date=date(2023, 1, 1) + timedelta(days=n % 28),
+                )
+            )
+        for category, day, amount in expenses:
+            db.add(
+                models.Expense(
+                    user_id=user_id, category_name=category, date=day, amount=amount
+                )
+            )
+        db.commit()
+    return expenses
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budgets", type=int, default=BUDGETS)
+    args = parser.parse_args()
+
+    main = load_app()
+    from fastapi.testclient import TestClient
+
+    with TestClient(main.app) as client:
+        user_id = create_user(main)
+        expenses = seed(main, user_id, args.budgets)
+        response = client.get(
+            f"/budgets/{user_id}/status", params={"as_of": AS_OF.isoformat()}
+        )
+    shutdown(main)
+    if response.status_code != 200:
+        print(f"{args.budgets} budgets: HTTP {response.status_code}")
+        sys.exit(1)
+
+    statuses = response.json()
+    mismatches = 0
+    for budget in statuses:
+        first = date.fromisoformat(budget["period_start"])
+        last = date.fromisoformat(budget["period_end"])
+        in_window = [
+            amount
+            for category, day, amount in expenses
+            if category == budget["category_name"] and first <= day <= last
+        ]
+        if (budget["spent"], budget["expense_count"]) != (
+            float(sum(in_window)),
+            len(in_window),
+        ):
+            mismatches += 1
+    print(f"{args.budgets} budgets: {len(statuses)} statuses, {mismatches} mismatches")
+    if len(statuses) != args.budgets or mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,68 @@
+"""Shows where ``import main`` spends its time (``python -X importtime``).
+
+Imports the API in a fresh interpreter against a throw-away data directory
+and lists the slowest modules by cumulative and by self time, then checks
+that none of the report-only libraries were loaded at start-up:
+
+    python script/profile_imports.py
+    python script/profile_imports.py --top 40 --module pdf_reports
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmark_common import APP_DIR
+
+TOP = 25
+# Only needed once a report, forecast or CSV import is requested
+REPORT_ONLY = ["pandas", "numpy", "reportlab", "PyPDF2", "openpyxl"]
+
+
+def import_times(module):
+    """[(module, self_us, cumulative_us)] for importing ``module``."""
+    env = {**os.environ, "SETA_USER_DATA_PATH": tempfile.mkdtemp(prefix="seta_imp_")}
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main", help="Module to import")
+    parser.add_argument("--top", type=int, default=TOP)
+    args = parser.parse_args()
+
+    rows = import_times(args.module)
+    total = next(cumulative for name, _, cumulative in rows if name == args.module)
+    print(f"import {args.module}: {total / 1e6:.3f} s\n")
+    for title, key in (("cumulative", 2), ("self", 1)):
+        print(f"Slowest by {title} time:")
+        for row in sorted(rows, key=lambda row: row[key], reverse=True)[: args.top]:
+            print(f"  {row[key] / 1000:>9.1f} ms  {row[0]}")
+        print()
+
+    loaded = {name.split(".")[0] for name, *_ in rows}
+    eager = [name for name in REPORT_ONLY if name in loaded]
+    if args.module == "main" and eager:
+        print(f"Report-only libraries imported at start-up: {', '.join(eager)}")
+        sys.exit(1)
+    print(f"Not imported: {', '.join(n for n in REPORT_ONLY if n not in loaded)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""add composite (user_id, date) indexes on user-owned tables
+
+Revision ID: a3f9c2d1e8b4
+Revises: 15e828054ccf
+Create Date: 2026-10-17 10:12:41.503217
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3f9c2d1e8b4"
+down_revision: Union[str, None] = "15e828054ccf"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns) - mirrors __table_args__ in app/models.py
+INDEXES = [
+    ("ix_expenses_user_id_date_id", "expenses", ["user_id", "date", "id"]),
+    (
+        "ix_expenses_user_id_category_name_date",
+        "expenses",
+        ["user_id", "category_name", "date"],
+    ),
+    ("ix_expenses_user_id_account_id", "expenses", ["user_id", "account_id"]),
+    ("ix_income_user_id_date_id", "income", ["user_id", "date", "id"]),
+    ("ix_income_user_id_source_date", "income", ["user_id", "source", "date"]),
+    ("ix_income_user_id_account_id", "income", ["user_id", "account_id"]),
+    (
+        "ix_recurring_expenses_user_id_start_date",
+        "recurring_expenses",
+        ["user_id", "start_date"],
+    ),
+    (
+        "ix_recurring_expenses_user_id_category_name",
+        "recurring_expenses",
+        ["user_id", "category_name"],
+    ),
+    (
+        "ix_recurring_expenses_user_id_account_id",
+        "recurring_expenses",
+        ["user_id", "account_id"],
+    ),
+    (
+        "ix_budgets_user_id_category_name_start_date",
+        "budgets",
+        ["user_id", "category_name", "start_date"],
+    ),
+    ("ix_goals_user_id", "goals", ["user_id"]),
+    ("ix_accounts_user_id", "accounts", ["user_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,69 @@
+"""add monthly_summaries rollup table
+
+Revision ID: c71e4b9a2d05
+Revises: a3f9c2d1e8b4
+Create Date: 2026-10-17 14:36:05.118402
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c71e4b9a2d05"
+down_revision: Union[str, None] = "a3f9c2d1e8b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (kind, source table, category column) - mirrors app/summaries.py
+SOURCES = [("expense", "expenses", "category_name"), ("income", "income", "source")]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "monthly_summaries",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=10), nullable=False),
+        sa.Column("month", sa.String(length=7), nullable=True),
+        sa.Column("category", sa.String(), nullable=True),
+        sa.Column("account_id", sa.Integer(), nullable=True),
+        sa.Column("total", sa.Numeric(), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.Column("max_amount", sa.Numeric(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_monthly_summaries_user_id_kind_month",
+        "monthly_summaries",
+        ["user_id", "kind", "month"],
+        unique=False,
+    )
+
+    # Backfill from the existing transactions
+    if op.get_bind().dialect.name == "postgresql":
+        month = "to_char(date, 'YYYY-MM')"
+    else:
+        month = "strftime('%Y-%m', date)"
+    for kind, table, category in SOURCES:
+        op.execute(f"""
+            INSERT INTO monthly_summaries (user_id, kind, month, category,
+                account_id, total, transaction_count, max_amount)
+            SELECT user_id, '{kind}', {month}, {category}, account_id,
+                SUM(amount), COUNT(id), MAX(amount)
+            FROM {table}
+            GROUP BY user_id, {month}, {category}, account_id
+            """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_monthly_summaries_user_id_kind_month", table_name="monthly_summaries"
+    )
+    op.drop_table("monthly_summaries")
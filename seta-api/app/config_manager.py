@@ -1,11 +1,20 @@
 # seta-api/app/config_manager.py
+import copy
 import json
 import os
+import ssl
 import sys
+import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, TypedDict
 import logging
 
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
 logger = logging.getLogger(__name__)
 
 # Determine the base path based on whether the app is frozen (packaged by PyInstaller)
@@ -53,6 +62,11 @@ DEFAULT_CLOUD_DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres.wu
 LOCAL_SQLITE_URL = f"sqlite:///{LOCAL_DB_PATH.as_posix()}" # Use as_posix() for cross-platform path
 
 
+class DatabaseConfig(TypedDict):
+    """The "database" section of seta_config.json."""
+    type: str           # "local", "cloud" or "custom"
+    url: Optional[str]  # Only used by "custom"
+
 DEFAULT_CONFIG = {
     "database": {
         "type": "local", # Default to local for desktop app
@@ -60,7 +74,67 @@ DEFAULT_CONFIG = {
     }
 }
 
+# The parsed config is kept in memory. The file is stat()ed at most once per
+# CONFIG_CHECK_INTERVAL seconds and only re-read when its mtime/size/inode
+# changed, so edits made by hand (or by another process) are picked up
+# without every read touching the disk.
+CONFIG_CHECK_INTERVAL = 1.0
+_config_lock = threading.RLock()
+_config = None
+_config_stamp = None
+_config_checked_at = 0.0
+
+# Engine tuning, overridable per key through an "engine" section in
+# seta_config.json (missing keys keep these defaults).
+DEFAULT_ENGINE_SETTINGS = {
+    "pool_size": 5,         # Connections kept open per engine
+    "max_overflow": 10,     # Extra connections allowed under load
+    "pool_timeout": 30,     # Seconds to wait for a free connection
+    "pool_recycle": 1800,   # Reconnect after this many seconds (-1 = never); poolers drop idle links
+    "pool_pre_ping": True,  # Test connections on checkout; survives server restarts
+    "sqlite": {             # PRAGMAs run on every new SQLite connection (null = leave as is)
+        "journal_mode": "WAL",      # Readers don't block on the writer (and vice versa)
+        "synchronous": "NORMAL",    # Safe with WAL; fsync at checkpoints, not every commit
+        "busy_timeout": 5000,       # ms to wait for a lock before "database is locked"
+        "mmap_size": 268435456,     # 256 MB memory-mapped reads
+        "cache_size": -65536,       # Page cache; negative = KiB (64 MB)
+        "temp_store": "MEMORY",     # Sorts/temp indexes for GROUP BY stay in RAM
+    },
+}
+
+def _config_file_stamp():
+    try:
+        stat = CONFIG_FILE_PATH.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+def _current_config(check: bool = False):
+    """The cached config dict (don't mutate it); re-read if the file changed.
+
+    ``check=True`` stats the file now instead of waiting for the interval.
+    """
+    global _config, _config_stamp, _config_checked_at
+    with _config_lock:
+        now = time.monotonic()
+        if _config is not None and not check and now - _config_checked_at < CONFIG_CHECK_INTERVAL:
+            return _config
+        _config_checked_at = now
+        stamp = _config_file_stamp()
+        if _config is None or stamp != _config_stamp:
+            # Stamp taken first: a write racing the read just causes one more read
+            _config, _config_stamp = _read_config_file(), stamp
+        return _config
+
 def load_config():
+    """Returns a copy of the configuration (cached; see CONFIG_CHECK_INTERVAL)."""
+    return copy.deepcopy(_current_config())
+
+def refresh_config():
+    """Re-checks the config file now rather than after CONFIG_CHECK_INTERVAL."""
+    _current_config(check=True)
+
+def _read_config_file():
     """Loads the configuration from the JSON file."""
     if not CONFIG_FILE_PATH.exists():
         logger.warning(f"Config file not found at {CONFIG_FILE_PATH}. Creating default.")
@@ -80,18 +154,47 @@ def load_config():
         return DEFAULT_CONFIG # Return default on error
 
 def save_config(config_data):
-    """Saves the configuration to the JSON file."""
-    try:
-        with open(CONFIG_FILE_PATH, 'w') as f:
-            json.dump(config_data, f, indent=2)
-        logger.info(f"Configuration saved to {CONFIG_FILE_PATH}")
-    except IOError as e:
-        logger.error(f"Error saving config file {CONFIG_FILE_PATH}: {e}", exc_info=True)
+    """Saves the configuration to the JSON file.
+
+    Written to a temporary file in the same directory and renamed over the
+    old one, so readers (and a crash) see either the old or the new file,
+    never a partial one.
+    """
+    global _config, _config_stamp, _config_checked_at
+    with _config_lock:
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=CONFIG_FILE_PATH.parent, prefix=".seta_config.", suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(config_data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, CONFIG_FILE_PATH)
+            temp_path = None
+            _config = copy.deepcopy(config_data)
+            _config_stamp = _config_file_stamp()
+            _config_checked_at = time.monotonic()
+            logger.info(f"Configuration saved to {CONFIG_FILE_PATH}")
+        except IOError as e:
+            logger.error(f"Error saving config file {CONFIG_FILE_PATH}: {e}", exc_info=True)
+        finally:
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+def get_database_config() -> DatabaseConfig:
+    """The configured "database" section."""
+    config = _current_config()
+    return dict(config.get("database", DEFAULT_CONFIG["database"]))
 
-def get_database_url():
+def get_database_url() -> str:
     """Determines the correct DATABASE_URL based on the config."""
-    config = load_config()
-    db_config = config.get("database", DEFAULT_CONFIG["database"])
+    return resolve_database_url(get_database_config())
+
+def resolve_database_url(db_config: DatabaseConfig) -> str:
+    """The DATABASE_URL for a "database" config section ({"type", "url"})."""
     db_type = db_config.get("type", "local")
 
     if db_type == "cloud":
@@ -109,25 +212,160 @@ def get_database_url():
     logger.info(f"Using Local SQLite Database: {LOCAL_DB_PATH}")
     return LOCAL_SQLITE_URL
 
-def update_database_config(db_type: str, custom_url: Optional[str] = None):
-    """Updates the database configuration in the file."""
+POSTGRES_SYNC_PREFIXES = ("postgresql+psycopg2://", "postgresql://", "postgres://")
+# URL query parameters SQLAlchemy's asyncpg dialect passes on to asyncpg.connect()
+ASYNCPG_URL_PARAMS = {
+    "command_timeout", "statement_cache_size", "max_cached_statement_lifetime",
+    "max_cacheable_statement_size", "prepared_statement_cache_size",
+    "target_session_attrs", "krbsrvname", "gsslib", "passfile", "direct_tls",
+}
+LIBPQ_SSL_PARAMS = ("sslmode", "sslrootcert", "sslcert", "sslkey")
+
+def _asyncpg_ssl(query: dict):
+    """asyncpg's ``ssl`` argument for libpq's sslmode/sslrootcert/sslcert/sslkey."""
+    mode = query.get("sslmode", "prefer")
+    if not any(query.get(name) for name in LIBPQ_SSL_PARAMS[1:]):
+        return mode # asyncpg takes the libpq mode names as they are
+    if mode in ("disable", "allow", "prefer"):
+        logger.warning(f"Ignoring sslrootcert/sslcert/sslkey with sslmode={mode}.")
+        return mode
+    # Like libpq, "require" verifies the server certificate once a root CA is given
+    context = ssl.create_default_context(cafile=query.get("sslrootcert"))
+    context.check_hostname = mode == "verify-full"
+    if not query.get("sslrootcert") and mode == "require":
+        context.verify_mode = ssl.CERT_NONE
+    if query.get("sslcert"):
+        context.load_cert_chain(query["sslcert"], query.get("sslkey"))
+    return context
+
+def _split_asyncpg_url(url: str):
+    """(URL, connect_args) for asyncpg from a psycopg2/libpq style PostgreSQL URL.
+
+    asyncpg.connect() rejects libpq options such as ``sslmode``, which the
+    dialect would pass it straight from the query string. SSL settings become
+    its ``ssl`` argument, ``connect_timeout`` its ``timeout`` and
+    ``application_name`` a server setting; other libpq-only options are
+    dropped with a warning.
+    """
+    parsed = make_url(url)
+    query = {name: value if isinstance(value, str) else value[-1] for name, value in parsed.query.items()}
+    connect_args = {}
+    if any(name in query for name in LIBPQ_SSL_PARAMS):
+        connect_args["ssl"] = _asyncpg_ssl(query)
+    if "connect_timeout" in query:
+        connect_args["timeout"] = float(query["connect_timeout"])
+    if "application_name" in query:
+        connect_args["server_settings"] = {"application_name": query["application_name"]}
+    handled = set(LIBPQ_SSL_PARAMS) | {"connect_timeout", "application_name"}
+    dropped = sorted(set(query) - handled - ASYNCPG_URL_PARAMS)
+    if dropped:
+        logger.warning(f"Ignoring database URL options asyncpg doesn't support: {', '.join(dropped)}")
+    kept = {name: value for name, value in parsed.query.items() if name in ASYNCPG_URL_PARAMS}
+    async_url = parsed.set(drivername="postgresql+asyncpg", query=kept)
+    return async_url.render_as_string(hide_password=False), connect_args
+
+def get_async_database_url(database_url: Optional[str] = None):
+    """Maps a sync SQLAlchemy URL onto its asyncio driver (aiosqlite / asyncpg).
+
+    libpq options that asyncpg doesn't accept are removed from PostgreSQL URLs;
+    ``create_db_engine`` passes their asyncpg equivalents as connect_args.
+    """
+    url = database_url or get_database_url()
+    if url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    if url.startswith(POSTGRES_SYNC_PREFIXES):
+        return _split_asyncpg_url(url)[0]
+    # Already async (or an unknown dialect) - pass through unchanged
+    return url
+
+def make_database_config(db_type: str, custom_url: Optional[str] = None) -> DatabaseConfig:
+    """Validates a database choice; returns it as a "database" config section."""
     if db_type not in ["local", "cloud", "custom"]:
         raise ValueError("Invalid database type specified.")
     if db_type == "custom" and not custom_url:
          raise ValueError("Custom URL must be provided for 'custom' database type.")
-
-    config = load_config()
-    config["database"] = {
+    return {
         "type": db_type,
         "url": custom_url if db_type == "custom" else None
     }
-    save_config(config)
+
+def update_database_config(db_type: str, custom_url: Optional[str] = None) -> DatabaseConfig:
+    """Updates the database configuration in the file."""
+    database = make_database_config(db_type, custom_url)
+    with _config_lock: # No other save in this process between the read and the write
+        config = load_config()
+        config["database"] = database
+        save_config(config)
     return config["database"] # Return the saved config part
 
-def is_local_db_configured():
+def get_engine_settings(config: Optional[dict] = None):
+    """Engine settings: DEFAULT_ENGINE_SETTINGS overlaid with the config's "engine" section."""
+    config = _current_config() if config is None else config
+    overrides = config.get("engine") or {}
+    settings = copy.deepcopy(DEFAULT_ENGINE_SETTINGS)
+    for key, value in overrides.items():
+        if key == "sqlite" and isinstance(value, dict):
+            settings["sqlite"].update(value)
+        elif key in settings:
+            settings[key] = value
+        else:
+            logger.warning(f"Ignoring unknown engine setting '{key}' in {CONFIG_FILE_PATH}.")
+    return settings
+
+def _apply_sqlite_pragmas(engine, pragmas: dict):
+    """Runs the configured PRAGMAs on every new DBAPI connection of ``engine``."""
+    statements = [
+        f"PRAGMA {name}={value}" for name, value in pragmas.items() if value is not None
+    ]
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+def create_db_engine(database_url: Optional[str] = None, asynchronous: bool = False, settings: Optional[dict] = None):
+    """Creates the SQLAlchemy engine for a database URL with the configured tuning.
+
+    ``asynchronous=True`` returns an AsyncEngine on the matching async driver
+    (see ``get_async_database_url``). Pool settings apply to every pooled
+    engine; the SQLite PRAGMAs are applied on connect for SQLite files.
+    """
+    url = database_url or get_database_url()
+    settings = settings or get_engine_settings()
+    kwargs = {}
+    if asynchronous and url.startswith(POSTGRES_SYNC_PREFIXES):
+        url, kwargs["connect_args"] = _split_asyncpg_url(url)
+    elif asynchronous:
+        url = get_async_database_url(url)
+    is_sqlite = url.startswith("sqlite")
+    in_memory = is_sqlite and (":memory:" in url or url.rstrip("/").endswith("sqlite:"))
+
+    if not in_memory:  # In-memory SQLite uses a single shared connection, no pool
+        kwargs.update(
+            pool_size=settings["pool_size"],
+            max_overflow=settings["max_overflow"],
+            pool_timeout=settings["pool_timeout"],
+            pool_recycle=settings["pool_recycle"],
+            pool_pre_ping=settings["pool_pre_ping"],
+        )
+    if is_sqlite and not asynchronous:
+        kwargs["connect_args"] = {"check_same_thread": False}
+
+    if asynchronous:
+        engine = create_async_engine(url, **kwargs)
+    else:
+        engine = create_engine(url, **kwargs)
+    if is_sqlite and not in_memory:
+        _apply_sqlite_pragmas(engine.sync_engine if asynchronous else engine, settings["sqlite"])
+    return engine
+
+def is_local_db_configured() -> bool:
     """Checks if the current configuration points to the local SQLite DB."""
-    config = load_config()
-    return config.get("database", {}).get("type") == "local"
+    return get_database_config().get("type") == "local"
 
 def get_local_db_path():
     """Returns the path to the local SQLite database file."""
@@ -0,0 +1,163 @@
+# seta-api/app/csv_import.py
+"""Vectorised parsing and validation of expense and income CSV uploads.
+
+main.py streams an upload through ``read_csv_chunks`` and hands each chunk to
+``validate_expense_csv_chunk`` / ``validate_income_csv_chunk``, which return
+the rows to insert plus per-line errors. Kept out of main.py because pandas
+is slow to import; main imports this module on the first CSV upload.
+"""
+
+from typing import List
+
+import pandas as pd
+
+
+def read_csv_header(file_obj) -> List[str]:
+    """Returns the CSV's column names and rewinds the file."""
+    try:
+        columns = list(pd.read_csv(file_obj, nrows=0, dtype=str, encoding="utf-8"))
+    except pd.errors.EmptyDataError:
+        columns = []
+    file_obj.seek(0)
+    return columns
+
+
+def read_csv_chunks(file_obj, columns: List[str], chunksize: int):
+    """Reader yielding ``chunksize``-row DataFrames of ``columns`` as strings."""
+    return pd.read_csv(
+        file_obj,
+        usecols=columns,
+        dtype=str,
+        keep_default_na=False,
+        encoding="utf-8",
+        chunksize=chunksize,
+    )
+
+
+def csv_column(chunk: pd.DataFrame, name: str) -> pd.Series:
+    """A string column of ``chunk``, or empty strings if the CSV lacks it."""
+    if name in chunk:
+        return chunk[name].fillna("")
+    return pd.Series("", index=chunk.index, dtype=object)
+
+
+def flag_csv_rows(problems: pd.Series, mask: pd.Series, message) -> None:
+    """Records ``message`` for rows in ``mask`` that have no problem yet."""
+    mask = mask & problems.isna()
+    problems[mask] = message[mask] if isinstance(message, pd.Series) else message
+
+
+def check_csv_transactions(chunk: pd.DataFrame, name_column: str, name_label: str):
+    """Vectorised checks shared by the expense and income CSV imports.
+
+    Returns parsed ``(dates, amounts, names, descriptions, problems)`` where
+    ``problems`` holds the first error of each rejected row (None if valid),
+    checked in the same order as the old row-by-row parser.
+    """
+    date_raw = csv_column(chunk, "date")
+    amount_raw = csv_column(chunk, "amount")
+    name_raw = csv_column(chunk, name_column)
+    dates = pd.to_datetime(date_raw, format="%Y-%m-%d", errors="coerce")
+    amounts = pd.to_numeric(amount_raw, errors="coerce")
+    names = name_raw.str.strip()
+    descriptions = csv_column(chunk, "description").str.strip()
+
+    problems = pd.Series(None, index=chunk.index, dtype=object)
+    flag_csv_rows(
+        problems,
+        (date_raw == "") | (amount_raw == "") | (name_raw == ""),
+        f"Missing required value(s) (date, amount, {name_column})",
+    )
+    flag_csv_rows(
+        problems,
+        dates.isna(),
+        "Invalid date format: '" + date_raw + "'. Use YYYY-MM-DD.",
+    )
+    flag_csv_rows(
+        problems,
+        ~(amounts > 0),
+        "Invalid amount value: '" + amount_raw + "'. Must be a positive number.",
+    )
+    flag_csv_rows(problems, names == "", f"{name_label} cannot be empty.")
+    return dates, amounts, names, descriptions, problems
+
+
+def collect_csv_problems(problems: pd.Series, first_line: int):
+    """Turns a chunk's ``problems`` into (valid mask, errors, skipped lines)."""
+    bad = problems.notna()
+    line_numbers = range(first_line, first_line + len(problems))
+    errors, skipped = [], []
+    for line_number, problem, is_bad in zip(line_numbers, problems, bad):
+        if is_bad:
+            errors.append(f"Row {line_number}: {problem}")
+            skipped.append(line_number)
+    return ~bad, errors, skipped
+
+
+def validate_expense_csv_chunk(chunk: pd.DataFrame, first_line: int, user_id: int):
+    """Validates one chunk of an expense CSV; returns (rows, errors, skipped)."""
+    dates, amounts, names, descriptions, problems = check_csv_transactions(
+        chunk, "category_name", "Category name"
+    )
+    valid, errors, skipped = collect_csv_problems(problems, first_line)
+    rows = [
+        {
+            "user_id": user_id,
+            "amount": amount,
+            "date": expense_date,
+            "category_name": category_name,
+            "description": description or None,
+        }
+        for amount, expense_date, category_name, description in zip(
+            amounts[valid].tolist(),
+            dates[valid].dt.date,
+            names[valid],
+            descriptions[valid],
+        )
+    ]
+    return rows, errors, skipped
+
+
+def validate_income_csv_chunk(
+    chunk: pd.DataFrame, first_line: int, user_id: int, account_ids: set
+):
+    """Validates one chunk of an income CSV; returns (rows, errors, skipped).
+
+    ``account_ids`` are the user's account ids, fetched once per import.
+    """
+    dates, amounts, sources, descriptions, problems = check_csv_transactions(
+        chunk, "source", "Source"
+    )
+    account_raw = csv_column(chunk, "account_id").str.strip()
+    has_account = account_raw != ""
+    account_numeric = account_raw.str.fullmatch(r"[+-]?\d+")
+    flag_csv_rows(
+        problems,
+        has_account & ~account_numeric,
+        "Invalid Account ID: '" + account_raw + "'. Must be a number.",
+    )
+    account_values = pd.to_numeric(account_raw.where(has_account & account_numeric))
+    flag_csv_rows(
+        problems,
+        has_account & ~account_values.isin(account_ids),
+        "Account ID '" + account_raw + "' not found for this user.",
+    )
+    valid, errors, skipped = collect_csv_problems(problems, first_line)
+    rows = [
+        {
+            "user_id": user_id,
+            "amount": amount,
+            "date": income_date,
+            "source": source,
+            "description": description or None,
+            "account_id": None if pd.isna(account_id) else int(account_id),
+        }
+        for amount, income_date, source, description, account_id in zip(
+            amounts[valid].tolist(),
+            dates[valid].dt.date,
+            sources[valid],
+            descriptions[valid],
+            account_values[valid],
+        )
+    ]
+    return rows, errors, skipped
@@ -0,0 +1,93 @@
+# seta-api/app/db_engines.py
+"""Database engines that can be replaced while the API is running.
+
+main.py's ``SessionLocal`` and ``AsyncSessionLocal`` factories are bound to
+the engines of one ``EngineSet``. Switching databases builds and warms a new
+set off to the side, then re-binds the factories in one step. Requests that
+already hold a session finish on the old engines, and every session opened
+afterwards uses the new ones. The old set is disposed once all its
+connections have been returned (``drain``).
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config_manager import create_db_engine, get_engine_settings
+
+logger = logging.getLogger(__name__)
+
+# Longest an old engine set waits for requests still using it
+DRAIN_TIMEOUT = 30.0
+DRAIN_POLL_INTERVAL = 0.05
+
+
+@dataclass
+class EngineSet:
+    url: str
+    engine: Engine  # Schema creation and offline scripts
+    async_engine: AsyncEngine  # Request handlers
+
+
+def build(database_url: str, settings: Optional[dict] = None) -> EngineSet:
+    """Creates (but doesn't connect) the sync and async engines for a URL."""
+    settings = settings or get_engine_settings()
+    return EngineSet(
+        url=database_url,
+        engine=create_db_engine(database_url, settings=settings),
+        async_engine=create_db_engine(
+            database_url, asynchronous=True, settings=settings
+        ),
+    )
+
+
+async def warm(engines: EngineSet, connections: Optional[int] = None) -> None:
+    """Opens ``connections`` (default: pool_size) async connections at once,
+    plus one sync connection, so the first requests don't pay for connecting.
+
+    Raises whatever the driver raises when the database can't be reached.
+    """
+    if connections is None:
+        connections = get_engine_settings()["pool_size"]
+
+    async def ping():
+        async with engines.async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    def ping_sync():
+        with engines.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    await asyncio.gather(
+        asyncio.to_thread(ping_sync), *(ping() for _ in range(max(1, connections)))
+    )
+
+
+def _checked_out(engine) -> int:
+    # Pools without checkout tracking (single-connection SQLite) report none
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return checkedout() if checkedout else 0
+
+
+async def dispose(engines: EngineSet) -> None:
+    await engines.async_engine.dispose()
+    engines.engine.dispose()
+
+
+async def drain(engines: EngineSet, timeout: float = DRAIN_TIMEOUT) -> None:
+    """Disposes ``engines`` once no connection is checked out (or on timeout)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and (
+        _checked_out(engines.async_engine.sync_engine) or _checked_out(engines.engine)
+    ):
+        await asyncio.sleep(DRAIN_POLL_INTERVAL)
+    if _checked_out(engines.async_engine.sync_engine) or _checked_out(engines.engine):
+        logger.warning(
+            "Disposing the previous database engines with connections still in use."
+        )
+    await dispose(engines)
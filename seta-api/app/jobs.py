@@ -0,0 +1,279 @@
+# seta-api/app/jobs.py
+"""Local background jobs for long-running reports and imports.
+
+Jobs live in a small SQLite database in the user data directory (separate
+from the app database, so it works the same for local and cloud setups) and
+run in a process pool, so heavy PDF/Excel builds neither block the API's
+event loop nor share one core. Workers import ``main`` and run
+``main.execute_job``, which owns the per-kind handlers.
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    delete,
+    select,
+    update,
+)
+
+from config_manager import USER_DATA_PATH, create_db_engine
+
+logger = logging.getLogger(__name__)
+
+JOBS_DB_PATH = USER_DATA_PATH / "seta_jobs.db"
+JOB_FILES_DIR = USER_DATA_PATH / "job_files"
+# Leave a core for the API process itself
+MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+# Finished jobs (and their result files) are pruned after this long
+JOB_RETENTION = timedelta(days=7)
+
+# True in job worker processes; they render PDFs in-thread (see pdf_reports)
+IN_WORKER = False
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+metadata = MetaData()
+
+jobs_table = Table(
+    "jobs",
+    metadata,
+    Column("id", String(32), primary_key=True),
+    Column("user_id", Integer, nullable=False, index=True),
+    Column("kind", String(50), nullable=False),
+    Column("status", String(20), nullable=False, default=JOB_QUEUED),
+    Column("progress", Float, nullable=False, default=0.0),
+    Column("message", Text),
+    Column("params", Text),  # JSON
+    Column("input_path", Text),  # uploaded file for import jobs
+    Column("result_path", Text),
+    Column("result_filename", Text),
+    Column("result_media_type", String(100)),
+    Column("error", Text),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("started_at", DateTime(timezone=True)),
+    Column("finished_at", DateTime(timezone=True)),
+)
+
+_engine = None
+_executor = None
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def get_engine():
+    """Engine for the job store; created on first use in each process."""
+    global _engine
+    if _engine is None:
+        JOB_FILES_DIR.mkdir(parents=True, exist_ok=True)
+        # Same tuning as the app database; WAL matters here because the API
+        # process and pool workers write concurrently
+        _engine = create_db_engine(f"sqlite:///{JOBS_DB_PATH.as_posix()}")
+        metadata.create_all(_engine)
+    return _engine
+
+
+def _row_to_dict(row):
+    job = dict(row._mapping)
+    job["params"] = json.loads(job["params"]) if job["params"] else {}
+    return job
+
+
+def create_job(user_id: int, kind: str, params: dict, input_path=None) -> dict:
+    job_id = uuid.uuid4().hex
+    with get_engine().begin() as connection:
+        connection.execute(
+            jobs_table.insert().values(
+                id=job_id,
+                user_id=user_id,
+                kind=kind,
+                status=JOB_QUEUED,
+                progress=0.0,
+                params=json.dumps(params, default=str),
+                input_path=str(input_path) if input_path else None,
+                created_at=_utcnow(),
+            )
+        )
+    return get_job(job_id)
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    with get_engine().connect() as connection:
+        row = connection.execute(
+            select(jobs_table).where(jobs_table.c.id == job_id)
+        ).first()
+    return _row_to_dict(row) if row else None
+
+
+def list_jobs(user_id: int, limit: int = 50) -> list:
+    with get_engine().connect() as connection:
+        rows = connection.execute(
+            select(jobs_table)
+            .where(jobs_table.c.user_id == user_id)
+            .order_by(jobs_table.c.created_at.desc())
+            .limit(limit)
+        ).all()
+    return [_row_to_dict(row) for row in rows]
+
+
+def update_job(job_id: str, **values) -> None:
+    with get_engine().begin() as connection:
+        connection.execute(
+            update(jobs_table).where(jobs_table.c.id == job_id).values(**values)
+        )
+
+
+def set_progress(job_id: str, progress: float, message: Optional[str] = None):
+    values = {"progress": max(0.0, min(1.0, progress))}
+    if message is not None:
+        values["message"] = message
+    update_job(job_id, **values)
+
+
+def result_path_for(job_id: str, suffix: str = ""):
+    return JOB_FILES_DIR / f"{job_id}{suffix}"
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn everywhere: forked workers would inherit the API's open
+        # database connections and event loop state. The price: when the
+        # API runs from source (python main.py), each worker re-imports
+        # main.py as __mp_main__ on start-up, running its top level (config,
+        # engines, app) once more before run_job imports it as ``main``. The
+        # frozen build skips that (freeze_support at the top of main.py).
+        _executor = ProcessPoolExecutor(
+            max_workers=MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _executor
+
+
+def _init_worker() -> None:
+    global IN_WORKER
+    IN_WORKER = True
+
+
+def submit(job_id: str, on_done=None) -> None:
+    """Queues a created job on the process pool.
+
+    ``on_done(job_id)`` is called in this process once the job has finished,
+    whether it succeeded or not.
+    """
+    future = get_executor().submit(run_job, job_id)
+
+    def _on_done(done_future):
+        # Only reached if the worker process itself died (e.g. BrokenProcessPool);
+        # handler errors are recorded by run_job.
+        error = None if done_future.cancelled() else done_future.exception()
+        if error is not None:
+            logger.error(f"Job {job_id} worker failed: {error}")
+            update_job(
+                job_id, status=JOB_FAILED, error=str(error), finished_at=_utcnow()
+            )
+        if on_done is not None:
+            on_done(job_id)
+
+    future.add_done_callback(_on_done)
+
+
+def run_job(job_id: str) -> None:
+    """Process-pool entry point."""
+    import main  # imported lazily: main imports this module
+
+    update_job(job_id, status=JOB_RUNNING, started_at=_utcnow(), message="Running")
+    try:
+        result_path, filename, media_type = asyncio.run(main.execute_job(job_id))
+    except Exception as e:
+        detail = getattr(e, "detail", None)  # HTTPException from a handler
+        if detail:
+            logger.warning(f"Job {job_id} rejected: {detail}")
+        else:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            detail = str(e)
+        update_job(
+            job_id,
+            status=JOB_FAILED,
+            error=str(detail),
+            message="Failed",
+            finished_at=_utcnow(),
+        )
+    else:
+        update_job(
+            job_id,
+            status=JOB_SUCCEEDED,
+            progress=1.0,
+            message="Completed",
+            result_path=str(result_path),
+            result_filename=filename,
+            result_media_type=media_type,
+            finished_at=_utcnow(),
+        )
+    finally:
+        job = get_job(job_id)
+        if job and job["input_path"]:
+            try:
+                os.remove(job["input_path"])
+            except OSError:
+                pass
+
+
+def recover_and_prune() -> None:
+    """Fails jobs orphaned by a previous shutdown and prunes old ones.
+
+    Call once from the API process at startup (never from workers).
+    """
+    engine = get_engine()
+    cutoff = _utcnow() - JOB_RETENTION
+    with engine.begin() as connection:
+        connection.execute(
+            update(jobs_table)
+            .where(jobs_table.c.status.in_([JOB_QUEUED, JOB_RUNNING]))
+            .values(
+                status=JOB_FAILED,
+                error="Interrupted by an application restart.",
+                finished_at=_utcnow(),
+            )
+        )
+        expired = connection.execute(
+            select(
+                jobs_table.c.id, jobs_table.c.result_path, jobs_table.c.input_path
+            ).where(jobs_table.c.created_at < cutoff)
+        ).all()
+        for _job_id, *paths in expired:
+            for path in paths:
+                if path:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+        connection.execute(delete(jobs_table).where(jobs_table.c.created_at < cutoff))
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
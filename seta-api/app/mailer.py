@@ -0,0 +1,277 @@
+# seta-api/app/mailer.py
+"""Transactional email outbox and the worker that delivers it.
+
+Request handlers never talk to the SMTP server. ``enqueue`` adds an
+``email_outbox`` row to the handler's session, so the mail is committed (or
+rolled back) together with the change that caused it, and
+``OutboxWorker.notify`` wakes the worker once the handler has committed.
+
+The worker runs on the API's event loop. It claims due rows in batches and
+sends them over one SMTP connection that stays open between batches (it is
+closed after IDLE_TIMEOUT without mail). A failed send is retried with
+exponential backoff. A permanent (5xx) rejection, or running out of
+attempts, marks the row "failed". If the server can't be reached, the rest
+of the batch waits for the next retry instead of timing out mail by mail.
+
+Claiming a row bumps its ``attempts`` (only if nobody else did first) and
+pushes ``next_attempt_at`` out by CLAIM_LEASE. A mail whose worker died
+mid-send is therefore retried later rather than lost, and several API
+processes sharing a database never send the same row at the same time.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Optional, Tuple
+
+import aiosmtplib
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+BATCH_SIZE = 50
+# Seconds between checks for retries and for mail queued by other processes
+POLL_INTERVAL = 15.0
+IDLE_TIMEOUT = 60.0  # Seconds without mail before the SMTP connection closes
+STOP_TIMEOUT = 10.0  # Seconds shutdown waits for the batch being sent
+CLAIM_LEASE = timedelta(minutes=5)
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+# Sent rows are deleted after this long; failed ones are kept for inspection
+SENT_RETENTION = timedelta(days=7)
+PRUNE_INTERVAL = 3600.0
+
+Outbox = models.EmailOutbox
+
+
+@dataclass(frozen=True)
+class MailSettings:
+    host: str
+    port: int
+    sender: str
+    username: Optional[str] = None  # None: don't log in
+    password: Optional[str] = None
+    start_tls: bool = False
+    use_tls: bool = False  # Implicit TLS (SMTPS)
+    validate_certs: bool = True
+    timeout: float = 30.0
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def backoff(attempts: int) -> timedelta:
+    """Delay before retrying a mail whose ``attempts``-th try failed."""
+    return min(BACKOFF_BASE * 2 ** max(attempts - 1, 0), BACKOFF_MAX)
+
+
+def enqueue(db: AsyncSession, recipient: str, subject: str, html: str) -> Outbox:
+    """Adds an HTML mail to ``db``'s transaction; it is sent after the commit."""
+    mail = Outbox(
+        recipient=recipient,
+        subject=subject,
+        body=html,
+        status=PENDING,
+        attempts=0,
+        next_attempt_at=utcnow(),
+    )
+    db.add(mail)
+    return mail
+
+
+class OutboxWorker:
+    def __init__(self, session_factory, settings: MailSettings):
+        self.session_factory = session_factory
+        self.settings = settings
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._last_used = 0.0
+        self._pruned_at = 0.0
+
+    def start(self) -> None:
+        self._stopping = False
+        self._wake = asyncio.Event()  # Bound to the running loop
+        self._task = asyncio.create_task(self._run())
+
+    def notify(self) -> None:
+        """Wakes the worker; call after committing rows added with ``enqueue``."""
+        self._wake.set()
+
+    async def stop(self) -> None:
+        """Lets the batch being sent finish (up to STOP_TIMEOUT), then closes."""
+        if self._task is not None:
+            self._stopping = True
+            self._wake.set()
+            try:
+                await asyncio.wait_for(self._task, STOP_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass  # wait_for cancelled it; claimed rows are retried later
+            self._task = None
+        await self._disconnect()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                claimed = await self.deliver_due()
+                if time.monotonic() - self._pruned_at > PRUNE_INTERVAL:
+                    await self.prune()
+            except Exception:
+                logger.error("Email outbox delivery failed.", exc_info=True)
+                claimed = 0
+            if claimed == BATCH_SIZE:
+                continue  # There may be more due right now
+            if self._smtp and time.monotonic() - self._last_used > IDLE_TIMEOUT:
+                await self._disconnect()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), POLL_INTERVAL)
+
+    async def deliver_due(self) -> int:
+        """Sends one batch of due mail; returns how many rows were claimed."""
+        async with self.session_factory() as db:
+            now = utcnow()
+            due = (
+                await db.execute(
+                    select(Outbox.id, Outbox.attempts)
+                    .where(Outbox.status == PENDING, Outbox.next_attempt_at <= now)
+                    .order_by(Outbox.next_attempt_at, Outbox.id)
+                    .limit(BATCH_SIZE)
+                )
+            ).all()
+            claimed = []
+            for mail_id, attempts in due:
+                result = await db.execute(
+                    update(Outbox)
+                    .where(
+                        Outbox.id == mail_id,
+                        Outbox.status == PENDING,
+                        Outbox.attempts == attempts,
+                    )
+                    .values(attempts=attempts + 1, next_attempt_at=now + CLAIM_LEASE)
+                )
+                if result.rowcount == 1:
+                    claimed.append(mail_id)
+            await db.commit()
+            if not claimed:
+                return 0
+
+            mails = (
+                await db.scalars(
+                    select(Outbox).where(Outbox.id.in_(claimed)).order_by(Outbox.id)
+                )
+            ).all()
+            unavailable = None
+            for mail in mails:
+                if unavailable is None:
+                    try:
+                        error, permanent = await self._send(mail)
+                    except (aiosmtplib.SMTPException, OSError) as e:
+                        await self._disconnect()
+                        unavailable = f"{type(e).__name__}: {e}"
+                        logger.warning(f"Mail server unavailable: {unavailable}")
+                if unavailable is not None:
+                    error, permanent = unavailable, False
+                self._record(mail, error, permanent)
+                # One commit per mail: a crash re-sends at most the one in flight
+                await db.commit()
+            return len(claimed)
+
+    async def prune(self) -> None:
+        async with self.session_factory() as db:
+            await db.execute(
+                delete(Outbox).where(
+                    Outbox.status == SENT, Outbox.sent_at < utcnow() - SENT_RETENTION
+                )
+            )
+            await db.commit()
+        self._pruned_at = time.monotonic()
+
+    def _record(self, mail: Outbox, error: Optional[str], permanent: bool) -> None:
+        if error is None:
+            mail.status = SENT
+            mail.sent_at = utcnow()
+            mail.last_error = None
+            logger.info(f"Email '{mail.subject}' sent to {mail.recipient}")
+        elif permanent or mail.attempts >= MAX_ATTEMPTS:
+            mail.status = FAILED
+            mail.last_error = error
+            logger.error(
+                f"Giving up on email '{mail.subject}' to {mail.recipient} after "
+                f"{mail.attempts} attempt(s): {error}"
+            )
+        else:
+            mail.next_attempt_at = utcnow() + backoff(mail.attempts)
+            mail.last_error = error
+
+    async def _send(self, mail: Outbox) -> Tuple[Optional[str], bool]:
+        """Sends one mail; returns (error, permanent), (None, False) if sent.
+
+        Raises if the server can't be reached or refuses the login.
+        """
+        message = EmailMessage()
+        message["From"] = self.settings.sender
+        message["To"] = mail.recipient
+        message["Subject"] = mail.subject
+        message.set_content(mail.body, subtype="html")
+        for retry in (False, True):
+            smtp = await self._connection()
+            try:
+                await smtp.send_message(message)
+            except aiosmtplib.SMTPServerDisconnected:
+                # Servers drop idle connections; reconnect once
+                await self._disconnect()
+                if retry:
+                    raise
+                continue
+            except aiosmtplib.SMTPRecipientsRefused as e:
+                return str(e), all(r.code >= 500 for r in e.recipients)
+            except aiosmtplib.SMTPResponseException as e:
+                return f"{e.code} {e.message}", e.code >= 500
+            return None, False
+
+    async def _connection(self) -> aiosmtplib.SMTP:
+        self._last_used = time.monotonic()
+        if self._smtp is not None and self._smtp.is_connected:
+            return self._smtp
+        settings = self.settings
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.host,
+            port=settings.port,
+            use_tls=settings.use_tls,
+            start_tls=settings.start_tls,
+            validate_certs=settings.validate_certs,
+            timeout=settings.timeout,
+        )
+        await smtp.connect()
+        try:
+            if settings.username:
+                await smtp.login(settings.username, settings.password or "")
+        except BaseException:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        return smtp
+
+    async def _disconnect(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None or not smtp.is_connected:
+            return
+        try:
+            await smtp.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            smtp.close()
@@ -1,35 +1,72 @@
+import multiprocessing
+
+if __name__ == "__main__":
+    # Job and PDF workers are spawned processes, and in the frozen (PyInstaller)
+    # build each one starts by running this script. freeze_support() runs the
+    # worker and exits there, so it must come before the API set-up below.
+    multiprocessing.freeze_support()
+
+import asyncio
+import base64
 import csv
-import hashlib
 import io
 import json
 import logging
 import os  # Ideally use environment variables
 import re
 import secrets
+import shutil
 import string
+import sys
+import tempfile
+import time
 from datetime import date, datetime, timedelta, timezone  # Add timezone here
+from decimal import Decimal
 from typing import Dict, List, Optional
 
+# pandas, numpy and reportlab are slow to import, so csv_import, forecast and
+# pdf_reports are imported by the handlers that need them, not at start-up.
+import db_engines
+import jobs
+import mailer
 import models
-import pandas as pd
+import passwords
+import recurrence
+import report_cache
+import summaries
+import xlsx_writer
 from config_manager import (
+    create_db_engine,
+    get_async_database_url,
     get_database_url,
     get_local_db_path,
     is_local_db_configured,
+    make_database_config,
+    refresh_config,
+    resolve_database_url,
     update_database_config,
 )
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, File, HTTPException, Query, UploadFile, status
+from fastapi import (
+    Depends,
+    FastAPI,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
 from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import (
     FileResponse,
     HTMLResponse,
-    JSONResponse,
     RedirectResponse,
+    Response,
     StreamingResponse,
 )
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
 
 # from models import get_db, User, Expense
 from models import (
@@ -39,19 +76,38 @@ from models import (
     FrequencyEnum,
     Goal,
     Income,
+    MonthlySummary,
     RecurringExpense,
     User,
 )
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
-from PyPDF2 import PdfWriter
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.pdfgen import canvas
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
-from sqlalchemy import asc, create_engine, desc, func
-from sqlalchemy.orm import Session, sessionmaker
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    TypeAdapter,
+    ValidationError,
+    field_validator,
+)
+from typing_extensions import TypedDict
+from sqlalchemy import (
+    Date,
+    Integer,
+    String,
+    and_,
+    asc,
+    delete,
+    desc,
+    func,
+    insert,
+    inspect,
+    literal,
+    or_,
+    select,
+    union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
 
 load_dotenv()
 
@@ -225,28 +281,39 @@ logger = logging.getLogger(__name__)
 DATABASE_URL = get_database_url()  # Get URL based on config file
 # print(f"Database URL: {DATABASE_URL}")  # Debugging line to check the URL
 
-engine = create_engine(
-    DATABASE_URL,
-    # Add connect_args for SQLite if needed
-    connect_args=(
-        {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-    ),
-)
+# Pool sizing and SQLite PRAGMAs (WAL, mmap, cache...) come from the "engine"
+# section of seta_config.json; see config_manager.create_db_engine.
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the request handlers. The sync engine above is kept for
+# schema creation and offline scripts; routes must not block the event loop.
+ASYNC_DATABASE_URL = get_async_database_url(DATABASE_URL)
+async_engine = create_db_engine(DATABASE_URL, asynchronous=True)
+# expire_on_commit=False so returned ORM objects can be serialized after commit
+# without triggering a lazy (blocking) refresh.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 
-# Dependency function (no change needed here)
-def get_db():
-    db = SessionLocal()
-    try:
+
+# Dependency function
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 # --- Schema Creation for Local DB (Run on Startup if needed) ---
-def initialize_local_database():
-    if is_local_db_configured():
+def initialize_local_database(db_engine=None, local: Optional[bool] = None):
+    """Creates the local database's schema, or whatever is missing from it.
+
+    Defaults to the configured database and the module's ``engine``; a
+    database switch passes the engine it is about to use.
+    """
+    db_engine = db_engine or engine
+    if local is None:
+        local = is_local_db_configured()
+    if local:
         local_db_file = get_local_db_path()
         if not local_db_file.exists():
             logger.info(
@@ -254,7 +321,7 @@ def initialize_local_database():
             )
             try:
                 # Create all tables defined in models.py
-                models.Base.metadata.create_all(bind=engine)
+                models.Base.metadata.create_all(bind=db_engine)
                 logger.info("Database schema created successfully.")
             except Exception as e:
                 logger.error(
@@ -262,6 +329,23 @@ def initialize_local_database():
                 )
         else:
             logger.info(f"Local database file found at {local_db_file}.")
+            # Desktop installs rarely run Alembic, so make sure tables and
+            # indexes added to models.py after the file was first created
+            # exist as well.
+            try:
+                had_summaries = inspect(db_engine).has_table(
+                    MonthlySummary.__tablename__
+                )
+                models.Base.metadata.create_all(bind=db_engine)
+                for table in models.Base.metadata.sorted_tables:
+                    for index in table.indexes:
+                        index.create(bind=db_engine, checkfirst=True)
+                if not had_summaries:
+                    logger.info("Building monthly summaries for existing data...")
+                    with db_engine.begin() as connection:
+                        summaries.rebuild_monthly_summaries(connection)
+            except Exception as e:
+                logger.error(f"Failed to create missing schema: {e}", exc_info=True)
     else:
         logger.info("Not using local database, skipping schema creation check.")
 
@@ -270,6 +354,50 @@ def initialize_local_database():
 initialize_local_database()
 # --- End Schema Creation ---
 
+# Held while the database is being switched; see switch_database
+DATABASE_SWITCH_LOCK = asyncio.Lock()
+# Old engine sets still draining in the background (kept referenced until done)
+DRAINING_ENGINES = set()
+
+
+async def switch_database(
+    database_url: str, local: bool
+) -> Optional[db_engines.EngineSet]:
+    """Points every new session at ``database_url``; returns the old engines.
+
+    The new engines are built, connected and given the local schema before
+    anything is re-bound, so a database that can't be reached raises and
+    leaves the current one in use. Returns None if ``database_url`` is
+    already the current database.
+    """
+    global DATABASE_URL, ASYNC_DATABASE_URL, engine, async_engine
+    async with DATABASE_SWITCH_LOCK:
+        if database_url == DATABASE_URL:
+            return None
+        new = await run_in_threadpool(db_engines.build, database_url)
+        try:
+            await db_engines.warm(new)
+            await run_in_threadpool(initialize_local_database, new.engine, local)
+        except BaseException:
+            await db_engines.dispose(new)
+            raise
+        old = db_engines.EngineSet(DATABASE_URL, engine, async_engine)
+        SessionLocal.configure(bind=new.engine)
+        AsyncSessionLocal.configure(bind=new.async_engine)
+        DATABASE_URL, engine, async_engine = new.url, new.engine, new.async_engine
+        ASYNC_DATABASE_URL = get_async_database_url(new.url)
+        # Cached reports and ETags describe the other database's rows
+        report_cache.invalidate_all()
+        logger.info("Switched database; new sessions use the new engines.")
+        return old
+
+
+def drain_in_background(engines: db_engines.EngineSet) -> None:
+    task = asyncio.create_task(db_engines.drain(engines))
+    DRAINING_ENGINES.add(task)
+    task.add_done_callback(DRAINING_ENGINES.discard)
+
+
 LICENCE_KEY_FORMAT = re.compile(r"^[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}$")
 
 ACCEPTED_LICENCE_KEYS = {
@@ -333,20 +461,18 @@ MAIL_SSL_TLS = False
 USE_CREDENTIALS = True
 VALIDATE_CERTS = True
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=MAIL_USERNAME,
-    MAIL_PASSWORD=MAIL_NAME,
-    MAIL_FROM=MAIL_FROM,
-    MAIL_PORT=MAIL_PORT,
-    MAIL_SERVER=MAIL_SERVER,
-    MAIL_STARTTLS=MAIL_STARTTLS,
-    MAIL_SSL_TLS=MAIL_SSL_TLS,
-    USE_CREDENTIALS=USE_CREDENTIALS,
-    VALIDATE_CERTS=VALIDATE_CERTS,
+MAIL_SETTINGS = mailer.MailSettings(
+    host=MAIL_SERVER,
+    port=MAIL_PORT,
+    sender=MAIL_FROM,
+    username=MAIL_USERNAME if USE_CREDENTIALS else None,
+    password=MAIL_NAME,
+    start_tls=MAIL_STARTTLS,
+    use_tls=MAIL_SSL_TLS,
+    validate_certs=VALIDATE_CERTS,
 )
-
-
-fm = FastMail(conf)
+# Delivers queued emails in the background (started on app start-up)
+mail_outbox = mailer.OutboxWorker(AsyncSessionLocal, MAIL_SETTINGS)
 
 # --- Base URLs ---
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
@@ -414,6 +540,16 @@ class RecurringExpenseResponse(RecurringExpenseBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class RecurringOccurrenceResponse(BaseModel):
+    recurring_expense_id: int
+    due_date: date
+    name: str
+    amount: float
+    category_name: str
+    frequency: FrequencyEnum
+    account_id: Optional[int] = None
+
+
 class BudgetBase(BaseModel):
     category_name: str
     amount_limit: float
@@ -430,6 +566,20 @@ class BudgetResponse(BudgetBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BudgetStatusResponse(BaseModel):
+    budget_id: int
+    category_name: str
+    period: FrequencyEnum
+    amount_limit: float
+    # The budget period containing as_of; None when the budget isn't active then
+    period_start: Optional[date] = None
+    period_end: Optional[date] = None  # None: open-ended one_time budget
+    spent: float
+    expense_count: int
+    remaining: float  # Negative when over the limit
+    utilization: Optional[float] = None  # Percent of the limit; None if limit is 0
+
+
 class GoalBase(BaseModel):
     name: str
     target_amount: float
@@ -552,10 +702,27 @@ class BulkDeleteRequest(BaseModel):
 class PaginatedExpenseResponse(BaseModel):
     """Response model for paginated expenses."""
 
-    total_count: int
+    total_count: Optional[int] = None  # Only computed when include_total=true
+    next_cursor: Optional[str] = None  # None on the last page
     expenses: List[ExpenseResponse]
 
 
+class PaginatedIncomeResponse(BaseModel):
+    """Response model for paginated income records."""
+
+    total_count: Optional[int] = None
+    next_cursor: Optional[str] = None
+    income: List[IncomeResponse]
+
+
+class PaginatedRecurringExpenseResponse(BaseModel):
+    """Response model for paginated recurring expense rules."""
+
+    total_count: Optional[int] = None
+    next_cursor: Optional[str] = None
+    recurring_expenses: List[RecurringExpenseResponse]
+
+
 class ImportExpenseItem(BaseModel):
     """Model for a single expense item within an import request (without user_id)."""
 
@@ -722,6 +889,92 @@ class CustomReportRequest(BaseModel):
     output_format: str = Field("csv", description="Output format (csv, excel, pdf)")
 
 
+class DashboardTotals(BaseModel):
+    expense_total: float
+    expense_count: int
+    max_expense: float
+    income_total: float
+    income_count: int
+    max_income: float
+    net_flow: float
+    savings_rate: Optional[float] = None  # Percent; None when there is no income
+
+
+class DashboardPeriodAggregate(BaseModel):
+    period: str  # e.g. "2025-04" (month), "2025-W16" (week), "2025-04-18" (day)
+    expense_total: float = 0.0
+    expense_count: int = 0
+    income_total: float = 0.0
+    income_count: int = 0
+    net_flow: float = 0.0
+
+
+class DashboardGroupAggregate(BaseModel):
+    name: str  # category_name for expenses, source for income
+    total: float
+    count: int
+
+
+class DashboardAccountAggregate(BaseModel):
+    account_id: int
+    name: str
+    account_type: str
+    currency: str
+    expense_total: float  # Within the requested window
+    income_total: float  # Within the requested window
+    current_balance: float  # starting_balance + all flows since balance_date
+
+
+class DashboardAggregatesResponse(BaseModel):
+    """Pre-aggregated dashboard data for a time window (replaces full-table downloads)."""
+
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    granularity: str
+    totals: DashboardTotals
+    periods: List[DashboardPeriodAggregate]
+    expense_categories: List[DashboardGroupAggregate]
+    income_sources: List[DashboardGroupAggregate]
+    accounts: List[DashboardAccountAggregate]
+    largest_expenses: List[ExpenseResponse]
+    largest_income: List[IncomeResponse]
+
+
+class MonthlySummaryResponse(BaseModel):
+    month: Optional[str]  # YYYY-MM; None for undated transactions
+    kind: str  # "expense" or "income"
+    category: Optional[str]  # category_name for expenses, source for income
+    account_id: Optional[int]
+    total: float
+    transaction_count: int
+    max_amount: Optional[float]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ForecastSeries(BaseModel):
+    account_id: Optional[int]  # None: flows not linked to an account
+    name: str
+    currency: str
+    opening_balance: float  # Balance at the end of as_of
+    daily_net: float  # Average daily income minus non-recurring spending
+    end_balance: float
+    min_balance: float
+    min_balance_date: date
+    balances: List[float]  # End-of-day balance of each day of the horizon
+
+
+class ForecastResponse(BaseModel):
+    """Projected daily balances; balances[i] is the balance on start_date + i days."""
+
+    as_of: date
+    start_date: date
+    end_date: date
+    lookback_days: int
+    accounts: List[ForecastSeries]
+    total: List[float]  # Sum of all series per day
+
+
 # --------- Helper Functions ---------
 
 
@@ -730,8 +983,10 @@ def generate_6_digit_code() -> str:
     return "{:06d}".format(secrets.randbelow(1000000))
 
 
-async def send_password_reset_code_email(email_to: str, username: str, code: str):
-    """Sends the password reset 6-digit code via email AND reminds the user of their username."""
+def queue_password_reset_code_email(
+    db: AsyncSession, email_to: str, username: str, code: str
+):
+    """Queues the password reset 6-digit code email, which also reminds the user of their username."""
     html_content = f"""
     <html>
         <body>
@@ -745,119 +1000,259 @@ async def send_password_reset_code_email(email_to: str, username: str, code: str
         </body>
     </html>
     """
-    message = MessageSchema(
-        subject="SETA Account Recovery Information",  # Updated subject
-        recipients=[email_to],
-        body=html_content,
-        subtype=MessageType.html,
-    )
-    try:
-        await fm.send_message(message)
-        logger.info(
-            f"Account recovery (password reset code & username reminder) email sent successfully to {email_to}"
-        )
-    except Exception as e:
-        logger.error(
-            f"Error sending account recovery email to {email_to}: {e}", exc_info=True
-        )
+    mailer.enqueue(db, email_to, "SETA Account Recovery Information", html_content)
 
 
-# --- Helper function to get all user data (reusable) ---
-async def get_all_user_data_for_processing(user_id: int, db: Session):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
-        # This will be caught by the endpoint and raise HTTPException
-        return None
+def period_bucket(column, granularity: str, dialect_name: str):
+    """
+    SQL expression labelling a date column with its period, for GROUP BY.
 
-    expenses_orm = (
-        db.query(models.Expense)
-        .filter(models.Expense.user_id == user_id)
-        .order_by(models.Expense.date.desc())
-        .all()
-    )
-    income_orm = (
-        db.query(models.Income)
-        .filter(models.Income.user_id == user_id)
-        .order_by(models.Income.date.desc())
-        .all()
-    )
-    recurring_expenses_orm = (
-        db.query(models.RecurringExpense)
-        .filter(models.RecurringExpense.user_id == user_id)
-        .order_by(models.RecurringExpense.name.asc())
-        .all()
-    )
-    budgets_orm = (
-        db.query(models.Budget)
-        .filter(models.Budget.user_id == user_id)
-        .order_by(models.Budget.category_name.asc())
-        .all()
-    )
-    goals_orm = (
-        db.query(models.Goal)
-        .filter(models.Goal.user_id == user_id)
-        .order_by(models.Goal.name.asc())
-        .all()
-    )
-    accounts_orm = (
-        db.query(models.Account)
-        .filter(models.Account.user_id == user_id)
-        .order_by(models.Account.name.asc())
-        .all()
-    )
+    Labels sort chronologically as strings: YYYY, YYYY-MM, YYYY-Www, YYYY-MM-DD.
+    Weeks are ISO weeks on PostgreSQL and Monday-based %W weeks on SQLite.
+    """
+    if dialect_name == "postgresql":
+        pg_formats = {
+            "day": "YYYY-MM-DD",
+            "week": 'IYYY-"W"IW',
+            "month": "YYYY-MM",
+            "year": "YYYY",
+        }
+        return func.to_char(column, pg_formats[granularity])
+    sqlite_formats = {
+        "day": "%Y-%m-%d",
+        "week": "%Y-W%W",
+        "month": "%Y-%m",
+        "year": "%Y",
+    }
+    return func.strftime(sqlite_formats[granularity], column)
+
+
+# --- Bulk JSON serialization ---
+class JsonRows:
+    """
+    Serializes column rows for a response model straight to JSON bytes.
 
+    Bulk reads select only the model's columns (no ORM objects) and one
+    TypeAdapter over a TypedDict mirror of the model converts (Decimal to
+    float, enums to values...) and dumps the whole list inside pydantic-core.
+    This replaces a ``model_validate`` per row plus FastAPI's second pass over
+    ``response_model``; the JSON is the same as the response model's.
+    """
+
+    def __init__(self, response_model):
+        self.fields = list(response_model.model_fields)
+        row_type = TypedDict(
+            f"{response_model.__name__}Row",
+            {
+                name: field.annotation
+                for name, field in response_model.model_fields.items()
+            },
+        )
+        self.adapter = TypeAdapter(List[row_type])
+
+    def select(self, orm_model):
+        """SELECT of just the response model's columns of ``orm_model``."""
+        return select(*(getattr(orm_model, name) for name in self.fields))
+
+    def dump(self, rows) -> bytes:
+        """JSON array of ``rows`` (mappings, e.g. ``result.mappings()``)."""
+        return self.adapter.dump_json(self.adapter.validate_python(rows))
+
+    async def fetch(self, db: AsyncSession, statement) -> bytes:
+        return self.dump((await db.execute(statement)).mappings().all())
+
+
+EXPENSE_ROWS = JsonRows(ExpenseResponse)
+INCOME_ROWS = JsonRows(IncomeResponse)
+RECURRING_ROWS = JsonRows(RecurringExpenseResponse)
+OCCURRENCE_ROWS = JsonRows(RecurringOccurrenceResponse)
+BUDGET_ROWS = JsonRows(BudgetResponse)
+GOAL_ROWS = JsonRows(GoalResponse)
+ACCOUNT_ROWS = JsonRows(AccountResponse)
+
+
+def json_bytes_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    """Returns pre-serialized JSON, skipping response_model validation."""
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# --- Keyset pagination helpers ---
+PAGE_SIZE_DEFAULT = 50
+PAGE_SIZE_MAX = 500
+
+
+class PageQuery:
+    """Common query parameters for the paginated list endpoints."""
+
+    def __init__(
+        self,
+        limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+        cursor: Optional[str] = Query(
+            None, description="next_cursor from the previous page"
+        ),
+        sort_by: Optional[str] = None,
+        sort_dir: str = Query("desc", pattern="^(asc|desc)$"),
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        category: Optional[List[str]] = Query(None),
+        account_id: Optional[int] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        include_total: bool = False,
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.sort_by = sort_by
+        self.sort_dir = sort_dir
+        self.start_date = start_date
+        self.end_date = end_date
+        self.category = category
+        self.account_id = account_id
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.include_total = include_total
+
+
+def encode_page_cursor(sort_value, row_id: int) -> str:
+    """Encodes the (sort value, id) of the last row on a page as an opaque cursor."""
+    if isinstance(sort_value, (date, datetime)):
+        sort_value = sort_value.isoformat()
+    elif isinstance(sort_value, Decimal):
+        sort_value = str(sort_value)
+    payload = json.dumps([sort_value, row_id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_page_cursor(cursor: str, sort_column):
+    """Decodes a cursor back into a (sort value, id) pair typed for sort_column.
+
+    The sort value is None when the page ended on a NULL.
+    """
     try:
-        expenses_response = [
-            ExpenseResponse.model_validate(exp) for exp in expenses_orm
-        ]
-        income_response = [IncomeResponse.model_validate(inc) for inc in income_orm]
-        recurring_response = [
-            RecurringExpenseResponse.model_validate(rec)
-            for rec in recurring_expenses_orm
-        ]
-        budgets_response = [BudgetResponse.model_validate(bud) for bud in budgets_orm]
-        goals_response = [GoalResponse.model_validate(goal) for goal in goals_orm]
-        accounts_response = [
-            AccountResponse.model_validate(acc) for acc in accounts_orm
-        ]
-        user_info_response = UserResponse.model_validate(user)
-    except Exception as e:
-        logger.error(
-            f"Pydantic validation error during data processing for user {user_id}: {e}",
-            exc_info=True,
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        python_type = sort_column.type.python_type
+        if sort_value is None:
+            pass
+        elif python_type is date:
+            sort_value = date.fromisoformat(sort_value)
+        elif python_type is Decimal:
+            sort_value = Decimal(sort_value)
+        elif python_type is not str:
+            raise ValueError(f"Unsupported sort type {python_type}")
+        return sort_value, int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+
+
+async def fetch_keyset_page(
+    db: AsyncSession,
+    model,
+    query,
+    page: PageQuery,
+    sort_columns: Dict[str, object],
+    default_sort: str,
+):
+    """
+    Runs a filtered select as one keyset page ordered by (sort column, id).
+
+    Seeking past the cursor instead of using OFFSET means page N costs the same
+    as page 1. Returns (rows, next_cursor, total_count).
+
+    Rows with a NULL sort value keep the database's own place for them (first
+    ascending on SQLite, last on PostgreSQL), which is the order the indexes
+    are in, and the seek condition walks through them by id.
+    """
+    sort_by = page.sort_by or default_sort
+    if sort_by not in sort_columns:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sort_by. Use one of: {', '.join(sort_columns)}.",
+        )
+    sort_column = sort_columns[sort_by]
+    descending = page.sort_dir == "desc"
+    # NULL sorts above every value on PostgreSQL and below them on SQLite
+    nulls_last = (db.bind.dialect.name == "postgresql") != descending
+
+    def beyond(column, value):
+        return column < value if descending else column > value
+
+    total_count = None
+    if page.include_total:
+        total_count = await db.scalar(
+            select(func.count()).select_from(query.subquery())
         )
-        # This will be caught by the endpoint and raise HTTPException
-        return "validation_error"
 
-    return AllDataReportResponse(
-        user_info=user_info_response,
-        expenses=expenses_response,
-        income=income_response,
-        recurring_expenses=recurring_response,
-        budgets=budgets_response,
-        goals=goals_response,
-        accounts=accounts_response,
-        generated_at=datetime.now(timezone.utc),
+    if page.cursor:
+        last_value, last_id = decode_page_cursor(page.cursor, sort_column)
+        if last_value is None:
+            seek = and_(sort_column.is_(None), beyond(model.id, last_id))
+            if not nulls_last:
+                seek = or_(sort_column.is_not(None), seek)
+        else:
+            seek = or_(
+                beyond(sort_column, last_value),
+                and_(sort_column == last_value, beyond(model.id, last_id)),
+            )
+            if nulls_last:
+                seek = or_(seek, sort_column.is_(None))
+        query = query.where(seek)
+
+    order = sort_column.desc() if descending else sort_column.asc()
+    query = query.order_by(
+        order.nulls_last() if nulls_last else order.nulls_first(),
+        model.id.desc() if descending else model.id.asc(),
     )
 
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.scalars(query.limit(page.limit + 1))).all()
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        last_row = rows[-1]
+        next_cursor = encode_page_cursor(
+            getattr(last_row, sort_column.key), last_row.id
+        )
+    return rows, next_cursor, total_count
+
+
+def apply_page_filters(query, model, page: PageQuery, date_column, category_column):
+    """Applies the shared date/category/account/amount filters of PageQuery."""
+    if page.start_date:
+        query = query.where(date_column >= page.start_date)
+    if page.end_date:
+        query = query.where(date_column <= page.end_date)
+    if page.category:
+        query = query.where(category_column.in_(page.category))
+    if page.account_id is not None:
+        query = query.where(model.account_id == page.account_id)
+    if page.min_amount is not None:
+        query = query.where(model.amount >= page.min_amount)
+    if page.max_amount is not None:
+        query = query.where(model.amount <= page.max_amount)
+    return query
 
-def hash_password(password: str) -> str:
-    """Hash a password for storing."""
-    return hashlib.sha256(password.encode()).hexdigest()
 
+async def hash_password(password: str) -> str:
+    """Hash a password for storing (the KDF runs in the thread pool)."""
+    return await run_in_threadpool(passwords.hash_password, password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a stored password against a provided password."""
-    return hash_password(plain_password) == hashed_password
+    return await run_in_threadpool(
+        passwords.verify_password, plain_password, hashed_password
+    )
 
 
-def get_user_by_username(db: Session, username: str):
+async def get_user_by_username(db: AsyncSession, username: str):
     """Get a user by username."""
-    return db.query(models.User).filter(models.User.username == username).first()
+    return await db.scalar(select(models.User).where(models.User.username == username))
 
 
-async def send_verification_email(email_to: str, username: str, token: str):
-    """Sends the verification email."""
+def queue_verification_email(
+    db: AsyncSession, email_to: str, username: str, token: str
+):
+    """Queues the verification email; it is sent once ``db`` commits."""
     verification_link = f"{API_BASE_URL}/verify-email/{token}"
     html_content = f"""
     <html>
@@ -869,23 +1264,13 @@ async def send_verification_email(email_to: str, username: str, token: str):
         </body>
     </html>
     """
-    message = MessageSchema(
-        subject="SETA Account Activation",
-        recipients=[email_to],
-        body=html_content,
-        subtype=MessageType.html,
-    )
-    try:
-        await fm.send_message(message)
-        logger.info(f"Verification email sent to {email_to}")
-    except Exception as e:
-        logger.error(
-            f"Error sending verification email to {email_to}: {e}", exc_info=True
-        )
+    mailer.enqueue(db, email_to, "SETA Account Activation", html_content)
 
 
-async def send_password_reset_email(email_to: str, username: str, token: str):
-    """Sends the password reset email."""
+def queue_password_reset_email(
+    db: AsyncSession, email_to: str, username: str, token: str
+):
+    """Queues the password reset email; it is sent once ``db`` commits."""
     reset_link = f"{FRONTEND_BASE_URL}/reset-password/{token}"
     html_content = f"""
     <html>
@@ -899,27 +1284,12 @@ async def send_password_reset_email(email_to: str, username: str, token: str):
         </body>
     </html>
     """
-    message = MessageSchema(
-        subject="SETA Password Reset",
-        recipients=[email_to],
-        body=html_content,
-        subtype=MessageType.html,
-    )
-    try:
-        await fm.send_message(message)
-        logger.info(f"Password reset email sent successfully to {email_to}")
-    except Exception as e:
-        logger.error(
-            f"Error sending password reset email to {email_to}: {e}", exc_info=True
-        )
-        raise HTTPException(
-            status_code=500, detail="Failed to send password reset email."
-        )
+    mailer.enqueue(db, email_to, "SETA Password Reset", html_content)
 
 
-async def require_active_licence(user_id: int, db: Session = Depends(get_db)):
+async def require_active_licence(user_id: int, db: AsyncSession = Depends(get_db)):
     """Dependency to check if the user has an 'active' licence."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -943,11 +1313,35 @@ async def require_active_licence(user_id: int, db: Session = Depends(get_db)):
 # --- NEW Settings Endpoint ---
 @app.put("/settings/database", status_code=status.HTTP_200_OK)
 async def set_database_config(payload: DatabaseConfigPayload):
-    """Updates the database configuration. Requires app restart."""
+    """Switches to another database without restarting.
+
+    The new database must accept connections before anything changes; the
+    configuration is only saved once the switch succeeded. Requests already
+    running finish on the old database, whose connections are closed once
+    they are returned.
+    """
+    try:
+        database = make_database_config(payload.db_type, payload.db_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    started = time.perf_counter()
+    try:
+        old = await switch_database(
+            resolve_database_url(database), local=database["type"] == "local"
+        )
+    except Exception as e:
+        logger.warning(f"Database switch failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=400, detail=f"Could not connect to the new database: {e}"
+        )
+    switch_ms = round((time.perf_counter() - started) * 1000, 1)
+    if old is not None:
+        drain_in_background(old)
     try:
         updated_config = update_database_config(payload.db_type, payload.db_url)
         return {
-            "message": "Database configuration updated. Please restart the application for changes to take effect.",
+            "message": "Database switched. New requests use the new database.",
+            "switch_ms": switch_ms,
             "config": updated_config,
         }
     except ValueError as e:
@@ -960,75 +1354,278 @@ async def set_database_config(payload: DatabaseConfigPayload):
 
 
 # --- NEW EXPORT ENDPOINT ---
-@app.get("/export/all/{user_id}", response_class=JSONResponse)
-@app.get("/export/all/{user_id}", response_class=JSONResponse)
-async def export_all_user_data(user_id: int, db: Session = Depends(get_db)):
-    """Exports all data for a given user as a JSON file."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+# Rows fetched per round trip while streaming an export; memory stays bounded
+# by this batch size instead of by the size of the user's data.
+EXPORT_YIELD_PER = 1000
+
+# (JSON key, ORM model, response model, ordering) in backup file order
+EXPORT_SECTIONS = [
+    ("expenses", models.Expense, EXPENSE_ROWS, models.Expense.date.desc()),
+    ("income", models.Income, INCOME_ROWS, models.Income.date.desc()),
+    (
+        "recurring_expenses",
+        models.RecurringExpense,
+        RECURRING_ROWS,
+        models.RecurringExpense.name.asc(),
+    ),
+    ("budgets", models.Budget, BUDGET_ROWS, models.Budget.category_name.asc()),
+    ("goals", models.Goal, GOAL_ROWS, models.Goal.name.asc()),
+    ("accounts", models.Account, ACCOUNT_ROWS, models.Account.name.asc()),
+]
+
+# Column each section's date window (start_date/end_date) applies to
+SECTION_DATE_COLUMNS = {
+    "expenses": models.Expense.date,
+    "income": models.Income.date,
+    "recurring_expenses": models.RecurringExpense.start_date,
+    "budgets": models.Budget.start_date,
+    "goals": models.Goal.target_date,
+    "accounts": None,
+}
+USER_DATA_SECTIONS = {
+    key: (model, rows, order) for key, model, rows, order in EXPORT_SECTIONS
+}
+
+
+def user_section_query(
+    user_id: int,
+    key: str,
+    columns: Optional[List[str]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    order_by=None,
+):
+    """
+    SELECT of a user's rows of one EXPORT_SECTIONS section.
+
+    ``columns`` projects to those model columns (default: every field of the
+    section's response model); "account_name" is read through an outer join
+    on the row's account. The inclusive date window applies to the section's
+    SECTION_DATE_COLUMNS entry, and ``order_by`` replaces its ordering.
+    """
+    model, rows, default_order = USER_DATA_SECTIONS[key]
+    if columns is None:
+        statement = rows.select(model)
+    else:
+        statement = select(
+            *(getattr(model, name) for name in columns if name != "account_name")
+        )
+        if "account_name" in columns:
+            statement = statement.add_columns(
+                models.Account.name.label("account_name")
+            ).outerjoin(models.Account, models.Account.id == model.account_id)
+    statement = statement.where(model.user_id == user_id)
+    date_column = SECTION_DATE_COLUMNS[key]
+    if date_column is not None and start_date:
+        statement = statement.where(date_column >= start_date)
+    if date_column is not None and end_date:
+        statement = statement.where(date_column <= end_date)
+    return statement.order_by(default_order if order_by is None else order_by)
+
+
+async def load_user_data(
+    db: AsyncSession,
+    user_id: int,
+    sections: Optional[List[str]] = None,
+    columns: Optional[Dict[str, List[str]]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    order_by: Optional[dict] = None,
+) -> Optional[dict]:
+    """
+    Loads a user and their rows of several sections as one batch.
+
+    Returns None for an unknown user, otherwise ``{"user": User, key: [row
+    mappings]}`` for each of ``sections`` (default: all of EXPORT_SECTIONS).
+    ``columns`` and ``order_by`` hold per-section overrides and the date
+    window applies to every section; see ``user_section_query``.
+
+    On a database server the user lookup and the section queries run
+    concurrently, each section on its own pooled connection, so a remote
+    PostgreSQL costs one round trip instead of seven (the sections are then
+    not read from a single snapshot, which reports can live with). SQLite
+    has no round trips to save, so there everything runs in order on ``db``.
+    """
+    keys = list(sections or USER_DATA_SECTIONS)
+    columns = columns or {}
+    order_by = order_by or {}
+    statements = [
+        user_section_query(
+            user_id, key, columns.get(key), start_date, end_date, order_by.get(key)
         )
+        for key in keys
+    ]
 
-    try:
-        # Fetch data (ensure this function returns Pydantic models or ORM objects)
-        all_data_report = await get_all_user_data_for_report(user_id=user_id, db=db)
-
-        # Prepare the data structure for export
-        # Using model_dump() for Pydantic v2+
-        export_data_raw = {
-            "expenses": [
-                exp.model_dump(mode="json") for exp in all_data_report.expenses
-            ],
-            "income": [inc.model_dump(mode="json") for inc in all_data_report.income],
-            "recurring_expenses": [
-                rec.model_dump(mode="json")
-                for rec in all_data_report.recurring_expenses
-            ],
-            "budgets": [bud.model_dump(mode="json") for bud in all_data_report.budgets],
-            "goals": [goal.model_dump(mode="json") for goal in all_data_report.goals],
-            "accounts": [
-                acc.model_dump(mode="json") for acc in all_data_report.accounts
-            ],
-            "export_metadata": {
+    if db.bind.dialect.name == "sqlite":
+        user = await db.get(models.User, user_id)
+        results = []
+        for statement in statements if user else ():
+            results.append((await db.execute(statement)).mappings().all())
+    else:
+
+        async def fetch(statement):
+            async with AsyncSessionLocal() as section_db:
+                return (await section_db.execute(statement)).mappings().all()
+
+        user, *results = await asyncio.gather(
+            db.get(models.User, user_id), *map(fetch, statements)
+        )
+    if user is None:
+        return None
+    return {"user": user, **dict(zip(keys, results))}
+
+
+async def stream_user_export(user_id: int):
+    """Yields the backup JSON for a user section by section.
+
+    Uses its own session: the request-scoped one from ``get_db`` is closed
+    before a StreamingResponse body starts running. Sections are streamed
+    one after the other with the ``user_section_query`` statements rather
+    than batched through ``load_user_data``, which would hold them all.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield "{"
+            for key, _model, rows, _order_by in EXPORT_SECTIONS:
+                yield f"{json.dumps(key)}:["
+                result = await db.stream(
+                    user_section_query(user_id, key).execution_options(
+                        yield_per=EXPORT_YIELD_PER
+                    )
+                )
+                first = True
+                async for partition in result.mappings().partitions():
+                    chunk = rows.dump(partition)[1:-1]  # Drop the [ ]
+                    yield chunk if first else b"," + chunk
+                    first = False
+                yield "],"
+            export_metadata = {
                 "version": "1.0",
-                "exported_at": datetime.now(
-                    timezone.utc
-                ).isoformat(),  # datetime is fine
+                "exported_at": datetime.now(timezone.utc).isoformat(),
                 "user_id": user_id,
-            },
-        }
-        # *** APPLY jsonable_encoder HERE ***
-        # This will convert date objects to strings automatically
-        export_content = jsonable_encoder(export_data_raw)
+            }
+            yield f'"export_metadata":{json.dumps(export_metadata)}}}'
+        except Exception as e:
+            # Headers are already sent at this point; the client sees a
+            # truncated (invalid) JSON body.
+            logger.error(
+                f"Error streaming export for user {user_id}: {e}", exc_info=True
+            )
+            raise
 
-    except Exception as e:
-        logger.error(
-            f"Error fetching or preparing data for export (user {user_id}): {e}",
-            exc_info=True,
-        )
+
+@app.get("/export/all/{user_id}", response_class=StreamingResponse)
+async def export_all_user_data(user_id: int, db: AsyncSession = Depends(get_db)):
+    """Exports all data for a given user as a JSON file, streamed table by table."""
+    user = await db.get(models.User, user_id)
+    if not user:
         raise HTTPException(
-            status_code=500, detail="Failed to retrieve or prepare data for export."
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
     filename = f"seta_backup_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
 
-    # Return the JSON response with the JSON-serializable content
-    return JSONResponse(
-        content=export_content,  # Use the processed content
+    return StreamingResponse(
+        stream_user_export(user_id),
+        media_type="application/json",
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
 
 # --- NEW IMPORT ENDPOINT ---
+# Backup rows validated and inserted per executemany during a JSON restore
+RESTORE_CHUNK_SIZE = 2000
+
+
+def validate_restore_chunk(key, create_model, chunk, offset, user_id, errors):
+    """Validates a chunk of backup rows, returning one model (or None) per row.
+
+    The whole chunk is validated in one TypeAdapter pass; only a chunk that
+    fails is re-validated row by row to report which rows are bad.
+    """
+    chunk = [
+        dict(item, user_id=user_id) if isinstance(item, dict) else item
+        for item in chunk
+    ]
+    try:
+        return TypeAdapter(List[create_model]).validate_python(chunk)
+    except ValidationError:
+        pass
+    validated = []
+    for i, item in enumerate(chunk, start=offset + 1):
+        try:
+            validated.append(create_model.model_validate(item))
+        except ValidationError as e:
+            errors.append(f"{key.capitalize()} item {i}: Validation error - {e}")
+            validated.append(None)
+    return validated
+
+
+async def bulk_restore_section(
+    db: AsyncSession,
+    user_id: int,
+    key: str,
+    model,
+    create_model,
+    items: list,
+    errors: List[str],
+    account_id_map: Optional[dict] = None,
+    map_ids: bool = False,
+):
+    """Inserts one section of a backup with chunked Core executemany.
+
+    If ``account_id_map`` is given, each row's backup ``account_id`` is
+    rewritten to the id its account received in this restore (unknown ids
+    become None). Returns ``(imported, skipped, id_map)``; with ``map_ids``
+    ``id_map`` maps backup ids to newly assigned ids.
+    """
+    table = model.__table__
+    statement = insert(table)
+    if map_ids:
+        # Ordered RETURNING is executed row by row on some backends, so it
+        # is only requested for the small sections other rows point at.
+        statement = statement.returning(table.c.id, sort_by_parameter_order=True)
+    imported = skipped = 0
+    id_map = {}
+    for offset in range(0, len(items), RESTORE_CHUNK_SIZE):
+        chunk = items[offset : offset + RESTORE_CHUNK_SIZE]
+        validated = validate_restore_chunk(
+            key, create_model, chunk, offset, user_id, errors
+        )
+        old_ids, rows = [], []
+        for item, valid in zip(chunk, validated):
+            if valid is None:
+                skipped += 1
+                continue
+            row = valid.model_dump()
+            if account_id_map is not None:
+                row["account_id"] = account_id_map.get(item.get("account_id"))
+            old_ids.append(item.get("id"))
+            rows.append(row)
+        if rows:
+            result = await db.execute(statement, rows)
+            if map_ids:
+                id_map.update(
+                    (old_id, new_id)
+                    for old_id, new_id in zip(old_ids, result.scalars().all())
+                    if old_id is not None
+                )
+            imported += len(rows)
+        logger.info(
+            f"Restore user {user_id}: {key} {min(offset + len(chunk), len(items))}"
+            f"/{len(items)} processed"
+        )
+    return imported, skipped, id_map
+
+
 @app.post(
     "/import/all/{user_id}", response_model=ImportResponse
 )  # Reuse ImportResponse for feedback
 async def import_all_user_data(
-    user_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)
+    user_id: int, file: UploadFile = File(...), db: AsyncSession = Depends(get_db)
 ):
     """Imports all data for a user from a JSON file, replacing existing data."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -1076,90 +1673,76 @@ async def import_all_user_data(
     try:
         # 1. Delete existing data (Order matters due to foreign keys, delete dependents first)
         logger.info(f"Starting data deletion for user {user_id}")
-        db.query(models.Expense).filter(models.Expense.user_id == user_id).delete(
-            synchronize_session=False
-        )
-        db.query(models.Income).filter(models.Income.user_id == user_id).delete(
-            synchronize_session=False
-        )
-        db.query(models.RecurringExpense).filter(
-            models.RecurringExpense.user_id == user_id
-        ).delete(synchronize_session=False)
-        db.query(models.Budget).filter(models.Budget.user_id == user_id).delete(
-            synchronize_session=False
+        await db.execute(
+            delete(models.Expense).where(models.Expense.user_id == user_id)
         )
-        db.query(models.Goal).filter(models.Goal.user_id == user_id).delete(
-            synchronize_session=False
+        await db.execute(delete(models.Income).where(models.Income.user_id == user_id))
+        await db.execute(
+            delete(models.RecurringExpense).where(
+                models.RecurringExpense.user_id == user_id
+            )
         )
+        await db.execute(delete(models.Budget).where(models.Budget.user_id == user_id))
+        await db.execute(delete(models.Goal).where(models.Goal.user_id == user_id))
         # Accounts might have dependencies, delete them last OR handle FKs with cascade (already set)
-        db.query(models.Account).filter(models.Account.user_id == user_id).delete(
-            synchronize_session=False
+        await db.execute(
+            delete(models.Account).where(models.Account.user_id == user_id)
         )
         logger.info(f"Data deletion complete for user {user_id}")
 
-        # 2. Import Accounts (need these first for FKs in other tables)
-        accounts_to_add = []
-        for i, acc_data in enumerate(imported_data.get("accounts", [])):
-            try:
-                # Ensure user_id is correct, remove potential id from import
-                acc_data.pop("id", None)
-                acc_data.pop("created_at", None)
-                acc_data.pop("updated_at", None)
-                acc_data["user_id"] = user_id
-                # Use Pydantic model for validation
-                validated_acc = AccountCreate(**acc_data)
-                accounts_to_add.append(models.Account(**validated_acc.model_dump()))
-            except Exception as e:
-                errors.append(f"Account item {i + 1}: Validation error - {e}")
-                skipped["accounts"] += 1
-        if accounts_to_add:
-            db.add_all(accounts_to_add)
-            db.flush()  # Flush to get potential new account IDs if needed below
-            imported_counts["accounts"] = len(accounts_to_add)
-            logger.info(f"Added {len(accounts_to_add)} accounts for user {user_id}")
-
-        # 3. Import Expenses, Income, Recurring (link to new account IDs if possible)
-        #    (Simplified: assumes account_id from import might be invalid/different after restore)
-        #    A more robust import would map old IDs to new IDs, but that's complex.
-        #    For simplicity, we'll import them without linking or try linking based on name (even more complex).
-        #    EASIEST: Import without account_id for now. User can re-link manually if needed.
+        # 2. Accounts first: the other sections reference them, and their
+        #    backup ids are remapped to the ids assigned in this restore.
+        (
+            imported_counts["accounts"],
+            skipped["accounts"],
+            account_id_map,
+        ) = await bulk_restore_section(
+            db,
+            user_id,
+            "accounts",
+            models.Account,
+            AccountCreate,
+            imported_data.get("accounts", []),
+            errors,
+            map_ids=True,
+        )
+
+        # 3. Remaining sections; rows that carry an account_id are relinked
         data_map = {
-            "expenses": (models.Expense, CreateExpense),
-            "income": (models.Income, IncomeCreate),
-            "recurring_expenses": (models.RecurringExpense, RecurringExpenseCreate),
-            "budgets": (models.Budget, BudgetCreate),
-            "goals": (models.Goal, GoalCreate),
+            "expenses": (models.Expense, CreateExpense, account_id_map),
+            "income": (models.Income, IncomeCreate, account_id_map),
+            "recurring_expenses": (
+                models.RecurringExpense,
+                RecurringExpenseCreate,
+                account_id_map,
+            ),
+            "budgets": (models.Budget, BudgetCreate, None),
+            "goals": (models.Goal, GoalCreate, None),
         }
 
-        for key, (ModelClass, PydanticCreate) in data_map.items():
-            items_to_add = []
-            for i, item_data in enumerate(imported_data.get(key, [])):
-                try:
-                    item_data.pop("id", None)
-                    item_data.pop("created_at", None)
-                    item_data.pop("updated_at", None)
-                    item_data.pop(
-                        "account_id", None
-                    )  # Remove potentially invalid account_id
-                    item_data["user_id"] = user_id
-                    validated_item = PydanticCreate(**item_data)
-                    items_to_add.append(ModelClass(**validated_item.model_dump()))
-                except Exception as e:
-                    errors.append(
-                        f"{key.capitalize()} item {i + 1}: Validation error - {e}"
-                    )
-                    skipped[key] += 1
-            if items_to_add:
-                db.add_all(items_to_add)
-                imported_counts[key] = len(items_to_add)
-                logger.info(f"Added {len(items_to_add)} {key} for user {user_id}")
+        for key, (ModelClass, PydanticCreate, id_map) in data_map.items():
+            imported_counts[key], skipped[key], _ = await bulk_restore_section(
+                db,
+                user_id,
+                key,
+                ModelClass,
+                PydanticCreate,
+                imported_data.get(key, []),
+                errors,
+                account_id_map=id_map,
+            )
+            logger.info(f"Added {imported_counts[key]} {key} for user {user_id}")
+
+        for model in (models.Expense, models.Income):
+            await summaries.refresh_monthly_summaries(db, model, user_id)
+        report_cache.touch(db, user_id)
 
         # Commit the transaction
-        db.commit()
+        await db.commit()
         logger.info(f"Import transaction committed for user {user_id}")
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(
             f"Error during import process for user {user_id}: {e}", exc_info=True
         )
@@ -1199,9 +1782,9 @@ async def import_all_user_data(
 
 
 @app.post("/login", response_model=UserResponse)
-async def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login a user and return user information."""
-    user = get_user_by_username(db, user_data.username)
+    user = await get_user_by_username(db, user_data.username)
 
     if not user:
         raise HTTPException(
@@ -1209,7 +1792,7 @@ async def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
             detail="Incorrect username or password",
         )
 
-    if not verify_password(user_data.password, user.password_hash):
+    if not await verify_password(user_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -1226,30 +1809,35 @@ async def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
             detail="Email not verified. Please check your email for the activation link.",
         )
 
+    if passwords.needs_rehash(user.password_hash):
+        # Upgrade legacy SHA-256 (or weaker KDF) hashes now that we know the password
+        user.password_hash = await hash_password(user_data.password)
+        logger.info(f"Upgraded password hash for user {user.id}")
+
     user.last_login = func.now()
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return user
 
 
 @app.post("/signup", response_model=SignupResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Create a new user and send verification email."""
-    if get_user_by_username(db, user_data.username):
+    if await get_user_by_username(db, user_data.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered",
         )
-    existing_email = (
-        db.query(models.User).filter(models.User.email == user_data.email).first()
+    existing_email = await db.scalar(
+        select(models.User).where(models.User.email == user_data.email)
     )
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
 
-    password_hash = hash_password(user_data.password)
+    password_hash = await hash_password(user_data.password)
     verification_token = secrets.token_urlsafe(32)
 
     db_user = models.User(
@@ -1264,16 +1852,20 @@ async def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     try:
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        # Queued in the same transaction, so it only goes out if the user exists
+        queue_verification_email(
+            db, db_user.email, db_user.username, verification_token
+        )
+        await db.commit()
+        await db.refresh(db_user)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not create user account.",
         )
 
-    await send_verification_email(db_user.email, db_user.username, verification_token)
+    mail_outbox.notify()
 
     return SignupResponse(
         message="Signup successful. Please check your email to activate your account.",
@@ -1282,9 +1874,11 @@ async def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @app.get("/verify-email/{token}")
-async def verify_email(token: str, db: Session = Depends(get_db)):
+async def verify_email(token: str, db: AsyncSession = Depends(get_db)):
     """Verify user's email address using the provided token and display result page."""
-    user = db.query(models.User).filter(models.User.verification_token == token).first()
+    user = await db.scalar(
+        select(models.User).where(models.User.verification_token == token)
+    )
 
     status_param = "error"
     code_param = None
@@ -1301,12 +1895,12 @@ async def verify_email(token: str, db: Session = Depends(get_db)):
         user.verification_token = None  # Clear the token
         user.is_active = True  # Activate the user
         try:
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
             logger.info(f"Email successfully verified for user: {user.username}")
             status_param = "success"
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(
                 f"Database error during email verification for token {token[:10]}...: {e}",
                 exc_info=True,
@@ -1320,10 +1914,12 @@ async def verify_email(token: str, db: Session = Depends(get_db)):
 
 @app.post("/request-password-reset", status_code=status.HTTP_200_OK)
 async def request_password_reset(
-    payload: RequestPasswordResetPayload, db: Session = Depends(get_db)
+    payload: RequestPasswordResetPayload, db: AsyncSession = Depends(get_db)
 ):
     """Generates a password reset token and sends it via email."""
-    user = db.query(models.User).filter(models.User.email == payload.email).first()
+    user = await db.scalar(
+        select(models.User).where(models.User.email == payload.email)
+    )
 
     if not user:
         logger.warning(
@@ -1341,16 +1937,17 @@ async def request_password_reset(
     user.password_reset_token_expiry = expiry_time
 
     try:
-        db.commit()
-        await send_password_reset_email(user.email, user.username, token)
+        queue_password_reset_email(db, user.email, user.username, token)
+        await db.commit()
+        mail_outbox.notify()
         return {
             "message": "If an account with this email exists, a password reset link has been sent."
         }
     except HTTPException as http_exc:
-        db.rollback()
+        await db.rollback()
         raise http_exc
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(
             f"Database error during password reset request for {payload.email}: {e}",
             exc_info=True,
@@ -1364,11 +1961,13 @@ async def request_password_reset(
 @app.post("/verify-code-and-reset-password", status_code=status.HTTP_200_OK)
 async def verify_code_and_reset_password(
     payload: VerifyCodeAndResetPasswordPayload,
-    db: Session = Depends(
+    db: AsyncSession = Depends(
         get_db
     ),  # Ensure VerifyCodeAndResetPasswordPayload is defined/imported
 ):
-    user = db.query(models.User).filter(models.User.email == payload.email).first()
+    user = await db.scalar(
+        select(models.User).where(models.User.email == payload.email)
+    )
 
     if not user:
         raise HTTPException(
@@ -1395,17 +1994,17 @@ async def verify_code_and_reset_password(
         )
 
     # If code is valid and not expired
-    user.password_hash = hash_password(payload.new_password)
+    user.password_hash = await hash_password(payload.new_password)
     user.password_reset_code = None  # Invalidate the code
     user.password_reset_code_expiry = None
 
     try:
-        db.commit()
+        await db.commit()
         # It's good practice to refresh the user object if you return it or parts of it
-        # db.refresh(user)
+        # await db.refresh(user)
         return {"message": "Password has been reset successfully. You can now log in."}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(
             f"Database error during password reset confirmation for {payload.email}: {e}",
             exc_info=True,
@@ -1418,9 +2017,11 @@ async def verify_code_and_reset_password(
 
 @app.post("/request-password-reset-code", status_code=status.HTTP_200_OK)
 async def request_password_reset_code(
-    payload: RequestPasswordResetCodePayload, db: Session = Depends(get_db)
+    payload: RequestPasswordResetCodePayload, db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(models.User).filter(models.User.email == payload.email).first()
+    user = await db.scalar(
+        select(models.User).where(models.User.email == payload.email)
+    )
 
     if user and user.is_active:  # Only send if user exists and is active
         reset_code = generate_6_digit_code()
@@ -1431,15 +2032,16 @@ async def request_password_reset_code(
         user.password_reset_code = reset_code  # Store plain code
         user.password_reset_code_expiry = expiry_time
         try:
-            db.commit()
-            await send_password_reset_code_email(user.email, user.username, reset_code)
+            queue_password_reset_code_email(db, user.email, user.username, reset_code)
+            await db.commit()
+            mail_outbox.notify()
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(
                 f"Failed to process password reset code for {payload.email}: {e}",
                 exc_info=True,
             )
-            # Generic error response will be sent below if email sending fails or DB commit fails
+            # Generic error response will be sent below if DB commit fails
 
     # Always return a generic message to prevent email enumeration
     return {
@@ -1449,11 +2051,11 @@ async def request_password_reset_code(
 
 @app.post("/reset-password/{token}", status_code=status.HTTP_200_OK)
 async def reset_password_with_token(
-    token: str, payload: ResetPasswordPayload, db: Session = Depends(get_db)
+    token: str, payload: ResetPasswordPayload, db: AsyncSession = Depends(get_db)
 ):
     """Resets the user's password using a valid token."""
-    user = (
-        db.query(models.User).filter(models.User.password_reset_token == token).first()
+    user = await db.scalar(
+        select(models.User).where(models.User.password_reset_token == token)
     )
 
     # Compare expiry time with timezone-aware current time (UTC)
@@ -1467,17 +2069,17 @@ async def reset_password_with_token(
             detail="Invalid or expired password reset token.",
         )
 
-    user.password_hash = hash_password(payload.new_password)
+    user.password_hash = await hash_password(payload.new_password)
     user.password_reset_token = None
     user.password_reset_token_expiry = None
 
     try:
-        db.commit()
+        await db.commit()
         return {
             "message": "Password has been reset successfully. You can now log in with your new password."
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(
             f"Database error during password reset confirmation for token {token}: {e}",
             exc_info=True,
@@ -1492,18 +2094,57 @@ async def reset_password_with_token(
 
 
 @app.get("/expenses/{user_id}", response_model=List[ExpenseResponse])
-async def get_user_expenses(user_id: int, db: Session = Depends(get_db)):
+async def get_user_expenses(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get all expenses for a user."""
-    expenses = db.query(models.Expense).filter(models.Expense.user_id == user_id).all()
-    return expenses
+    return json_bytes_response(
+        await EXPENSE_ROWS.fetch(
+            db,
+            EXPENSE_ROWS.select(models.Expense).where(
+                models.Expense.user_id == user_id
+            ),
+        )
+    )
+
+
+@app.get("/expenses/{user_id}/page", response_model=PaginatedExpenseResponse)
+async def get_user_expenses_page(
+    user_id: int, page: PageQuery = Depends(), db: AsyncSession = Depends(get_db)
+):
+    """Get one keyset-paginated, filtered and sorted page of a user's expenses."""
+    query = apply_page_filters(
+        select(models.Expense).where(models.Expense.user_id == user_id),
+        models.Expense,
+        page,
+        date_column=models.Expense.date,
+        category_column=models.Expense.category_name,
+    )
+    expenses, next_cursor, total_count = await fetch_keyset_page(
+        db,
+        models.Expense,
+        query,
+        page,
+        sort_columns={
+            "date": models.Expense.date,
+            "amount": models.Expense.amount,
+            "category_name": models.Expense.category_name,
+        },
+        default_sort="date",
+    )
+    return PaginatedExpenseResponse(
+        total_count=total_count,
+        next_cursor=next_cursor,
+        expenses=[ExpenseResponse.model_validate(exp) for exp in expenses],
+    )
 
 
 @app.post(
     "/expenses", response_model=ExpenseResponse, status_code=status.HTTP_201_CREATED
 )
-async def create_expense(expense_data: CreateExpense, db: Session = Depends(get_db)):
+async def create_expense(
+    expense_data: CreateExpense, db: AsyncSession = Depends(get_db)
+):
     """Create a new expense."""
-    user = db.query(models.User).filter(models.User.id == expense_data.user_id).first()
+    user = await db.get(models.User, expense_data.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -1518,45 +2159,87 @@ async def create_expense(expense_data: CreateExpense, db: Session = Depends(get_
     )
 
     db.add(db_expense)
-    db.commit()
-    db.refresh(db_expense)
+    await db.flush()
+    await summaries.refresh_monthly_summaries(
+        db, models.Expense, db_expense.user_id, {summaries.month_of(db_expense.date)}
+    )
+    await db.commit()
+    await db.refresh(db_expense)
 
     return db_expense
 
 
 @app.delete("/expenses/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_expense(expense_id: int, db: Session = Depends(get_db)):
+async def delete_expense(expense_id: int, db: AsyncSession = Depends(get_db)):
     """Delete an expense."""
-    expense = db.query(models.Expense).filter(models.Expense.id == expense_id).first()
+    expense = await db.scalar(
+        select(models.Expense).where(models.Expense.id == expense_id)
+    )
 
     if not expense:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Expense not found"
         )
 
-    db.delete(expense)
-    db.commit()
+    await db.delete(expense)
+    await db.flush()
+    await summaries.refresh_monthly_summaries(
+        db, models.Expense, expense.user_id, {summaries.month_of(expense.date)}
+    )
+    await db.commit()
 
     return None
 
 
+async def touch_owners(db: AsyncSession, model, ids) -> None:
+    """Marks the owners of the ``model`` rows with these ids as changed.
+
+    Bulk (Core) deletes bypass the ORM events report_cache relies on.
+    """
+    owners = await db.scalars(select(model.user_id).where(model.id.in_(ids)).distinct())
+    for user_id in owners:
+        report_cache.touch(db, user_id)
+
+
+async def summary_months_for(db: AsyncSession, model, condition) -> Dict[int, set]:
+    """Months (per user) of the ``model`` rows matching ``condition``.
+
+    Read before a bulk delete, so their monthly summaries can be refreshed.
+    """
+    rows = await db.execute(
+        select(model.user_id, model.date).where(condition).distinct()
+    )
+    touched: Dict[int, set] = {}
+    for user_id, row_date in rows:
+        touched.setdefault(user_id, set()).add(summaries.month_of(row_date))
+    return touched
+
+
 @app.post("/expenses/bulk/delete", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_bulk_expenses(
-    request: BulkDeleteRequest, db: Session = Depends(get_db)
+    request: BulkDeleteRequest, db: AsyncSession = Depends(get_db)
 ):
     """Delete multiple expenses by their IDs efficiently."""
     if not request.expense_ids:
         return None
 
     try:
-        deleted_count = (
-            db.query(models.Expense)
-            .filter(models.Expense.id.in_(request.expense_ids))
-            .delete(synchronize_session=False)
+        touched = await summary_months_for(
+            db, models.Expense, models.Expense.id.in_(request.expense_ids)
         )
-        db.commit()
+        deleted_count = (
+            await db.execute(
+                delete(models.Expense).where(models.Expense.id.in_(request.expense_ids))
+            )
+        ).rowcount
+        for user_id, months in touched.items():
+            await summaries.refresh_monthly_summaries(
+                db, models.Expense, user_id, months
+            )
+            report_cache.touch(db, user_id)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error during bulk delete: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1568,154 +2251,167 @@ async def delete_bulk_expenses(
 
 @app.put("/expenses/{expense_id}", response_model=ExpenseResponse)
 async def update_expense(
-    expense_id: int, expense_data: CreateExpense, db: Session = Depends(get_db)
+    expense_id: int, expense_data: CreateExpense, db: AsyncSession = Depends(get_db)
 ):
     """Update an expense."""
-    expense = db.query(models.Expense).filter(models.Expense.id == expense_id).first()
+    expense = await db.scalar(
+        select(models.Expense).where(models.Expense.id == expense_id)
+    )
 
     if not expense:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Expense not found"
         )
 
+    months = {summaries.month_of(expense.date), summaries.month_of(expense_data.date)}
     expense.amount = expense_data.amount
     expense.category_name = expense_data.category_name
     expense.date = expense_data.date
     expense.description = expense_data.description
     expense.updated_at = func.now()
 
-    db.commit()
-    db.refresh(expense)
+    await db.flush()
+    await summaries.refresh_monthly_summaries(
+        db, models.Expense, expense.user_id, months
+    )
+    await db.commit()
+    await db.refresh(expense)
 
     return expense
 
 
-@app.post("/expenses/import/{user_id}", response_model=ImportResponse)
-async def import_expenses_from_csv(
-    user_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)
-):
-    """Imports expenses for a user from an uploaded CSV file."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
+# Rows parsed, validated and committed per transaction by the CSV imports
+CSV_IMPORT_CHUNK_ROWS = 10000
+
+
+async def import_csv_in_chunks(
+    db: AsyncSession,
+    user_id: int,
+    file: UploadFile,
+    model,
+    expected_headers: List[str],
+    required_headers: List[str],
+    validate_chunk,
+    progress=None,
+):
+    """Streams an uploaded CSV into ``model`` in fixed-size transactions.
+
+    The upload (spooled to disk by Starlette) is parsed
+    ``CSV_IMPORT_CHUNK_ROWS`` rows at a time in a worker thread, with every
+    column read as a string and headers matched case-insensitively.
+    ``validate_chunk(chunk, first_line)`` returns ``(rows, errors, skipped)``
+    and the chunk's valid rows are committed, together with the user's
+    monthly summaries for the months they fall in, before the next chunk is
+    read.
+    ``progress(fraction, message)`` is called after each chunk if given.
+    Returns ``(imported_count, skipped_rows, errors)``.
+    """
+    import csv_import
 
     try:
-        contents = await file.read()
-        try:
-            decoded_content = contents.decode("utf-8")
-        except UnicodeDecodeError:
-            raise HTTPException(
-                status_code=400, detail="Invalid file encoding. Please use UTF-8."
-            )
-        csv_data = io.StringIO(decoded_content)
+        columns = await run_in_threadpool(csv_import.read_csv_header, file.file)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=400, detail="Invalid file encoding. Please use UTF-8."
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error reading file: {e}")
-    finally:
-        await file.close()
 
-    expected_headers = ["date", "amount", "category_name", "description"]
+    normalised = {column.lower().strip() for column in columns}
+    if not set(required_headers).issubset(normalised):
+        missing = set(required_headers) - normalised
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required CSV columns: {', '.join(missing)}. Required: {', '.join(required_headers)}.",
+        )
+    header_map = {
+        expected: actual
+        for expected in expected_headers
+        for actual in columns
+        if expected == actual.lower().strip()
+    }
+
+    reader = await run_in_threadpool(
+        csv_import.read_csv_chunks,
+        file.file,
+        list(header_map.values()),
+        CSV_IMPORT_CHUNK_ROWS,
+    )
+    total_bytes = os.fstat(file.file.fileno()).st_size if progress else 0
+    table = model.__table__
     imported_count = 0
     skipped_rows = []
     errors = []
-    expenses_to_add = []
-
-    try:
-        reader = csv.DictReader(csv_data)
-        reader_headers_lower = {h.lower().strip() for h in reader.fieldnames or []}
-        required_headers_lower = {"date", "amount", "category_name"}
-        if not required_headers_lower.issubset(reader_headers_lower):
-            missing = required_headers_lower - reader_headers_lower
-            raise HTTPException(
-                status_code=400,
-                detail=f"Missing required CSV columns: {', '.join(missing)}. Required: date, amount, category_name.",
-            )
-
-        header_map = {
-            expected.lower(): actual
-            for expected in expected_headers
-            for actual in (reader.fieldnames or [])
-            if expected.lower() == actual.lower().strip()
-        }
-
-        for i, row in enumerate(reader):
-            line_number = i + 2
+    first_line = 2  # line 1 is the header
+    with reader:
+        while True:
             try:
-                mapped_row = {
-                    "date": row.get(header_map.get("date")),
-                    "amount": row.get(header_map.get("amount")),
-                    "category_name": row.get(header_map.get("category_name")),
-                    "description": row.get(header_map.get("description")),
-                }
-
-                if (
-                    not mapped_row["date"]
-                    or not mapped_row["amount"]
-                    or not mapped_row["category_name"]
-                ):
-                    raise ValueError(
-                        "Missing required value(s) (date, amount, category_name)"
-                    )
-
+                chunk = await run_in_threadpool(next, reader, None)
+            except Exception as e:
+                detail = (
+                    "Invalid file encoding. Please use UTF-8."
+                    if isinstance(e, UnicodeDecodeError)
+                    else f"Error parsing CSV: {e}"
+                )
+                if first_line == 2:
+                    raise HTTPException(status_code=400, detail=detail)
+                errors.append(
+                    f"Rows from {first_line}: {detail} Remaining rows were not imported."
+                )
+                break
+            if chunk is None:
+                break
+            chunk = chunk.rename(columns={v: k for k, v in header_map.items()})
+            rows, chunk_errors, chunk_skipped = validate_chunk(chunk, first_line)
+            errors.extend(chunk_errors)
+            skipped_rows.extend(chunk_skipped)
+            if rows:
                 try:
-                    expense_date = datetime.strptime(
-                        mapped_row["date"], "%Y-%m-%d"
-                    ).date()
-                except ValueError:
-                    raise ValueError(
-                        f"Invalid date format: '{mapped_row['date']}'. Use YYYY-MM-DD."
+                    await db.execute(insert(table), rows)
+                    await summaries.refresh_monthly_summaries(
+                        db,
+                        model,
+                        user_id,
+                        {summaries.month_of(row["date"]) for row in rows},
                     )
-
-                try:
-                    amount = float(mapped_row["amount"])
-                    if amount <= 0:
-                        raise ValueError("Amount must be positive.")
-                except (ValueError, TypeError):
-                    raise ValueError(
-                        f"Invalid amount value: '{mapped_row['amount']}'. Must be a positive number."
+                    report_cache.touch(db, user_id)
+                    await db.commit()
+                    imported_count += len(rows)
+                except Exception as e:
+                    await db.rollback()
+                    errors.append(
+                        f"Rows {first_line}-{first_line + len(chunk) - 1}: Database commit failed: {e}"
                     )
-
-                category_name = mapped_row["category_name"].strip()
-                if not category_name:
-                    raise ValueError("Category name cannot be empty.")
-
-                description = (
-                    mapped_row["description"].strip()
-                    if mapped_row["description"]
-                    else None
-                )
-
-                db_expense = models.Expense(
-                    user_id=user_id,
-                    amount=amount,
-                    date=expense_date,
-                    category_name=category_name,
-                    description=description,
+            first_line += len(chunk)
+            if progress and total_bytes:
+                progress(
+                    file.file.tell() / total_bytes,
+                    f"Processed {first_line - 2} rows",
                 )
-                expenses_to_add.append(db_expense)
+    return imported_count, skipped_rows, errors
 
-            except ValueError as ve:
-                errors.append(f"Row {line_number}: {ve}")
-                skipped_rows.append(line_number)
-            except Exception as e:
-                errors.append(f"Row {line_number}: Unexpected error - {e}")
-                skipped_rows.append(line_number)
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error parsing CSV: {e}")
+async def run_expense_csv_import(
+    db: AsyncSession, user_id: int, file: UploadFile, progress=None
+) -> ImportResponse:
+    """Imports an expense CSV; shared by the endpoint and background jobs."""
+    import csv_import
 
-    if expenses_to_add:
-        try:
-            db.add_all(expenses_to_add)
-            db.commit()
-            imported_count = len(expenses_to_add)
-        except Exception as e:
-            db.rollback()
-            errors.append(f"Database commit failed: {e}")
-            imported_count = 0
+    try:
+        imported_count, skipped_rows, errors = await import_csv_in_chunks(
+            db,
+            user_id,
+            file,
+            models.Expense,
+            expected_headers=["date", "amount", "category_name", "description"],
+            required_headers=["date", "amount", "category_name"],
+            validate_chunk=lambda chunk, first_line: csv_import.validate_expense_csv_chunk(
+                chunk, first_line, user_id
+            ),
+            progress=progress,
+        )
+    finally:
+        await file.close()
 
     status_message = "Import completed."
     if errors:
@@ -1731,23 +2427,53 @@ async def import_expenses_from_csv(
     )
 
 
+@app.post("/expenses/import/{user_id}", response_model=ImportResponse)
+async def import_expenses_from_csv(
+    user_id: int, file: UploadFile = File(...), db: AsyncSession = Depends(get_db)
+):
+    """Imports expenses for a user from an uploaded CSV file, chunk by chunk."""
+    user = await db.get(models.User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    return await run_expense_csv_import(db, user_id, file)
+
+
 @app.get("/expenses/{user_id}/report")
 async def generate_expense_report(
-    user_id: int, format: str = "json", db: Session = Depends(get_db)
+    user_id: int, format: str = "json", db: AsyncSession = Depends(get_db)
 ):
     """Generate a detailed expense report for a user in specified format."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
+    if format.lower() == "xlsx":
+        header = ["date", "category_name", "amount", "description", "created_at"]
+        return await xlsx_report_response(
+            db,
+            [
+                (
+                    "Sheet1",
+                    header,
+                    select(*(getattr(models.Expense, col) for col in header))
+                    .where(models.Expense.user_id == user_id)
+                    .order_by(models.Expense.date.desc()),
+                )
+            ],
+            f"expense_report_{datetime.now().date()}",
+        )
+
     expenses = (
-        db.query(models.Expense)
-        .filter(models.Expense.user_id == user_id)
-        .order_by(models.Expense.date.desc())
-        .all()
-    )
+        await db.scalars(
+            select(models.Expense)
+            .where(models.Expense.user_id == user_id)
+            .order_by(models.Expense.date.desc())
+        )
+    ).all()
 
     total_amount = sum(float(expense.amount) for expense in expenses)
     expense_count = len(expenses)
@@ -1775,57 +2501,54 @@ async def generate_expense_report(
         }
 
     elif format.lower() == "csv":
+        import pandas as pd
+
         df = pd.DataFrame(expense_data)
         buffer = io.StringIO()
         df.to_csv(buffer, index=False)
         buffer.seek(0)
-        return FileResponse(
+        return StreamingResponse(
             buffer,
             media_type="text/csv",
-            filename=f"expense_report_{datetime.now().date()}.csv",
-        )
-
-    elif format.lower() == "xlsx":
-        df = pd.DataFrame(expense_data)
-        buffer = io.BytesIO()
-        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False)
-        buffer.seek(0)
-        return FileResponse(
-            buffer,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            filename=f"expense_report_{datetime.now().date()}.xlsx",
+            headers={
+                "Content-Disposition": f"attachment; filename=expense_report_{datetime.now().date()}.csv"
+            },
         )
 
     elif format.lower() == "pdf":
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-
-        c.drawString(30, height - 40, "Expense Report")
-        c.drawString(30, height - 60, f"User: {user.first_name} {user.last_name}")
-        c.drawString(30, height - 80, f"Generated: {datetime.now()}")
-
-        y = height - 120
-        c.drawString(30, y, "Date    Category    Amount    Description    Created At")
-        y -= 20
-
-        for exp in expense_data:
-            if y < 50:
-                c.showPage()
-                y = height - 40
-            line = f"{exp['date']}  {exp['category_name']}  ${exp['amount']}  {exp['description'] or '-'}  {exp['created_at']}"
-            c.drawString(30, y, line[:100])
-            y -= 20
-
-        c.showPage()
-        c.save()
-        buffer.seek(0)
+        import pdf_reports
+
+        pdf = await pdf_reports.build_report(
+            "general",
+            [
+                ("Expense Report", "h1"),
+                (f"User: {user.first_name} {user.last_name}", "Normal"),
+                (f"Generated: {datetime.now()}", "Normal"),
+            ],
+            [
+                (
+                    "Expenses",
+                    ["Date", "Category", "Amount", "Description", "Created At"],
+                    [
+                        [
+                            str(exp["date"]),
+                            exp["category_name"] or "-",
+                            f"${exp['amount']}",
+                            exp["description"] or "-",
+                            str(exp["created_at"]),
+                        ]
+                        for exp in expense_data
+                    ],
+                )
+            ],
+        )
 
-        return FileResponse(
-            buffer,
+        return StreamingResponse(
+            io.BytesIO(pdf),
             media_type="application/pdf",
-            filename=f"expense_report_{datetime.now().date()}.pdf",
+            headers={
+                "Content-Disposition": f"attachment; filename=expense_report_{datetime.now().date()}.pdf"
+            },
         )
 
     else:
@@ -1838,33 +2561,63 @@ async def generate_expense_report(
 
 
 @app.get("/income/{user_id}", response_model=List[IncomeResponse])
-async def get_user_income(user_id: int, db: Session = Depends(get_db)):
+async def get_user_income(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get all income records for a user."""
-    income_records = (
-        db.query(models.Income)
-        .filter(models.Income.user_id == user_id)
-        .order_by(models.Income.date.desc())
-        .all()
-    )  # Keep sorting
-    return income_records
+    return json_bytes_response(
+        await INCOME_ROWS.fetch(
+            db,
+            INCOME_ROWS.select(models.Income)
+            .where(models.Income.user_id == user_id)
+            .order_by(models.Income.date.desc()),  # Keep sorting
+        )
+    )
+
+
+@app.get("/income/{user_id}/page", response_model=PaginatedIncomeResponse)
+async def get_user_income_page(
+    user_id: int, page: PageQuery = Depends(), db: AsyncSession = Depends(get_db)
+):
+    """Get one keyset-paginated page of a user's income (category filters source)."""
+    query = apply_page_filters(
+        select(models.Income).where(models.Income.user_id == user_id),
+        models.Income,
+        page,
+        date_column=models.Income.date,
+        category_column=models.Income.source,
+    )
+    income_records, next_cursor, total_count = await fetch_keyset_page(
+        db,
+        models.Income,
+        query,
+        page,
+        sort_columns={
+            "date": models.Income.date,
+            "amount": models.Income.amount,
+            "source": models.Income.source,
+        },
+        default_sort="date",
+    )
+    return PaginatedIncomeResponse(
+        total_count=total_count,
+        next_cursor=next_cursor,
+        income=[IncomeResponse.model_validate(inc) for inc in income_records],
+    )
 
 
 @app.post("/income", response_model=IncomeResponse, status_code=status.HTTP_201_CREATED)
-async def create_income(income_data: IncomeCreate, db: Session = Depends(get_db)):
+async def create_income(income_data: IncomeCreate, db: AsyncSession = Depends(get_db)):
     """Create a new income record."""
-    user = db.query(models.User).filter(models.User.id == income_data.user_id).first()
+    user = await db.get(models.User, income_data.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Optional: Check if account_id exists if provided
     if income_data.account_id:
-        account = (
-            db.query(models.Account)
-            .filter(
+        account = await db.scalar(
+            select(models.Account).where(
                 models.Account.id == income_data.account_id,
                 models.Account.user_id == income_data.user_id,
             )
-            .first()
         )
         if not account:
             raise HTTPException(
@@ -1880,47 +2633,66 @@ async def create_income(income_data: IncomeCreate, db: Session = Depends(get_db)
 
     db_income = models.Income(user_id=income_data.user_id, **create_data)
     db.add(db_income)
-    db.commit()
-    db.refresh(db_income)
+    await db.flush()
+    await summaries.refresh_monthly_summaries(
+        db, models.Income, db_income.user_id, {summaries.month_of(db_income.date)}
+    )
+    await db.commit()
+    await db.refresh(db_income)
     return db_income
 
 
 @app.delete("/income/{income_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_income(income_id: int, db: Session = Depends(get_db)):
+async def delete_income(income_id: int, db: AsyncSession = Depends(get_db)):
     """Delete an income record."""
-    income_record = (
-        db.query(models.Income).filter(models.Income.id == income_id).first()
+    income_record = await db.scalar(
+        select(models.Income).where(models.Income.id == income_id)
     )
     if not income_record:
         raise HTTPException(status_code=404, detail="Income record not found")
 
     # Optional: Add check if user owns this income record before deleting
 
-    db.delete(income_record)
-    db.commit()
+    await db.delete(income_record)
+    await db.flush()
+    await summaries.refresh_monthly_summaries(
+        db,
+        models.Income,
+        income_record.user_id,
+        {summaries.month_of(income_record.date)},
+    )
+    await db.commit()
     return None
 
 
 # --- ADD THIS NEW ENDPOINT ---
 @app.post("/income/bulk/delete", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_bulk_income(
-    request: BulkIncomeDeleteRequest, db: Session = Depends(get_db)
+    request: BulkIncomeDeleteRequest, db: AsyncSession = Depends(get_db)
 ):
     """Delete multiple income records by their IDs efficiently."""
     if not request.income_ids:
         return None  # Nothing to delete
 
     try:
+        touched = await summary_months_for(
+            db, models.Income, models.Income.id.in_(request.income_ids)
+        )
         # Perform the bulk delete operation
         deleted_count = (
-            db.query(models.Income)
-            .filter(models.Income.id.in_(request.income_ids))
-            .delete(synchronize_session=False)
-        )
-        db.commit()
+            await db.execute(
+                delete(models.Income).where(models.Income.id.in_(request.income_ids))
+            )
+        ).rowcount
+        for user_id, months in touched.items():
+            await summaries.refresh_monthly_summaries(
+                db, models.Income, user_id, months
+            )
+            report_cache.touch(db, user_id)
+        await db.commit()
         logger.info(f"Bulk deleted {deleted_count} income records.")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error during bulk income delete: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1931,169 +2703,33 @@ async def delete_bulk_income(
     return None  # Return 204 No Content on success
 
 
-@app.post("/income/import/{user_id}", response_model=ImportResponse)
-async def import_income_from_csv(
-    user_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)
-):
-    """Imports income records for a user from an uploaded CSV file."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
+async def run_income_csv_import(
+    db: AsyncSession, user_id: int, file: UploadFile, progress=None
+) -> ImportResponse:
+    """Imports an income CSV; shared by the endpoint and background jobs."""
+    import csv_import
 
+    account_ids = set(
+        await db.scalars(
+            select(models.Account.id).where(models.Account.user_id == user_id)
+        )
+    )
     try:
-        contents = await file.read()
-        try:
-            decoded_content = contents.decode("utf-8")
-        except UnicodeDecodeError:
-            raise HTTPException(
-                status_code=400, detail="Invalid file encoding. Please use UTF-8."
-            )
-        csv_data = io.StringIO(decoded_content)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error reading file: {e}")
+        imported_count, skipped_rows, errors = await import_csv_in_chunks(
+            db,
+            user_id,
+            file,
+            models.Income,
+            expected_headers=["date", "amount", "source", "description", "account_id"],
+            required_headers=["date", "amount", "source"],
+            validate_chunk=lambda chunk, first_line: csv_import.validate_income_csv_chunk(
+                chunk, first_line, user_id, account_ids
+            ),
+            progress=progress,
+        )
     finally:
         await file.close()
 
-    # Define expected headers for income import
-    expected_income_headers = ["date", "amount", "source", "description", "account_id"]
-    imported_count = 0
-    skipped_rows = []
-    errors = []
-    income_to_add = []
-
-    try:
-        reader = csv.DictReader(csv_data)
-        reader_headers_lower = {h.lower().strip() for h in reader.fieldnames or []}
-        # Define required headers for income
-        required_headers_lower = {"date", "amount", "source"}
-        if not required_headers_lower.issubset(reader_headers_lower):
-            missing = required_headers_lower - reader_headers_lower
-            raise HTTPException(
-                status_code=400,
-                # Update error message for income
-                detail=f"Missing required CSV columns: {', '.join(missing)}. Required: date, amount, source.",
-            )
-
-        # Map expected headers (case-insensitive) to actual headers found
-        header_map = {
-            expected.lower(): actual
-            for expected in expected_income_headers
-            for actual in (reader.fieldnames or [])
-            if expected.lower() == actual.lower().strip()
-        }
-
-        for i, row in enumerate(reader):
-            line_number = i + 2
-            try:
-                # Map row data using found headers
-                mapped_row = {
-                    "date": row.get(header_map.get("date")),
-                    "amount": row.get(header_map.get("amount")),
-                    "source": row.get(header_map.get("source")),
-                    "description": row.get(header_map.get("description")),
-                    "account_id": row.get(header_map.get("account_id")),
-                }
-
-                # --- Income Specific Validation ---
-                if (
-                    not mapped_row["date"]
-                    or not mapped_row["amount"]
-                    or not mapped_row["source"]
-                ):
-                    raise ValueError("Missing required value(s) (date, amount, source)")
-
-                try:
-                    income_date = datetime.strptime(
-                        mapped_row["date"], "%Y-%m-%d"
-                    ).date()
-                except ValueError:
-                    raise ValueError(
-                        f"Invalid date format: '{mapped_row['date']}'. Use YYYY-MM-DD."
-                    )
-
-                try:
-                    amount = float(mapped_row["amount"])
-                    if amount <= 0:
-                        raise ValueError("Amount must be positive.")
-                except (ValueError, TypeError):
-                    raise ValueError(
-                        f"Invalid amount value: '{mapped_row['amount']}'. Must be a positive number."
-                    )
-
-                source = mapped_row["source"].strip()
-                if not source:
-                    raise ValueError("Source cannot be empty.")
-
-                description = (
-                    mapped_row["description"].strip()
-                    if mapped_row["description"]
-                    else None
-                )
-
-                account_id_str = (
-                    mapped_row["account_id"].strip()
-                    if mapped_row["account_id"]
-                    else None
-                )
-                account_id = None
-                if account_id_str:
-                    try:
-                        account_id = int(account_id_str)
-                        # Optional: Validate if account exists for the user
-                        account = (
-                            db.query(models.Account.id)
-                            .filter(
-                                models.Account.id == account_id,
-                                models.Account.user_id == user_id,
-                            )
-                            .first()
-                        )
-                        if not account:
-                            raise ValueError(
-                                f"Account ID '{account_id}' not found for this user."
-                            )
-                    except ValueError:
-                        raise ValueError(
-                            f"Invalid Account ID: '{account_id_str}'. Must be a number."
-                        )
-                # --- End Income Specific Validation ---
-
-                # Create Income model instance
-                db_income = models.Income(
-                    user_id=user_id,
-                    amount=amount,
-                    date=income_date,
-                    source=source,
-                    description=description,
-                    account_id=account_id,  # Assign validated account_id or None
-                )
-                income_to_add.append(db_income)
-
-            except ValueError as ve:
-                errors.append(f"Row {line_number}: {ve}")
-                skipped_rows.append(line_number)
-            except Exception as e:
-                errors.append(f"Row {line_number}: Unexpected error - {e}")
-                skipped_rows.append(line_number)
-
-    except HTTPException:
-        raise  # Re-raise validation errors from header check
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error parsing CSV: {e}")
-
-    # Bulk insert valid income records
-    if income_to_add:
-        try:
-            db.add_all(income_to_add)
-            db.commit()
-            imported_count = len(income_to_add)
-        except Exception as e:
-            db.rollback()
-            errors.append(f"Database commit failed for income records: {e}")
-            imported_count = 0  # Reset count if commit fails
-
     # Determine final status message
     status_message = "Income import completed."
     if errors:
@@ -2109,19 +2745,152 @@ async def import_income_from_csv(
     )
 
 
+@app.post("/income/import/{user_id}", response_model=ImportResponse)
+async def import_income_from_csv(
+    user_id: int, file: UploadFile = File(...), db: AsyncSession = Depends(get_db)
+):
+    """Imports income records for a user from an uploaded CSV file, chunk by chunk."""
+    user = await db.get(models.User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    return await run_income_csv_import(db, user_id, file)
+
+
 # --------- New Recurring Expense Endpoints ---------
 
 
 @app.get("/recurring/{user_id}", response_model=List[RecurringExpenseResponse])
-async def get_user_recurring_expenses(user_id: int, db: Session = Depends(get_db)):
+async def get_user_recurring_expenses(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get all recurring expense rules for a user."""
-    recurring = (
-        db.query(models.RecurringExpense)
-        .filter(models.RecurringExpense.user_id == user_id)
-        .order_by(models.RecurringExpense.start_date.desc())  # Keep sorting
-        .all()
+    return json_bytes_response(
+        await RECURRING_ROWS.fetch(
+            db,
+            RECURRING_ROWS.select(models.RecurringExpense)
+            .where(models.RecurringExpense.user_id == user_id)
+            .order_by(models.RecurringExpense.start_date.desc()),  # Keep sorting
+        )
+    )
+
+
+@app.get("/recurring/{user_id}/page", response_model=PaginatedRecurringExpenseResponse)
+async def get_user_recurring_expenses_page(
+    user_id: int, page: PageQuery = Depends(), db: AsyncSession = Depends(get_db)
+):
+    """Get one keyset-paginated page of a user's recurring rules (dates filter start_date)."""
+    query = apply_page_filters(
+        select(models.RecurringExpense).where(
+            models.RecurringExpense.user_id == user_id
+        ),
+        models.RecurringExpense,
+        page,
+        date_column=models.RecurringExpense.start_date,
+        category_column=models.RecurringExpense.category_name,
+    )
+    recurring, next_cursor, total_count = await fetch_keyset_page(
+        db,
+        models.RecurringExpense,
+        query,
+        page,
+        sort_columns={
+            "start_date": models.RecurringExpense.start_date,
+            "amount": models.RecurringExpense.amount,
+            "name": models.RecurringExpense.name,
+        },
+        default_sort="start_date",
+    )
+    return PaginatedRecurringExpenseResponse(
+        total_count=total_count,
+        next_cursor=next_cursor,
+        recurring_expenses=[
+            RecurringExpenseResponse.model_validate(rec) for rec in recurring
+        ],
+    )
+
+
+# Widest from/to window /recurring/{user_id}/occurrences expands
+MAX_OCCURRENCE_WINDOW_DAYS = 3660
+
+
+async def recurring_occurrences(
+    db: AsyncSession, user_id: int, from_date: date, to_date: date
+) -> List[dict]:
+    """
+    Every occurrence of a user's recurring expenses in [from_date, to_date].
+
+    Only rules active in the window are read; each is expanded with
+    ``recurrence.occurrences``. Rows match RecurringOccurrenceResponse and
+    are ordered by due date.
+    """
+    rec = models.RecurringExpense
+    rules = await db.execute(
+        select(
+            rec.id,
+            rec.name,
+            rec.amount,
+            rec.category_name,
+            rec.frequency,
+            rec.start_date,
+            rec.end_date,
+            rec.account_id,
+        ).where(
+            rec.user_id == user_id,
+            rec.start_date <= to_date,
+            or_(rec.end_date.is_(None), rec.end_date >= from_date),
+        )
+    )
+    rows = [
+        {
+            "recurring_expense_id": rule.id,
+            "due_date": due_date,
+            "name": rule.name,
+            "amount": rule.amount,
+            "category_name": rule.category_name,
+            "frequency": rule.frequency,
+            "account_id": rule.account_id,
+        }
+        for rule in rules
+        for due_date in recurrence.occurrences(
+            rule.frequency, rule.start_date, rule.end_date, from_date, to_date
+        )
+    ]
+    rows.sort(key=lambda row: (row["due_date"], row["recurring_expense_id"]))
+    return rows
+
+
+@app.get(
+    "/recurring/{user_id}/occurrences",
+    response_model=List[RecurringOccurrenceResponse],
+)
+async def get_recurring_occurrences(
+    user_id: int,
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Due dates of a user's recurring expenses between ``from`` and ``to``
+    (inclusive), e.g. upcoming bills. Computed on the server from each
+    rule's frequency, start and end dates.
+    """
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (to_date - from_date).days > MAX_OCCURRENCE_WINDOW_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"The window can span at most {MAX_OCCURRENCE_WINDOW_DAYS} days",
+        )
+    user = await db.get(models.User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    return json_bytes_response(
+        OCCURRENCE_ROWS.dump(
+            await recurring_occurrences(db, user_id, from_date, to_date)
+        )
     )
-    return recurring
 
 
 @app.post(
@@ -2130,22 +2899,20 @@ async def get_user_recurring_expenses(user_id: int, db: Session = Depends(get_db
     status_code=status.HTTP_201_CREATED,
 )
 async def create_recurring_expense(
-    rec_data: RecurringExpenseCreate, db: Session = Depends(get_db)
+    rec_data: RecurringExpenseCreate, db: AsyncSession = Depends(get_db)
 ):
     """Create a new recurring expense rule."""
-    user = db.query(models.User).filter(models.User.id == rec_data.user_id).first()
+    user = await db.get(models.User, rec_data.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Optional: Check if account_id exists if provided
     if rec_data.account_id:
-        account = (
-            db.query(models.Account)
-            .filter(
+        account = await db.scalar(
+            select(models.Account).where(
                 models.Account.id == rec_data.account_id,
                 models.Account.user_id == rec_data.user_id,
             )
-            .first()
         )
         if not account:
             raise HTTPException(
@@ -2167,49 +2934,54 @@ async def create_recurring_expense(
 
     db_rec = models.RecurringExpense(user_id=rec_data.user_id, **create_data)
     db.add(db_rec)
-    db.commit()
-    db.refresh(db_rec)
+    await db.commit()
+    await db.refresh(db_rec)
     return db_rec
 
 
 @app.delete("/recurring/{recurring_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_recurring_expense(recurring_id: int, db: Session = Depends(get_db)):
+async def delete_recurring_expense(
+    recurring_id: int, db: AsyncSession = Depends(get_db)
+):
     """Delete a recurring expense rule."""
-    rec_expense = (
-        db.query(models.RecurringExpense)
-        .filter(models.RecurringExpense.id == recurring_id)
-        .first()
+    rec_expense = await db.scalar(
+        select(models.RecurringExpense).where(
+            models.RecurringExpense.id == recurring_id
+        )
     )
     if not rec_expense:
         raise HTTPException(status_code=404, detail="Recurring expense rule not found")
 
     # Optional: Add check if user owns this rule
 
-    db.delete(rec_expense)
-    db.commit()
+    await db.delete(rec_expense)
+    await db.commit()
     return None
 
 
 # --- ADD THIS NEW ENDPOINT ---
 @app.post("/recurring/bulk/delete", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_bulk_recurring(
-    request: BulkRecurringDeleteRequest, db: Session = Depends(get_db)
+    request: BulkRecurringDeleteRequest, db: AsyncSession = Depends(get_db)
 ):
     """Delete multiple recurring expense rules by their IDs efficiently."""
     if not request.recurring_ids:
         return None  # Nothing to delete
 
     try:
+        await touch_owners(db, models.RecurringExpense, request.recurring_ids)
         # Perform the bulk delete operation
         deleted_count = (
-            db.query(models.RecurringExpense)
-            .filter(models.RecurringExpense.id.in_(request.recurring_ids))
-            .delete(synchronize_session=False)
-        )
-        db.commit()
+            await db.execute(
+                delete(models.RecurringExpense).where(
+                    models.RecurringExpense.id.in_(request.recurring_ids)
+                )
+            )
+        ).rowcount
+        await db.commit()
         logger.info(f"Bulk deleted {deleted_count} recurring expense rules.")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error during bulk recurring delete: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -2223,23 +2995,130 @@ async def delete_bulk_recurring(
 
 
 @app.get("/budgets/{user_id}", response_model=List[BudgetResponse])
-async def get_user_budgets(user_id: int, db: Session = Depends(get_db)):
+async def get_user_budgets(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get all budget rules for a user."""
-    budgets = (
-        db.query(models.Budget)
-        .filter(models.Budget.user_id == user_id)
-        .order_by(models.Budget.category_name)
-        .all()
+    return json_bytes_response(
+        await BUDGET_ROWS.fetch(
+            db,
+            BUDGET_ROWS.select(models.Budget)
+            .where(models.Budget.user_id == user_id)
+            .order_by(models.Budget.category_name),
+        )
     )
-    return budgets
+
+
+# Budget windows per UNION ALL query: SQLite refuses compound SELECTs of more
+# than 500 terms, and each term binds 4 parameters (older SQLite allows 999)
+BUDGET_WINDOWS_PER_QUERY = 200
+
+
+@app.get("/budgets/{user_id}/status", response_model=List[BudgetStatusResponse])
+async def get_budget_status(
+    user_id: int,
+    as_of: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Spend against each budget's limit in its period containing ``as_of``
+    (default today).
+
+    Periods follow each budget's frequency from its start_date (see
+    ``recurrence.period_containing``). The spend of the active budgets is
+    summed in grouped queries over their category and period windows, up to
+    BUDGET_WINDOWS_PER_QUERY budgets per query.
+    """
+    user = await db.get(models.User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    as_of = as_of or date.today()
+    budgets = (
+        await db.execute(
+            select(
+                models.Budget.id,
+                models.Budget.category_name,
+                models.Budget.period,
+                models.Budget.amount_limit,
+                models.Budget.start_date,
+                models.Budget.end_date,
+            )
+            .where(models.Budget.user_id == user_id)
+            .order_by(models.Budget.category_name, models.Budget.id)
+        )
+    ).all()
+    windows = {
+        budget.id: recurrence.period_containing(
+            budget.period, budget.start_date, budget.end_date, as_of
+        )
+        for budget in budgets
+    }
+
+    spend = {}
+    # One literal row per active budget: (id, category, first day, last day)
+    active = [
+        select(
+            literal(budget.id, Integer).label("budget_id"),
+            literal(budget.category_name, String).label("category_name"),
+            literal(windows[budget.id][0], Date).label("period_start"),
+            literal(windows[budget.id][1] or date.max, Date).label("period_end"),
+        )
+        for budget in budgets
+        if windows[budget.id]
+    ]
+    expense = models.Expense
+    for offset in range(0, len(active), BUDGET_WINDOWS_PER_QUERY):
+        chunk = active[offset : offset + BUDGET_WINDOWS_PER_QUERY]
+        budget_windows = union_all(*chunk).subquery("budget_windows")
+        rows = await db.execute(
+            select(
+                budget_windows.c.budget_id,
+                func.sum(expense.amount),
+                func.count(expense.id),
+            )
+            .select_from(budget_windows)
+            .join(
+                expense,
+                and_(
+                    expense.user_id == user_id,
+                    expense.category_name == budget_windows.c.category_name,
+                    expense.date >= budget_windows.c.period_start,
+                    expense.date <= budget_windows.c.period_end,
+                ),
+            )
+            .group_by(budget_windows.c.budget_id)
+        )
+        spend.update((budget_id, (total, count)) for budget_id, total, count in rows)
+
+    results = []
+    for budget in budgets:
+        window = windows[budget.id] or (None, None)
+        total, count = spend.get(budget.id, (0, 0))
+        limit = float(budget.amount_limit)
+        spent = float(total or 0)
+        results.append(
+            BudgetStatusResponse(
+                budget_id=budget.id,
+                category_name=budget.category_name,
+                period=budget.period,
+                amount_limit=limit,
+                period_start=window[0],
+                period_end=window[1],
+                spent=spent,
+                expense_count=count,
+                remaining=limit - spent,
+                utilization=spent / limit * 100 if limit else None,
+            )
+        )
+    return results
 
 
 @app.post(
     "/budgets", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED
 )
-async def create_budget(budget_data: BudgetCreate, db: Session = Depends(get_db)):
+async def create_budget(budget_data: BudgetCreate, db: AsyncSession = Depends(get_db)):
     """Create a new budget rule."""
-    user = db.query(models.User).filter(models.User.id == budget_data.user_id).first()
+    user = await db.get(models.User, budget_data.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -2251,43 +3130,44 @@ async def create_budget(budget_data: BudgetCreate, db: Session = Depends(get_db)
 
     db_budget = models.Budget(user_id=budget_data.user_id, **create_data)
     db.add(db_budget)
-    db.commit()
-    db.refresh(db_budget)
+    await db.commit()
+    await db.refresh(db_budget)
     return db_budget
 
 
 @app.delete("/budgets/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_budget(budget_id: int, db: Session = Depends(get_db)):
+async def delete_budget(budget_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a budget rule."""
-    budget = db.query(models.Budget).filter(models.Budget.id == budget_id).first()
+    budget = await db.scalar(select(models.Budget).where(models.Budget.id == budget_id))
     if not budget:
         raise HTTPException(status_code=404, detail="Budget rule not found")
     # Optional: Check user ownership
-    db.delete(budget)
-    db.commit()
+    await db.delete(budget)
+    await db.commit()
     return None
 
 
 # --- ADD THIS NEW ENDPOINT ---
 @app.post("/budgets/bulk/delete", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_bulk_budgets(
-    request: BulkBudgetDeleteRequest, db: Session = Depends(get_db)
+    request: BulkBudgetDeleteRequest, db: AsyncSession = Depends(get_db)
 ):
     """Delete multiple budget rules by their IDs efficiently."""
     if not request.budget_ids:
         return None  # Nothing to delete
 
     try:
+        await touch_owners(db, models.Budget, request.budget_ids)
         # Perform the bulk delete operation
         deleted_count = (
-            db.query(models.Budget)
-            .filter(models.Budget.id.in_(request.budget_ids))
-            .delete(synchronize_session=False)
-        )
-        db.commit()
+            await db.execute(
+                delete(models.Budget).where(models.Budget.id.in_(request.budget_ids))
+            )
+        ).rowcount
+        await db.commit()
         logger.info(f"Bulk deleted {deleted_count} budget rules.")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error during bulk budget delete: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -2301,21 +3181,24 @@ async def delete_bulk_budgets(
 
 
 @app.get("/goals/{user_id}", response_model=List[GoalResponse])
-async def get_user_goals(user_id: int, db: Session = Depends(get_db)):
+async def get_user_goals(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get all financial goals for a user."""
-    goals = (
-        db.query(models.Goal)
-        .filter(models.Goal.user_id == user_id)
-        .order_by(models.Goal.target_date.asc().nulls_last(), models.Goal.name)
-        .all()
-    )  # Keep sorting
-    return goals
+    return json_bytes_response(
+        await GOAL_ROWS.fetch(
+            db,
+            GOAL_ROWS.select(models.Goal)
+            .where(models.Goal.user_id == user_id)
+            .order_by(
+                models.Goal.target_date.asc().nulls_last(), models.Goal.name
+            ),  # Keep sorting
+        )
+    )
 
 
 @app.post("/goals", response_model=GoalResponse, status_code=status.HTTP_201_CREATED)
-async def create_goal(goal_data: GoalCreate, db: Session = Depends(get_db)):
+async def create_goal(goal_data: GoalCreate, db: AsyncSession = Depends(get_db)):
     """Create a new financial goal."""
-    user = db.query(models.User).filter(models.User.id == goal_data.user_id).first()
+    user = await db.get(models.User, goal_data.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -2327,43 +3210,44 @@ async def create_goal(goal_data: GoalCreate, db: Session = Depends(get_db)):
 
     db_goal = models.Goal(user_id=goal_data.user_id, **create_data)
     db.add(db_goal)
-    db.commit()
-    db.refresh(db_goal)
+    await db.commit()
+    await db.refresh(db_goal)
     return db_goal
 
 
 @app.delete("/goals/{goal_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_goal(goal_id: int, db: Session = Depends(get_db)):
+async def delete_goal(goal_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a financial goal."""
-    goal = db.query(models.Goal).filter(models.Goal.id == goal_id).first()
+    goal = await db.scalar(select(models.Goal).where(models.Goal.id == goal_id))
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     # Optional: Check user ownership
-    db.delete(goal)
-    db.commit()
+    await db.delete(goal)
+    await db.commit()
     return None
 
 
 # --- ADD THIS NEW ENDPOINT ---
 @app.post("/goals/bulk/delete", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_bulk_goals(
-    request: BulkGoalDeleteRequest, db: Session = Depends(get_db)
+    request: BulkGoalDeleteRequest, db: AsyncSession = Depends(get_db)
 ):
     """Delete multiple financial goals by their IDs efficiently."""
     if not request.goal_ids:
         return None  # Nothing to delete
 
     try:
+        await touch_owners(db, models.Goal, request.goal_ids)
         # Perform the bulk delete operation
         deleted_count = (
-            db.query(models.Goal)
-            .filter(models.Goal.id.in_(request.goal_ids))
-            .delete(synchronize_session=False)
-        )
-        db.commit()
+            await db.execute(
+                delete(models.Goal).where(models.Goal.id.in_(request.goal_ids))
+            )
+        ).rowcount
+        await db.commit()
         logger.info(f"Bulk deleted {deleted_count} goals.")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error during bulk goal delete: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -2377,18 +3261,26 @@ async def delete_bulk_goals(
 
 
 @app.get("/accounts/{user_id}", response_model=List[AccountResponse])
-async def get_user_accounts(user_id: int, db: Session = Depends(get_db)):
+async def get_user_accounts(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get all accounts for a user."""
-    accounts = db.query(models.Account).filter(models.Account.user_id == user_id).all()
-    return accounts
+    return json_bytes_response(
+        await ACCOUNT_ROWS.fetch(
+            db,
+            ACCOUNT_ROWS.select(models.Account).where(
+                models.Account.user_id == user_id
+            ),
+        )
+    )
 
 
 @app.post(
     "/accounts", response_model=AccountResponse, status_code=status.HTTP_201_CREATED
 )
-async def create_account(account_data: AccountCreate, db: Session = Depends(get_db)):
+async def create_account(
+    account_data: AccountCreate, db: AsyncSession = Depends(get_db)
+):
     """Create a new account for a user."""
-    user = db.query(models.User).filter(models.User.id == account_data.user_id).first()
+    user = await db.get(models.User, account_data.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -2404,29 +3296,36 @@ async def create_account(account_data: AccountCreate, db: Session = Depends(get_
 
     db_account = models.Account(user_id=account_data.user_id, **create_data)
     db.add(db_account)
-    db.commit()
-    db.refresh(db_account)
+    await db.commit()
+    await db.refresh(db_account)
     return db_account
 
 
 @app.delete("/accounts/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_account(account_id: int, db: Session = Depends(get_db)):
+async def delete_account(account_id: int, db: AsyncSession = Depends(get_db)):
     """Delete an account."""
-    account = db.query(models.Account).filter(models.Account.id == account_id).first()
+    account = await db.scalar(
+        select(models.Account).where(models.Account.id == account_id)
+    )
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
 
     # Optional: Add check if user owns this account before deleting
 
-    db.delete(account)
-    db.commit()
+    await db.delete(account)
+    await db.flush()
+    # Linked transactions are kept but unlinked, which moves them between
+    # summary rows
+    for model in (models.Expense, models.Income):
+        await summaries.refresh_monthly_summaries(db, model, account.user_id)
+    await db.commit()
     return None
 
 
 # --- ADD THIS NEW ENDPOINT ---
 @app.post("/accounts/bulk/delete", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_bulk_accounts(
-    request: BulkAccountDeleteRequest, db: Session = Depends(get_db)
+    request: BulkAccountDeleteRequest, db: AsyncSession = Depends(get_db)
 ):
     """Delete multiple accounts by their IDs efficiently."""
     if not request.account_ids:
@@ -2434,23 +3333,20 @@ async def delete_bulk_accounts(
 
     # --- IMPORTANT: Check for related data before deleting ---
     # Check if any expenses, income, or recurring items are linked to these accounts
-    related_expenses = (
-        db.query(models.Expense.id)
-        .filter(models.Expense.account_id.in_(request.account_ids))
+    related_expenses = await db.scalar(
+        select(models.Expense.id)
+        .where(models.Expense.account_id.in_(request.account_ids))
         .limit(1)
-        .first()
     )
-    related_income = (
-        db.query(models.Income.id)
-        .filter(models.Income.account_id.in_(request.account_ids))
+    related_income = await db.scalar(
+        select(models.Income.id)
+        .where(models.Income.account_id.in_(request.account_ids))
         .limit(1)
-        .first()
     )
-    related_recurring = (
-        db.query(models.RecurringExpense.id)
-        .filter(models.RecurringExpense.account_id.in_(request.account_ids))
+    related_recurring = await db.scalar(
+        select(models.RecurringExpense.id)
+        .where(models.RecurringExpense.account_id.in_(request.account_ids))
         .limit(1)
-        .first()
     )
 
     if related_expenses or related_income or related_recurring:
@@ -2461,16 +3357,17 @@ async def delete_bulk_accounts(
     # --- End related data check ---
 
     try:
+        await touch_owners(db, models.Account, request.account_ids)
         # Perform the bulk delete operation
         deleted_count = (
-            db.query(models.Account)
-            .filter(models.Account.id.in_(request.account_ids))
-            .delete(synchronize_session=False)
-        )
-        db.commit()
+            await db.execute(
+                delete(models.Account).where(models.Account.id.in_(request.account_ids))
+            )
+        ).rowcount
+        await db.commit()
         logger.info(f"Bulk deleted {deleted_count} accounts.")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error during bulk account delete: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -2484,9 +3381,9 @@ async def delete_bulk_accounts(
 
 
 @app.get("/users/{user_id}/settings", response_model=UserSettings)
-async def get_user_settings(user_id: int, db: Session = Depends(get_db)):
+async def get_user_settings(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get user settings."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return UserSettings()
@@ -2494,10 +3391,10 @@ async def get_user_settings(user_id: int, db: Session = Depends(get_db)):
 
 @app.put("/users/{user_id}/settings", response_model=UserSettings)
 async def update_user_settings(
-    user_id: int, settings: UserSettings, db: Session = Depends(get_db)
+    user_id: int, settings: UserSettings, db: AsyncSession = Depends(get_db)
 ):
     """Update user settings."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -2507,9 +3404,9 @@ async def update_user_settings(
 
 
 @app.get("/users/{user_id}", response_model=UserResponse)
-async def get_user_profile(user_id: int, db: Session = Depends(get_db)):
+async def get_user_profile(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get user profile."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
 
     if not user:
         raise HTTPException(
@@ -2521,10 +3418,10 @@ async def get_user_profile(user_id: int, db: Session = Depends(get_db)):
 
 @app.put("/users/{user_id}", response_model=UserResponse)
 async def update_user_profile(
-    user_id: int, user_data: UserUpdate, db: Session = Depends(get_db)
+    user_id: int, user_data: UserUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update user profile."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
 
     if not user:
         raise HTTPException(
@@ -2537,32 +3434,32 @@ async def update_user_profile(
     user.last_name = user_data.last_name
     user.contact_number = user_data.contact_number
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return user
 
 
 @app.put("/users/{user_id}/password", status_code=status.HTTP_200_OK)
 async def change_user_password_with_current(
-    user_id: int, password_data: PasswordChange, db: Session = Depends(get_db)
+    user_id: int, password_data: PasswordChange, db: AsyncSession = Depends(get_db)
 ):
     """Change user password *if* they provide the current password."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    if not verify_password(password_data.current_password, user.password_hash):
+    if not await verify_password(password_data.current_password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect",
         )
 
-    user.password_hash = hash_password(password_data.new_password)
-    db.commit()
+    user.password_hash = await hash_password(password_data.new_password)
+    await db.commit()
 
     return {"message": "Password changed successfully"}
 
@@ -2571,109 +3468,575 @@ async def change_user_password_with_current(
 
 
 @app.get("/expenses/{user_id}/total")
-async def get_total_expenses(user_id: int, db: Session = Depends(get_db)):
-    """Get total expenses for a user."""
+async def get_total_expenses(user_id: int, db: AsyncSession = Depends(get_db)):
+    """Get total expenses for a user, from the monthly summaries."""
     total = (
-        db.query(func.sum(models.Expense.amount))
-        .filter(models.Expense.user_id == user_id)
-        .scalar()
+        await db.scalar(
+            select(func.sum(MonthlySummary.total)).where(
+                MonthlySummary.user_id == user_id, MonthlySummary.kind == "expense"
+            )
+        )
         or 0
     )
     return {"total": float(total)}
 
 
-# --- UNIFIED REPORT ENDPOINT ---
-@app.get("/reports/{user_id}/all", response_model=AllDataReportResponse)
-async def get_all_user_data_for_report(user_id: int, db: Session = Depends(get_db)):
-    """Fetches all relevant data for a user for comprehensive reporting."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+def summary_month_window(
+    start_date: Optional[date], end_date: Optional[date]
+) -> Optional[tuple]:
+    """(first, last) YYYY-MM labels if the window covers whole months only.
+
+    Either end may be None (open). Returns None when the window starts or
+    ends mid-month, since summaries can't answer that.
+    """
+    if start_date and start_date.day != 1:
+        return None
+    if end_date and (end_date + timedelta(days=1)).day != 1:
+        return None
+    return summaries.month_of(start_date), summaries.month_of(end_date)
+
+
+@app.get("/summaries/{user_id}/monthly", response_model=List[MonthlySummaryResponse])
+async def get_monthly_summaries(
+    user_id: int,
+    start_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    end_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    kind: Optional[str] = Query(None, pattern="^(expense|income)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Monthly rollups per category (expense) or source (income) and account.
+
+    Reads the incrementally maintained ``monthly_summaries`` table, so trend
+    and month-over-month widgets don't scan raw transactions.
+    """
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
-
-    # Fetch all data types
-    expenses_orm = (
-        db.query(models.Expense)
-        .filter(models.Expense.user_id == user_id)
-        .order_by(models.Expense.date.desc())
-        .all()
-    )
-    income_orm = (
-        db.query(models.Income)
-        .filter(models.Income.user_id == user_id)
-        .order_by(models.Income.date.desc())
-        .all()
-    )
-    recurring_expenses_orm = (
-        db.query(models.RecurringExpense)
-        .filter(models.RecurringExpense.user_id == user_id)
-        .order_by(models.RecurringExpense.name.asc())
-        .all()
-    )
-    budgets_orm = (
-        db.query(models.Budget)
-        .filter(models.Budget.user_id == user_id)
-        .order_by(models.Budget.category_name.asc())
-        .all()
-    )
-    goals_orm = (
-        db.query(models.Goal)
-        .filter(models.Goal.user_id == user_id)
-        .order_by(models.Goal.name.asc())
-        .all()
-    )
-    accounts_orm = (
-        db.query(models.Account)
-        .filter(models.Account.user_id == user_id)
-        .order_by(models.Account.name.asc())
-        .all()
-    )
-
-    # --- FIX: Explicitly validate/convert ORM lists to Pydantic model lists ---
-    try:
-        expenses_response = [
-            ExpenseResponse.model_validate(exp) for exp in expenses_orm
+    conditions = [MonthlySummary.user_id == user_id]
+    if start_month:
+        conditions.append(MonthlySummary.month >= start_month)
+    if end_month:
+        conditions.append(MonthlySummary.month <= end_month)
+    if kind:
+        conditions.append(MonthlySummary.kind == kind)
+    rows = await db.scalars(
+        select(MonthlySummary)
+        .where(*conditions)
+        .order_by(
+            MonthlySummary.month,
+            MonthlySummary.kind,
+            MonthlySummary.category,
+            MonthlySummary.account_id,
+        )
+    )
+    return rows.all()
+
+
+async def dashboard_rollup_rows(
+    db: AsyncSession,
+    model,
+    user_id: int,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    granularity: str,
+) -> list:
+    """
+    (period, name, account_id, total, count, max_amount) rows for a window.
+
+    Month and year views of whole-month windows are read from the monthly
+    summaries; anything finer is grouped from the raw transactions.
+    """
+    month_window = summary_month_window(start_date, end_date)
+    if month_window and granularity in ("month", "year"):
+        first_month, last_month = month_window
+        conditions = [
+            MonthlySummary.user_id == user_id,
+            MonthlySummary.kind == summaries.MODEL_KINDS[model],
         ]
-        income_response = [IncomeResponse.model_validate(inc) for inc in income_orm]
-        recurring_response = [
-            RecurringExpenseResponse.model_validate(rec)
-            for rec in recurring_expenses_orm
+        if first_month:
+            conditions.append(MonthlySummary.month >= first_month)
+        if last_month:
+            conditions.append(MonthlySummary.month <= last_month)
+        rows = await db.execute(
+            select(
+                MonthlySummary.month,
+                MonthlySummary.category,
+                MonthlySummary.account_id,
+                MonthlySummary.total,
+                MonthlySummary.transaction_count,
+                MonthlySummary.max_amount,
+            ).where(*conditions)
+        )
+        return [
+            (
+                month[:4] if month and granularity == "year" else month,
+                name,
+                account_id,
+                float(total or 0),
+                count,
+                float(largest) if largest is not None else None,
+            )
+            for month, name, account_id, total, count, largest in rows
         ]
-        budgets_response = [BudgetResponse.model_validate(bud) for bud in budgets_orm]
-        goals_response = [GoalResponse.model_validate(goal) for goal in goals_orm]
-        accounts_response = [
-            AccountResponse.model_validate(acc) for acc in accounts_orm
+
+    _summary_model, name_column = summaries.KIND_SOURCES[summaries.MODEL_KINDS[model]]
+    conditions = [model.user_id == user_id]
+    if start_date:
+        conditions.append(model.date >= start_date)
+    if end_date:
+        conditions.append(model.date <= end_date)
+    bucket = period_bucket(model.date, granularity, db.bind.dialect.name)
+    rows = await db.execute(
+        select(
+            bucket,
+            name_column,
+            model.account_id,
+            func.sum(model.amount),
+            func.count(model.id),
+            func.max(model.amount),
+        )
+        .where(*conditions)
+        .group_by(bucket, name_column, model.account_id)
+    )
+    return [
+        (
+            period,
+            name,
+            account_id,
+            float(total or 0),
+            count,
+            float(largest) if largest is not None else None,
+        )
+        for period, name, account_id, total, count, largest in rows
+    ]
+
+
+@app.get("/dashboard/{user_id}/aggregates", response_model=DashboardAggregatesResponse)
+async def get_dashboard_aggregates(
+    user_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    granularity: str = Query("month", pattern="^(day|week|month|year)$"),
+    largest_limit: int = Query(5, ge=0, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Computes the dashboard widget rollups in SQL for a time window.
+
+    Returns per-period, per-category, per-source and per-account totals plus
+    the largest transactions, so the payload no longer grows with history.
+    Month-aligned month/year views read the monthly summaries.
+    """
+    user = await db.get(models.User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+
+    def window(model):
+        conditions = [model.user_id == user_id]
+        if start_date:
+            conditions.append(model.date >= start_date)
+        if end_date:
+            conditions.append(model.date <= end_date)
+        return conditions
+
+    # Everything but the balances and largest transactions is derived from
+    # (period, name, account, total, count, max) rollup rows per kind
+    rollups = {
+        prefix: await dashboard_rollup_rows(
+            db, model, user_id, start_date, end_date, granularity
+        )
+        for model, prefix in ((models.Expense, "expense"), (models.Income, "income"))
+    }
+
+    # --- Totals ---
+    def kind_totals(rows):
+        total = sum(row[3] for row in rows)
+        count = sum(row[4] for row in rows)
+        largest = max((row[5] for row in rows if row[5] is not None), default=0.0)
+        return total, count, largest
+
+    expense_total, expense_count, max_expense = kind_totals(rollups["expense"])
+    income_total, income_count, max_income = kind_totals(rollups["income"])
+    net_flow = income_total - expense_total
+    totals = DashboardTotals(
+        expense_total=expense_total,
+        expense_count=expense_count,
+        max_expense=max_expense,
+        income_total=income_total,
+        income_count=income_count,
+        max_income=max_income,
+        net_flow=net_flow,
+        savings_rate=(net_flow / income_total * 100) if income_total > 0 else None,
+    )
+
+    # --- Per-period series ---
+    periods: Dict[str, DashboardPeriodAggregate] = {}
+    for prefix, rows in rollups.items():
+        for period, _name, _account_id, total, count, _largest in rows:
+            if period is None:
+                continue
+            entry = periods.setdefault(period, DashboardPeriodAggregate(period=period))
+            setattr(entry, f"{prefix}_total", getattr(entry, f"{prefix}_total") + total)
+            setattr(entry, f"{prefix}_count", getattr(entry, f"{prefix}_count") + count)
+    for entry in periods.values():
+        entry.net_flow = entry.income_total - entry.expense_total
+
+    # --- Per-category / per-source breakdowns ---
+    def grouped(rows):
+        groups: Dict[str, list] = {}
+        for _period, name, _account_id, total, count, _largest in rows:
+            group = groups.setdefault(name or "", [0.0, 0])
+            group[0] += total
+            group[1] += count
+        return [
+            DashboardGroupAggregate(name=name, total=total, count=count)
+            for name, (total, count) in sorted(
+                groups.items(), key=lambda item: item[1][0], reverse=True
+            )
         ]
-        user_info_response = UserResponse.model_validate(user)
-    except Exception as e:
-        # Log the detailed validation error if needed
-        logger.error(
-            f"Pydantic validation error during report generation for user {user_id}: {e}",
-            exc_info=True,
+
+    expense_categories = grouped(rollups["expense"])
+    income_sources = grouped(rollups["income"])
+
+    # --- Per-account rollups ---
+    accounts = (
+        await db.scalars(
+            select(models.Account)
+            .where(models.Account.user_id == user_id)
+            .order_by(models.Account.name.asc())
         )
+    ).all()
+    account_rows = []
+    if accounts:
+        window_totals = {}
+        since_balance = {}
+        for model, prefix in ((models.Expense, "expense"), (models.Income, "income")):
+            window_totals[prefix] = {}
+            for _period, _name, acc_id, total, _count, _largest in rollups[prefix]:
+                if acc_id is not None:
+                    window_totals[prefix][acc_id] = (
+                        window_totals[prefix].get(acc_id, 0.0) + total
+                    )
+            # Current balance counts every flow on/after the account's balance_date
+            rows = await db.execute(
+                select(model.account_id, func.sum(model.amount))
+                .join(models.Account, models.Account.id == model.account_id)
+                .where(
+                    model.user_id == user_id,
+                    model.date >= models.Account.balance_date,
+                )
+                .group_by(model.account_id)
+            )
+            since_balance[prefix] = {acc_id: float(t or 0) for acc_id, t in rows}
+        for acc in accounts:
+            account_rows.append(
+                DashboardAccountAggregate(
+                    account_id=acc.id,
+                    name=acc.name,
+                    account_type=acc.account_type,
+                    currency=acc.currency or "USD",
+                    expense_total=window_totals["expense"].get(acc.id, 0.0),
+                    income_total=window_totals["income"].get(acc.id, 0.0),
+                    current_balance=float(acc.starting_balance or 0)
+                    + since_balance["income"].get(acc.id, 0.0)
+                    - since_balance["expense"].get(acc.id, 0.0),
+                )
+            )
+
+    # --- Largest transactions ---
+    largest_expenses, largest_income = [], []
+    if largest_limit:
+        largest_expenses = (
+            await db.scalars(
+                select(models.Expense)
+                .where(*window(models.Expense))
+                .order_by(models.Expense.amount.desc(), models.Expense.id.desc())
+                .limit(largest_limit)
+            )
+        ).all()
+        largest_income = (
+            await db.scalars(
+                select(models.Income)
+                .where(*window(models.Income))
+                .order_by(models.Income.amount.desc(), models.Income.id.desc())
+                .limit(largest_limit)
+            )
+        ).all()
+
+    return DashboardAggregatesResponse(
+        start_date=start_date,
+        end_date=end_date,
+        granularity=granularity,
+        totals=totals,
+        periods=[periods[key] for key in sorted(periods)],
+        expense_categories=expense_categories,
+        income_sources=income_sources,
+        accounts=account_rows,
+        largest_expenses=[ExpenseResponse.model_validate(e) for e in largest_expenses],
+        largest_income=[IncomeResponse.model_validate(i) for i in largest_income],
+    )
+
+
+@app.get("/forecast/{user_id}", response_model=ForecastResponse)
+async def get_forecast(
+    user_id: int,
+    months: int = Query(12, ge=1, le=60),
+    lookback_days: int = Query(90, ge=0, le=730),
+    as_of: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Projects each account's end-of-day balance for ``months`` months after
+    ``as_of`` (default today).
+
+    Starts from the account balances at the end of as_of. It adds the
+    recurring expense occurrences and any transactions already entered for
+    future dates on their days. Every day also gets the account's average
+    daily income minus spending over the last ``lookback_days`` days. Spending in
+    categories that have a recurring rule is left out of that average,
+    since the rule's occurrences already project it. The arithmetic runs in
+    ``forecast.project_balances``.
+    """
+    import forecast
+    import numpy as np
+
+    user = await db.get(models.User, user_id)
+    if not user:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error processing report data.",
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    as_of = as_of or date.today()
+    start_date = as_of + timedelta(days=1)
+    end_date = recurrence.add_months(as_of, months)
+    days = (end_date - start_date).days + 1
+    lookback_start = as_of - timedelta(days=lookback_days - 1)
+
+    accounts = (
+        await db.execute(
+            select(
+                models.Account.id,
+                models.Account.name,
+                models.Account.currency,
+                models.Account.starting_balance,
+            )
+            .where(models.Account.user_id == user_id)
+            .order_by(models.Account.name, models.Account.id)
+        )
+    ).all()
+    # Series rows: the accounts, then one for flows without a (known) account
+    row_of = {account.id: index for index, account in enumerate(accounts)}
+    unlinked = len(accounts)
+    opening = np.zeros(len(accounts) + 1)
+    daily_net = np.zeros(len(accounts) + 1)
+    for index, account in enumerate(accounts):
+        opening[index] = float(account.starting_balance or 0)
+
+    rules = (
+        await db.execute(
+            select(
+                models.RecurringExpense.amount,
+                models.RecurringExpense.category_name,
+                models.RecurringExpense.frequency,
+                models.RecurringExpense.start_date,
+                models.RecurringExpense.end_date,
+                models.RecurringExpense.account_id,
+            ).where(
+                models.RecurringExpense.user_id == user_id,
+                models.RecurringExpense.start_date <= end_date,
+                or_(
+                    models.RecurringExpense.end_date.is_(None),
+                    models.RecurringExpense.end_date >= start_date,
+                ),
+            )
+        )
+    ).all()
+    recurring_categories = {rule.category_name for rule in rules}
+
+    flow_series, flow_offsets, flow_amounts = [], [], []
+    for rule in rules:
+        offsets = forecast.occurrence_offsets(
+            rule.frequency, rule.start_date, rule.end_date, start_date, end_date
+        )
+        flow_series.append(np.full(len(offsets), row_of.get(rule.account_id, unlinked)))
+        flow_offsets.append(offsets)
+        flow_amounts.append(np.full(len(offsets), -float(rule.amount)))
+
+    for model, sign in ((models.Income, 1), (models.Expense, -1)):
+        # Balance at the end of as_of: every flow since the account's balance_date
+        rows = await db.execute(
+            select(model.account_id, func.sum(model.amount))
+            .join(models.Account, models.Account.id == model.account_id)
+            .where(
+                model.user_id == user_id,
+                model.date >= models.Account.balance_date,
+                model.date <= as_of,
+            )
+            .group_by(model.account_id)
         )
-    # --- END FIX ---
+        for account_id, total in rows:
+            opening[row_of[account_id]] += sign * float(total or 0)
+
+        # Transactions already entered for dates in the horizon
+        rows = (
+            await db.execute(
+                select(model.account_id, model.date, func.sum(model.amount))
+                .where(
+                    model.user_id == user_id,
+                    model.date >= start_date,
+                    model.date <= end_date,
+                )
+                .group_by(model.account_id, model.date)
+            )
+        ).all()
+        if rows:
+            account_ids, dates, totals = zip(*rows)
+            flow_series.append(
+                np.array(
+                    [row_of.get(account_id, unlinked) for account_id in account_ids]
+                )
+            )
+            flow_offsets.append(
+                (
+                    np.array(dates, dtype="datetime64[D]")
+                    - np.datetime64(start_date, "D")
+                ).astype(np.int64)
+            )
+            flow_amounts.append(sign * np.array(totals, dtype=np.float64))
+
+        if lookback_days:
+            conditions = [
+                model.user_id == user_id,
+                model.date >= lookback_start,
+                model.date <= as_of,
+            ]
+            if model is models.Expense and recurring_categories:
+                conditions.append(model.category_name.not_in(recurring_categories))
+            rows = await db.execute(
+                select(model.account_id, func.sum(model.amount))
+                .where(*conditions)
+                .group_by(model.account_id)
+            )
+            for account_id, total in rows:
+                daily_net[row_of.get(account_id, unlinked)] += (
+                    sign * float(total or 0) / lookback_days
+                )
+
+    def concat(parts, dtype):
+        return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype)
+
+    balances = forecast.project_balances(
+        opening,
+        daily_net,
+        concat(flow_series, np.int64),
+        concat(flow_offsets, np.int64),
+        concat(flow_amounts, np.float64),
+        days,
+    )
+    keep = list(range(len(accounts)))
+    if daily_net[unlinked] or balances[unlinked].any():
+        keep.append(unlinked)
+    balances = balances[keep].round(2)
+    lowest = balances.argmin(axis=1) if keep else []
+
+    series = []
+    for position, index in enumerate(keep):
+        account = accounts[index] if index < len(accounts) else None
+        series.append(
+            ForecastSeries(
+                account_id=account.id if account else None,
+                name=account.name if account else "Unassigned",
+                currency=(account.currency if account else None) or "USD",
+                opening_balance=round(opening[index], 2),
+                daily_net=round(daily_net[index], 2),
+                end_balance=balances[position, -1],
+                min_balance=balances[position, lowest[position]],
+                min_balance_date=start_date + timedelta(days=int(lowest[position])),
+                balances=balances[position].tolist(),
+            )
+        )
+    return ForecastResponse(
+        as_of=as_of,
+        start_date=start_date,
+        end_date=end_date,
+        lookback_days=lookback_days,
+        accounts=series,
+        total=balances.sum(axis=0).round(2).tolist() if keep else [0.0] * days,
+    )
+
+
+# --- UNIFIED REPORT ENDPOINT ---
+async def cached_report_response(
+    request: Request, user_id: int, name: str, build
+) -> Response:
+    """
+    Serves a per-user JSON report through report_cache.
+
+    The ETag is derived from the user's data version, so a matching
+    If-None-Match is answered with 304 before any database work, and an
+    unchanged report is served from the cache. ``build()`` returns the
+    JSON bytes and only runs on a cache miss.
+    """
+    version = report_cache.data_version(user_id)
+    etag = report_cache.etag(user_id, name, version)
+    # no-cache: clients may keep the body but must revalidate each time
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if report_cache.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    body = report_cache.get(user_id, name, version)
+    if body is None:
+        body = await build()
+        report_cache.put(user_id, name, version, body)
+    return json_bytes_response(body, headers=headers)
+
+
+@app.get("/reports/{user_id}/all", response_model=AllDataReportResponse)
+async def get_all_user_data_for_report(
+    user_id: int, request: Request, db: AsyncSession = Depends(get_db)
+):
+    """
+    Fetches all relevant data for a user for comprehensive reporting.
 
-    return AllDataReportResponse(
-        user_info=user_info_response,
-        expenses=expenses_response,
-        income=income_response,
-        recurring_expenses=recurring_response,
-        budgets=budgets_response,
-        goals=goals_response,
-        accounts=accounts_response,
-        generated_at=datetime.now(timezone.utc),  # Use timezone aware datetime
+    Cached per user until their data changes; supports If-None-Match.
+    """
+    return await cached_report_response(
+        request,
+        user_id,
+        "report-all",
+        lambda: build_all_data_report_json(user_id, db),
     )
 
 
+async def build_all_data_report_json(user_id: int, db: AsyncSession) -> bytes:
+    """
+    The AllDataReportResponse JSON for a user, built section by section.
+
+    All sections come from one ``load_user_data`` batch and each is
+    serialized by its JsonRows; the result matches
+    ``AllDataReportResponse(...).model_dump_json()``.
+    """
+    data = await load_user_data(db, user_id)
+    if data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    user_info = UserResponse.model_validate(data["user"]).model_dump_json().encode()
+    parts = [b'"user_info":' + user_info]
+    for key, _model, rows, _order_by in EXPORT_SECTIONS:
+        parts.append(f'"{key}":'.encode() + rows.dump(data[key]))
+    generated_at = TypeAdapter(datetime).dump_json(datetime.now(timezone.utc))
+    parts.append(b'"generated_at":' + generated_at)
+    return b"{" + b",".join(parts) + b"}"
+
+
 @app.get("/users/{user_id}/licence", response_model=LicenceStatusResponse)
-async def get_licence_status(user_id: int, db: Session = Depends(get_db)):
+async def get_licence_status(user_id: int, db: AsyncSession = Depends(get_db)):
     """Gets the current licence status for the user."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -2705,11 +4068,109 @@ async def get_licence_status(user_id: int, db: Session = Depends(get_db)):
     return LicenceStatusResponse(status=status, key_prefix=prefix)
 
 
+# --- Streaming CSV reports ---
+def csv_report_header(column_lists) -> List[str]:
+    """Union of the parts' columns in first-seen order, like ``pd.concat``."""
+    return list(dict.fromkeys(col for columns in column_lists for col in columns))
+
+
+async def statements_with_rows(db: AsyncSession, statements) -> List[bool]:
+    """Whether each statement returns any row, answered in one round trip."""
+    probe = select(*(statement.order_by(None).exists() for statement in statements))
+    return list((await db.execute(probe)).one())
+
+
+async def stream_csv_report(user_id: int, header: List[str], parts, format_value):
+    """Yields a CSV report as encoded chunks, straight from the database.
+
+    ``parts`` are ``(statement, data_source)`` pairs written in order, each
+    read from a server-side cursor EXPORT_YIELD_PER rows at a time, so memory
+    and the time to first byte don't grow with the report. Cells are
+    ``format_value(row[column])``; the data_source column holds the part's
+    label and columns a part doesn't select stay empty. Uses its own session,
+    like ``stream_user_export``.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(header)
+    async with AsyncSessionLocal() as db:
+        try:
+            for statement, data_source in parts:
+                result = await db.stream(
+                    statement.execution_options(yield_per=EXPORT_YIELD_PER)
+                )
+                async for partition in result.mappings().partitions():
+                    for row in partition:
+                        values = {**row, "data_source": data_source}
+                        writer.writerow(
+                            [format_value(values.get(col)) for col in header]
+                        )
+                    yield buffer.getvalue().encode("utf-8")
+                    buffer.seek(0)
+                    buffer.truncate()
+            if buffer.tell():  # Only the header: rows went away since the probe
+                yield buffer.getvalue().encode("utf-8")
+        except Exception as e:
+            # Headers are already sent; the client gets a truncated file
+            logger.error(
+                f"Error streaming CSV report for user {user_id}: {e}", exc_info=True
+            )
+            raise
+
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Excel reports are built in memory up to this size, then in a temporary file
+XLSX_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def iter_spooled_file(spool, chunk_size: int = 64 * 1024):
+    """Yields a finished report file's bytes, then closes (deletes) it."""
+    with spool:
+        spool.seek(0)
+        while chunk := spool.read(chunk_size):
+            yield chunk
+
+
+async def xlsx_report_response(
+    db: AsyncSession, sheets, filename: str
+) -> StreamingResponse:
+    """Builds an Excel report with typed cells and returns it as a download.
+
+    ``sheets`` are ``(title, header, statement)``. Each statement is read
+    from a server-side cursor EXPORT_YIELD_PER rows at a time and a worker
+    thread appends the ``header`` columns of every row to a
+    StreamingXlsxWriter, spooled to a temporary file past
+    XLSX_SPOOL_MAX_SIZE, so memory stays flat whatever the report's size.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_SIZE)
+    try:
+        writer = xlsx_writer.StreamingXlsxWriter(spool)
+        for title, header, statement in sheets:
+            writer.add_sheet(title, header)
+            result = await db.stream(
+                statement.execution_options(yield_per=EXPORT_YIELD_PER)
+            )
+            async for partition in result.mappings().partitions():
+                await run_in_threadpool(
+                    writer.write_rows,
+                    ([row[col] for col in header] for row in partition),
+                )
+        await run_in_threadpool(writer.close)
+    except BaseException:
+        spool.close()
+        raise
+    return StreamingResponse(
+        iter_spooled_file(spool),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={filename}.xlsx"},
+    )
+
+
 @app.post("/reports/{user_id}/custom_unlicensed_output")
 async def generate_custom_unlicensed_report_output(
     user_id: int,
     request_body: CustomReportRequest,  # Re-use the same request body for simplicity
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Generates a custom data report output (CSV, Excel, PDF) based on selections.
@@ -2724,6 +4185,7 @@ async def generate_custom_unlicensed_report_output(
     data_map = {  # Keep this map for consistency
         "expenses": {
             "model": models.Expense,
+            "section": "expenses",
             "default_cols": [
                 "date",
                 "category_name",
@@ -2734,6 +4196,7 @@ async def generate_custom_unlicensed_report_output(
         },
         "income": {
             "model": models.Income,
+            "section": "income",
             "default_cols": [
                 "date",
                 "source",
@@ -2745,6 +4208,7 @@ async def generate_custom_unlicensed_report_output(
         },
         "recurring": {  # Renamed from recurring_expenses for backend key consistency
             "model": models.RecurringExpense,
+            "section": "recurring_expenses",
             "default_cols": [
                 "name",
                 "category_name",
@@ -2758,6 +4222,7 @@ async def generate_custom_unlicensed_report_output(
         },
         "budgets": {
             "model": models.Budget,
+            "section": "budgets",
             "default_cols": [
                 "category_name",
                 "amount_limit",
@@ -2769,6 +4234,7 @@ async def generate_custom_unlicensed_report_output(
         },
         "goals": {
             "model": models.Goal,
+            "section": "goals",
             "default_cols": [
                 "name",
                 "target_amount",
@@ -2779,6 +4245,7 @@ async def generate_custom_unlicensed_report_output(
         },
         "accounts": {
             "model": models.Account,
+            "section": "accounts",
             "default_cols": [
                 "name",
                 "account_type",
@@ -2811,68 +4278,23 @@ async def generate_custom_unlicensed_report_output(
         else:
             return str(value)
 
+    # One batch for all selected types, newest first (date, else start_date,
+    # else created_at); rows with an account also get its name
+    sections, columns, order_by = {}, {}, {}
     for data_type_key in valid_types:  # e.g., 'expenses', 'recurring'
         model_info = data_map[data_type_key]
-        query = db.query(model_info["model"]).filter(
-            model_info["model"].user_id == user_id
-        )
-
-        # For general reports, we fetch all data, ignore date filters from request_body
-        # results = query.order_by(getattr(model_info["model"], "id", None)).all()
-        # Order by a common field if available, e.g., created_at or a date field
-        order_field_name = (
-            "date"
-            if hasattr(model_info["model"], "date")
-            else (
-                "start_date"
-                if hasattr(model_info["model"], "start_date")
-                else (
-                    "created_at" if hasattr(model_info["model"], "created_at") else "id"
-                )
-            )
-        )  # fallback to id
-
-        order_attribute = getattr(model_info["model"], order_field_name, None)
-        if order_attribute:
-            query = query.order_by(
-                desc(order_attribute)
-            )  # Or asc() depending on preference
-
-        results = query.all()
-
+        section = model_info["section"]
+        sections[data_type_key] = section
         # Use default columns, ignore columns from request_body for this endpoint
-        valid_cols = model_info["default_cols"]
-
-        data_list = []
-        for item in results:
-            row_data = {}
-            for col_name in valid_cols:
-                # Special handling for account_id to fetch account name if an account model exists
-                if (
-                    col_name == "account_id"
-                    and hasattr(item, "account")
-                    and item.account
-                ):
-                    row_data["account_name"] = item.account.name  # Add account_name
-                else:
-                    row_data[col_name] = getattr(item, col_name, None)
-            data_list.append(row_data)
-
-        # Adjust columns for output if account_name was added
-        output_cols = list(valid_cols)  # Make a copy
-        if "account_id" in output_cols and any(
-            "account_name" in row for row in data_list
-        ):
-            try:
-                idx = output_cols.index("account_id")
-                output_cols.insert(
-                    idx + 1, "account_name"
-                )  # Insert account_name after account_id
-                # output_cols.remove("account_id") # Optionally remove raw account_id
-            except ValueError:
-                pass  # account_id not in default_cols somehow
-
-        selected_data[data_type_key] = {"data": data_list, "columns": output_cols}
+        columns[section] = list(model_info["default_cols"])
+        if "account_id" in columns[section]:
+            columns[section].append("account_name")
+        order_field_name = next(
+            name
+            for name in ("date", "start_date", "created_at", "id")
+            if hasattr(model_info["model"], name)
+        )
+        order_by[section] = desc(getattr(model_info["model"], order_field_name))
 
     output_format = request_body.output_format.lower()
     filename_prefix = "seta_general_report"
@@ -2881,172 +4303,132 @@ async def generate_custom_unlicensed_report_output(
 
     filename = f"{filename_prefix}_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-    try:
-        if output_format == "csv":
-            all_data_frames = []
-            for data_type, data_info in selected_data.items():
-                if data_info["data"]:
-                    formatted_data_list = [
-                        {
-                            col: format_for_output(row.get(col))
-                            for col in data_info["columns"]
-                        }
-                        for row in data_info["data"]
-                    ]
-                    df = pd.DataFrame(formatted_data_list, columns=data_info["columns"])
-                    # Add a column to distinguish data source if multiple types are combined
-                    if len(valid_types) > 1:
-                        df["data_source"] = data_type
-                    all_data_frames.append(df)
-
-            if not all_data_frames:
+    if output_format in ("csv", "excel"):
+        # Streamed from the database; one probe finds the non-empty types and
+        # which of them have named accounts, to lay out the columns up front
+        statements = {
+            data_type_key: user_section_query(
+                user_id,
+                section,
+                columns[section],
+                order_by=order_by[section],
+            )
+            for data_type_key, section in sections.items()
+        }
+        has_rows = await statements_with_rows(
+            db,
+            [
+                *statements.values(),
+                *(
+                    statements[data_type_key].where(models.Account.name.is_not(None))
+                    for data_type_key, section in sections.items()
+                    if "account_name" in columns[section]
+                ),
+            ],
+        )
+        has_account_names = iter(has_rows[len(statements) :])
+        parts = []  # (data type, statement, output columns) with rows
+        for (data_type_key, section), present in zip(sections.items(), has_rows):
+            output_cols = list(data_map[data_type_key]["default_cols"])
+            if "account_name" in columns[section] and next(has_account_names):
+                # Insert account_name after account_id
+                output_cols.insert(output_cols.index("account_id") + 1, "account_name")
+            if present:
+                parts.append((data_type_key, statements[data_type_key], output_cols))
+
+        if output_format == "excel":
+            if not parts:
                 raise HTTPException(
-                    status_code=404, detail="No data found for the selected criteria."
+                    status_code=404, detail="No data found for selected criteria."
                 )
-
-            # If only one df, use it directly. If multiple, concat.
-            if len(all_data_frames) == 1:
-                final_df = all_data_frames[0]
-            else:
-                final_df = pd.concat(all_data_frames, ignore_index=True)
-
-            stream = io.StringIO()
-            # Ensure quoting is minimal for CSV, similar to the licensed custom report
-            final_df.to_csv(stream, index=False, quoting=csv.QUOTE_MINIMAL)
-            response = StreamingResponse(
-                iter([stream.getvalue()]), media_type="text/csv"
+            return await xlsx_report_response(
+                db,
+                [
+                    # Sheet name max 31 chars
+                    (data_type_key.capitalize()[:30], output_cols, statement)
+                    for data_type_key, statement, output_cols in parts
+                ],
+                filename,
             )
-            response.headers["Content-Disposition"] = (
-                f"attachment; filename={filename}.csv"
-            )
-            return response
 
-        elif output_format == "excel":
-            stream = io.BytesIO()
-            with pd.ExcelWriter(stream, engine="openpyxl") as writer:
-                has_data = False
-                for data_type, data_info in selected_data.items():
-                    if data_info["data"]:
-                        formatted_data_list = [
-                            {
-                                col: format_for_output(row.get(col))
-                                for col in data_info["columns"]
-                            }
-                            for row in data_info["data"]
-                        ]
-                        df = pd.DataFrame(
-                            formatted_data_list, columns=data_info["columns"]
-                        )
-                        df.to_excel(
-                            writer, sheet_name=data_type.capitalize()[:30], index=False
-                        )  # Sheet name max 31 chars
-                        has_data = True
-                if not has_data:
-                    raise HTTPException(
-                        status_code=404, detail="No data found for selected criteria."
-                    )
-            stream.seek(0)
-            response = StreamingResponse(
-                stream,
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
-            response.headers["Content-Disposition"] = (
-                f"attachment; filename={filename}.xlsx"
-            )
-            return response
-
-        elif output_format == "pdf":
-            buffer = io.BytesIO()
-            doc = SimpleDocTemplate(
-                buffer,
-                pagesize=letter,
-                leftMargin=0.5 * inch,
-                rightMargin=0.5 * inch,
-                topMargin=0.5 * inch,
-                bottomMargin=0.5 * inch,
-            )
-            styles = getSampleStyleSheet()
-            story = []
-            has_data = False
-
-            story.append(
-                Paragraph(
-                    f"SETA General Report ({', '.join(s.capitalize() for s in valid_types)})",
-                    styles["h1"],
-                )
-            )
-            story.append(
-                Paragraph(
-                    f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                    styles["Normal"],
-                )
+        if not parts:
+            raise HTTPException(
+                status_code=404, detail="No data found for the selected criteria."
             )
-            story.append(Spacer(1, 0.2 * inch))
+        # Add a column to distinguish data source if multiple types are combined
+        data_source = ["data_source"] if len(valid_types) > 1 else []
+        return StreamingResponse(
+            stream_csv_report(
+                user_id,
+                csv_report_header(
+                    output_cols + data_source for *_, output_cols in parts
+                ),
+                [(statement, data_type_key) for data_type_key, statement, _ in parts],
+                format_for_output,
+            ),
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename={filename}.csv"},
+        )
 
-            for data_type, data_info in selected_data.items():
-                if data_info["data"]:
-                    has_data = True
-                    story.append(
-                        Paragraph(f"Data: {data_type.capitalize()}", styles["h2"])
-                    )
-                    story.append(Spacer(1, 0.1 * inch))
+    data = await load_user_data(
+        db, user_id, list(sections.values()), columns, order_by=order_by
+    )
+    if data is None:
+        raise HTTPException(status_code=404, detail="User not found")
 
-                    headers = data_info["columns"]
-                    formatted_pdf_data = [
-                        [format_for_output(row.get(col)) for col in headers]
-                        for row in data_info["data"]
-                    ]
-                    table_data = [headers] + formatted_pdf_data
-
-                    table = Table(table_data, repeatRows=1, hAlign="LEFT")
-                    table.setStyle(
-                        TableStyle(
-                            [
-                                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                                (
-                                    "ALIGN",
-                                    (0, 0),
-                                    (-1, -1),
-                                    "LEFT",
-                                ),  # Usually better for reports
-                                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                                ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                                (
-                                    "FONTSIZE",
-                                    (0, 0),
-                                    (-1, -1),
-                                    7,
-                                ),  # Smaller for more data
-                                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                            ]
-                        )
-                    )
-                    # Calculate column widths to fit page (approximate)
-                    num_cols = len(headers)
-                    page_width_points = letter[0] - 1 * inch  # Subtract margins
-                    col_width = (
-                        page_width_points / num_cols
-                        if num_cols > 0
-                        else page_width_points
-                    )
+    for data_type_key, section in sections.items():
+        valid_cols = data_map[data_type_key]["default_cols"]
+        data_list = [dict(row) for row in data[section]]
 
-                    # Apply word wrapping by setting colWidths
-                    # This is a simple equal distribution, might need more sophisticated logic for varied content
-                    table._argW = [col_width] * num_cols
+        # Adjust columns for output if account_name was added
+        output_cols = list(valid_cols)  # Make a copy
+        if "account_id" in output_cols and any(
+            row["account_name"] is not None for row in data_list
+        ):
+            # Insert account_name after account_id
+            output_cols.insert(output_cols.index("account_id") + 1, "account_name")
 
-                    story.append(table)
-                    story.append(Spacer(1, 0.2 * inch))
+        selected_data[data_type_key] = {"data": data_list, "columns": output_cols}
 
-            if not has_data:
+    try:
+        if output_format == "pdf":
+            sections = [
+                (
+                    f"Data: {data_type.capitalize()}",
+                    data_info["columns"],
+                    [
+                        [
+                            format_for_output(row.get(col))
+                            for col in data_info["columns"]
+                        ]
+                        for row in data_info["data"]
+                    ],
+                )
+                for data_type, data_info in selected_data.items()
+                if data_info["data"]
+            ]
+            if not sections:
                 raise HTTPException(
                     status_code=404, detail="No data found for selected criteria."
                 )
 
+            import pdf_reports
+
             try:
-                doc.build(story)
+                pdf = await pdf_reports.build_report(
+                    "general",
+                    [
+                        (
+                            f"SETA General Report ({', '.join(s.capitalize() for s in valid_types)})",
+                            "h1",
+                        ),
+                        (
+                            f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                            "Normal",
+                        ),
+                    ],
+                    sections,
+                )
             except Exception as pdf_error:
                 logger.error(
                     f"Error building PDF for general report (user {user_id}): {pdf_error}",
@@ -3056,8 +4438,7 @@ async def generate_custom_unlicensed_report_output(
                     status_code=500, detail=f"Failed to build PDF report: {pdf_error}"
                 )
 
-            buffer.seek(0)
-            response = StreamingResponse(buffer, media_type="application/pdf")
+            response = StreamingResponse(io.BytesIO(pdf), media_type="application/pdf")
             response.headers["Content-Disposition"] = (
                 f"attachment; filename={filename}.pdf"
             )
@@ -3077,10 +4458,10 @@ async def generate_custom_unlicensed_report_output(
 
 @app.put("/users/{user_id}/licence", status_code=status.HTTP_200_OK)
 async def update_licence_key(
-    user_id: int, payload: LicenceUpdateRequest, db: Session = Depends(get_db)
+    user_id: int, payload: LicenceUpdateRequest, db: AsyncSession = Depends(get_db)
 ):
     """Updates the user's licence key after format and validity checks."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -3113,7 +4494,7 @@ async def update_licence_key(
     # If format and validity checks pass, store the key (store standardized version)
     user.licence_key = new_key_upper
     try:
-        db.commit()
+        await db.commit()
         logger.info(f"Licence key updated successfully for user {user_id}")
         # Fetch the new status to return
         new_status = await get_licence_status(user_id, db)  # Await the async function
@@ -3122,7 +4503,7 @@ async def update_licence_key(
             "licence_status": new_status.model_dump(),  # Return Pydantic model as dict
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(
             f"Failed to update licence key for user {user_id}: {e}", exc_info=True
         )
@@ -3134,7 +4515,7 @@ async def update_licence_key(
 async def generate_custom_report(
     user_id: int,
     request_body: CustomReportRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Generates a custom data report based on user selections (Licence Required)."""
     logger.info(
@@ -3145,14 +4526,17 @@ async def generate_custom_report(
     data_map = {
         "expenses": {
             "model": models.Expense,
+            "section": "expenses",
             "default_cols": ["date", "category_name", "amount", "description"],
         },
         "income": {
             "model": models.Income,
+            "section": "income",
             "default_cols": ["date", "source", "amount", "description", "account_id"],
         },
         "recurring": {
             "model": models.RecurringExpense,
+            "section": "recurring_expenses",
             "default_cols": [
                 "name",
                 "category_name",
@@ -3165,6 +4549,7 @@ async def generate_custom_report(
         },
         "budgets": {
             "model": models.Budget,
+            "section": "budgets",
             "default_cols": [
                 "category_name",
                 "amount_limit",
@@ -3175,10 +4560,12 @@ async def generate_custom_report(
         },
         "goals": {
             "model": models.Goal,
+            "section": "goals",
             "default_cols": ["name", "target_amount", "current_amount", "target_date"],
         },
         "accounts": {
             "model": models.Account,
+            "section": "accounts",
             "default_cols": [
                 "name",
                 "account_type",
@@ -3211,204 +4598,138 @@ async def generate_custom_report(
             return str(value)  # Convert other types to string
 
     # --- Fetch and Process Data ---
+    # Column selection/validation: only real columns of the model
+    sections, columns = {}, {}
     for data_type in valid_types:
         model_info = data_map[data_type]
-        query = db.query(model_info["model"]).filter(
-            model_info["model"].user_id == user_id
-        )
-        # Apply date filters (Keep As Is)
-        if request_body.start_date and hasattr(model_info["model"], "date"):
-            query = query.filter(model_info["model"].date >= request_body.start_date)
-        elif request_body.start_date and hasattr(model_info["model"], "start_date"):
-            query = query.filter(
-                model_info["model"].start_date >= request_body.start_date
-            )
-        if request_body.end_date and hasattr(model_info["model"], "date"):
-            query = query.filter(model_info["model"].date <= request_body.end_date)
-        elif request_body.end_date and hasattr(model_info["model"], "start_date"):
-            query = query.filter(
-                model_info["model"].start_date <= request_body.end_date
-            )
-        elif request_body.end_date and hasattr(model_info["model"], "target_date"):
-            query = query.filter(
-                model_info["model"].target_date <= request_body.end_date
-            )
-
-        results = query.order_by(getattr(model_info["model"], "id", None)).all()
-
-        # Column selection/validation (Keep As Is)
-        selected_cols = (
-            request_body.columns.get(data_type)
-            if request_body.columns
-            else model_info["default_cols"]
-        )
-        valid_cols = [col for col in selected_cols if hasattr(model_info["model"], col)]
+        selected_cols = (request_body.columns or {}).get(data_type) or model_info[
+            "default_cols"
+        ]
+        table_columns = model_info["model"].__table__.c
+        valid_cols = [col for col in selected_cols if col in table_columns]
         if not valid_cols:
             valid_cols = model_info["default_cols"]
+        sections[data_type] = model_info["section"]
+        columns[model_info["section"]] = valid_cols
+    # The date window applies to each type's date column (date, start_date,
+    # or target_date for goals)
+    order_by = {
+        section: data_map[data_type]["model"].id
+        for data_type, section in sections.items()
+    }
 
-        data_list = []
-        for item in results:
-            # Fetch raw data first
-            row = {col: getattr(item, col, None) for col in valid_cols}
-            data_list.append(row)
-
-        # Store the raw data list along with selected columns
-        selected_data[data_type] = {"data": data_list, "columns": valid_cols}
-    # --- End Fetch and Process Data ---
-
-    # --- Generate File Content ---
     output_format = request_body.output_format.lower()
     filename = (
         f"seta_custom_report_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     )
 
-    try:
-        if output_format == "csv":
-            # --- CSV Generation (Slight modification for formatting) ---
-            all_data_frames = []
-            for data_type, data_info in selected_data.items():
-                if data_info["data"]:
-                    # Format data *before* creating DataFrame
-                    formatted_data_list = [
-                        {
-                            col: format_for_output(row.get(col))
-                            for col in data_info["columns"]
-                        }
-                        for row in data_info["data"]
-                    ]
-                    df = pd.DataFrame(
-                        formatted_data_list, columns=data_info["columns"]
-                    )  # Ensure column order
-                    df["data_source"] = data_type
-                    all_data_frames.append(df)
-
-            if not all_data_frames:
-                raise HTTPException(
-                    status_code=404, detail="No data found for the selected criteria."
-                )
-            combined_df = pd.concat(all_data_frames, ignore_index=True)
-            stream = io.StringIO()
-            combined_df.to_csv(stream, index=False)
-            response = StreamingResponse(
-                iter([stream.getvalue()]), media_type="text/csv"
+    if output_format in ("csv", "excel"):
+        # --- CSV/Excel Generation: streamed from the database ---
+        statements = {
+            data_type: user_section_query(
+                user_id,
+                section,
+                columns[section],
+                request_body.start_date,
+                request_body.end_date,
+                order_by[section],
             )
-            response.headers["Content-Disposition"] = (
-                f"attachment; filename={filename}.csv"
+            for data_type, section in sections.items()
+        }
+        has_rows = await statements_with_rows(db, list(statements.values()))
+        present = [data_type for data_type, rows in zip(statements, has_rows) if rows]
+        if not present:
+            raise HTTPException(
+                status_code=404, detail="No data found for the selected criteria."
             )
-            return response
-            # --- END CSV Generation ---
-
-        elif output_format == "excel":
-            # --- Excel Generation (Apply formatting) ---
-            stream = io.BytesIO()
-            with pd.ExcelWriter(stream, engine="openpyxl") as writer:
-                has_data = False
-                for data_type, data_info in selected_data.items():
-                    if data_info["data"]:
-                        # Format data *before* creating DataFrame
-                        formatted_data_list = [
-                            {
-                                col: format_for_output(row.get(col))
-                                for col in data_info["columns"]
-                            }
-                            for row in data_info["data"]
-                        ]
-                        df = pd.DataFrame(
-                            formatted_data_list, columns=data_info["columns"]
-                        )  # Ensure column order
-                        df.to_excel(
-                            writer, sheet_name=data_type.capitalize(), index=False
-                        )
-                        has_data = True
-                if not has_data:
-                    raise HTTPException(
-                        status_code=404,
-                        detail="No data found for the selected criteria.",
+        if output_format == "excel":
+            return await xlsx_report_response(
+                db,
+                [
+                    (
+                        data_type.capitalize(),
+                        columns[sections[data_type]],
+                        statements[data_type],
                     )
-
-            stream.seek(0)
-            response = StreamingResponse(
-                stream,
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
-            response.headers["Content-Disposition"] = (
-                f"attachment; filename={filename}.xlsx"
-            )
-            return response
-            # --- END Excel Generation ---
-
-        # --- ADD PDF Generation ---
-        elif output_format == "pdf":
-            buffer = io.BytesIO()
-            doc = SimpleDocTemplate(
-                buffer,
-                pagesize=letter,
-                leftMargin=0.5 * inch,
-                rightMargin=0.5 * inch,
-                topMargin=0.5 * inch,
-                bottomMargin=0.5 * inch,
+                    for data_type in present
+                ],
+                filename,
             )
-            styles = getSampleStyleSheet()
-            story = []
-            has_data = False
-
-            # Add main title
-            story.append(Paragraph("SETA Custom Report", styles["h1"]))
-            story.append(
-                Paragraph(
-                    f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                    styles["Normal"],
-                )
-            )
-            story.append(Spacer(1, 0.2 * inch))
+        header = csv_report_header(
+            columns[sections[data_type]] + ["data_source"] for data_type in present
+        )
+        return StreamingResponse(
+            stream_csv_report(
+                user_id,
+                header,
+                [(statements[data_type], data_type) for data_type in present],
+                format_for_output,
+            ),
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename={filename}.csv"},
+        )
+        # --- END CSV/Excel Generation ---
+
+    # One batch for all types
+    data = await load_user_data(
+        db,
+        user_id,
+        list(sections.values()),
+        columns,
+        request_body.start_date,
+        request_body.end_date,
+        order_by=order_by,
+    )
+    if data is None:
+        raise HTTPException(status_code=404, detail="User not found")
 
-            for data_type, data_info in selected_data.items():
-                if data_info["data"]:
-                    has_data = True
-                    story.append(
-                        Paragraph(f"Data Type: {data_type.capitalize()}", styles["h2"])
-                    )
-                    story.append(Spacer(1, 0.1 * inch))
+    for data_type, section in sections.items():
+        # Store the raw data list along with selected columns
+        selected_data[data_type] = {
+            "data": [dict(row) for row in data[section]],
+            "columns": columns[section],
+        }
+    # --- End Fetch and Process Data ---
 
-                    # Prepare data for ReportLab Table
-                    headers = data_info["columns"]
-                    # Format data for PDF display
-                    formatted_data = [
-                        [format_for_output(row.get(col)) for col in headers]
+    # --- Generate File Content ---
+    try:
+        # --- ADD PDF Generation ---
+        if output_format == "pdf":
+            sections = [
+                (
+                    f"Data Type: {data_type.capitalize()}",
+                    data_info["columns"],
+                    [
+                        [
+                            format_for_output(row.get(col))
+                            for col in data_info["columns"]
+                        ]
                         for row in data_info["data"]
-                    ]
-                    table_data = [headers] + formatted_data
-
-                    # Create Table and Style
-                    table = Table(
-                        table_data, repeatRows=1
-                    )  # Repeat headers on new pages
-                    table.setStyle(
-                        TableStyle(
-                            [
-                                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                                ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                                ("FONTSIZE", (0, 0), (-1, -1), 8),  # Smaller font size
-                            ]
-                        )
-                    )
-
-                    story.append(table)
-                    story.append(Spacer(1, 0.2 * inch))
-
-            if not has_data:
+                    ],
+                )
+                for data_type, data_info in selected_data.items()
+                if data_info["data"]
+            ]
+            if not sections:
                 raise HTTPException(
                     status_code=404, detail="No data found for the selected criteria."
                 )
 
             # Build PDF
+            import pdf_reports
+
             try:
-                doc.build(story)
+                pdf = await pdf_reports.build_report(
+                    "custom",
+                    [
+                        ("SETA Custom Report", "h1"),
+                        (
+                            f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                            "Normal",
+                        ),
+                    ],
+                    sections,
+                )
             except Exception as pdf_error:
                 logger.error(
                     f"Error building PDF for user {user_id}: {pdf_error}", exc_info=True
@@ -3417,8 +4738,7 @@ async def generate_custom_report(
                     status_code=500, detail=f"Failed to build PDF report: {pdf_error}"
                 )
 
-            buffer.seek(0)
-            response = StreamingResponse(buffer, media_type="application/pdf")
+            response = StreamingResponse(io.BytesIO(pdf), media_type="application/pdf")
             response.headers["Content-Disposition"] = (
                 f"attachment; filename={filename}.pdf"
             )
@@ -3443,25 +4763,309 @@ async def generate_custom_report(
 
 # --- UNLICENSED ENDPOINT for fetching general report summary data ---
 @app.get("/reports/{user_id}/general_summary", response_model=AllDataReportResponse)
-async def get_general_report_summary_data(user_id: int, db: Session = Depends(get_db)):
+async def get_general_report_summary_data(
+    user_id: int, request: Request, db: AsyncSession = Depends(get_db)
+):
     """
     Fetches all relevant data for a user for general reporting (summary view).
-    This endpoint is UNLICENSED.
+    This endpoint is UNLICENSED. Same payload and caching as /reports/{user_id}/all.
     """
-    report_data = await get_all_user_data_for_processing(user_id=user_id, db=db)
-    if report_data is None:
+    return await cached_report_response(
+        request,
+        user_id,
+        "general-summary",
+        lambda: build_all_data_report_json(user_id, db),
+    )
+
+
+# --------- Background Job Endpoints ---------
+
+
+class JobResponse(BaseModel):
+    id: str
+    user_id: int
+    kind: str
+    status: str  # queued, running, succeeded, failed
+    progress: float
+    message: Optional[str] = None
+    error: Optional[str] = None
+    result_filename: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+@app.on_event("startup")
+async def start_job_store():
+    await run_in_threadpool(jobs.recover_and_prune)
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    jobs.shutdown()
+    if "pdf_reports" in sys.modules:  # Only imported once a PDF was requested
+        sys.modules["pdf_reports"].shutdown()
+    # Let engines replaced by a database switch close their connections
+    await asyncio.gather(*DRAINING_ENGINES)
+
+
+@app.on_event("startup")
+async def start_mail_outbox():
+    mail_outbox.start()
+
+
+@app.on_event("shutdown")
+async def stop_mail_outbox():
+    # Unsent mail stays in the outbox and goes out after the next start
+    await mail_outbox.stop()
+
+
+def open_job_upload(job: dict) -> UploadFile:
+    return UploadFile(
+        file=open(job["input_path"], "rb"), filename=job["params"].get("filename")
+    )
+
+
+async def run_custom_report_job(db: AsyncSession, job: dict, progress):
+    progress(0.1, "Generating report")
+    return await generate_custom_report(
+        job["user_id"], CustomReportRequest(**job["params"]), db
+    )
+
+
+async def run_custom_unlicensed_report_job(db: AsyncSession, job: dict, progress):
+    progress(0.1, "Generating report")
+    return await generate_custom_unlicensed_report_output(
+        job["user_id"], CustomReportRequest(**job["params"]), db
+    )
+
+
+async def run_expense_report_job(db: AsyncSession, job: dict, progress):
+    progress(0.1, "Generating report")
+    return await generate_expense_report(job["user_id"], job["params"]["format"], db)
+
+
+async def run_expense_import_job(db: AsyncSession, job: dict, progress):
+    return await run_expense_csv_import(
+        db, job["user_id"], open_job_upload(job), progress
+    )
+
+
+async def run_income_import_job(db: AsyncSession, job: dict, progress):
+    return await run_income_csv_import(
+        db, job["user_id"], open_job_upload(job), progress
+    )
+
+
+async def run_restore_job(db: AsyncSession, job: dict, progress):
+    progress(0.1, "Restoring backup")
+    return await import_all_user_data(job["user_id"], open_job_upload(job), db)
+
+
+# job kind -> coroutine(db, job, progress) returning a Response or JSON data
+JOB_HANDLERS = {
+    "custom_report": run_custom_report_job,
+    "custom_unlicensed_report": run_custom_unlicensed_report_job,
+    "expense_report": run_expense_report_job,
+    "import_expenses": run_expense_import_job,
+    "import_income": run_income_import_job,
+    "import_all": run_restore_job,
+}
+
+
+async def save_job_result(job: dict, result):
+    """Writes a handler's result to the job's result file.
+
+    Returns ``(path, filename, media_type)``; the filename comes from the
+    response's Content-Disposition header when there is one.
+    """
+    path = jobs.result_path_for(job["id"])
+    filename = f"{job['kind']}_{job['id']}.json"
+    if isinstance(result, Response):
+        media_type = result.media_type or "application/octet-stream"
+        disposition = result.headers.get("content-disposition", "")
+        if "filename=" in disposition:
+            filename = disposition.split("filename=", 1)[1].strip('"')
+        with open(path, "wb") as f:
+            if isinstance(result, StreamingResponse):
+                async for chunk in result.body_iterator:
+                    f.write(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+            else:
+                f.write(result.body)
+    else:
+        media_type = "application/json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(jsonable_encoder(result), f)
+    return path, filename, media_type
+
+
+async def execute_job(job_id: str):
+    """Runs a job inside a process-pool worker (see jobs.run_job)."""
+    job = await run_in_threadpool(jobs.get_job, job_id)
+    handler = JOB_HANDLERS[job["kind"]]
+
+    def progress(fraction, message=None):
+        jobs.set_progress(job_id, fraction, message)
+
+    # The database may have been switched since this worker imported main
+    refresh_config()
+    database_url = get_database_url()
+    if database_url != DATABASE_URL:
+        old = await switch_database(database_url, local=is_local_db_configured())
+        if old is not None:
+            await db_engines.dispose(old)
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await handler(db, job, progress)
+        progress(0.95, "Saving result")
+        return await save_job_result(job, result)
+    finally:
+        # Worker processes outlive this event loop; don't keep its connections
+        await async_engine.dispose()
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    user_id: int,
+    kind: str,
+    params: dict,
+    file: Optional[UploadFile] = None,
+) -> JobResponse:
+    user = await db.get(models.User, user_id)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
-    if report_data == "validation_error":
+    input_path = None
+    if file is not None:
+        # The upload is gone once this request ends, so the worker gets a copy
+        input_path = jobs.result_path_for(secrets.token_hex(16), ".upload")
+        try:
+            with open(input_path, "wb") as out:
+                await run_in_threadpool(shutil.copyfileobj, file.file, out)
+        finally:
+            await file.close()
+        params = {**params, "filename": file.filename}
+    job = await run_in_threadpool(jobs.create_job, user_id, kind, params, input_path)
+    # Imports commit in a worker process, whose report_cache is its own
+    on_done = None
+    if kind.startswith("import_"):
+        on_done = lambda _job_id: report_cache.bump(user_id)  # noqa: E731
+    jobs.submit(job["id"], on_done=on_done)
+    logger.info(f"Queued {kind} job {job['id']} for user {user_id}")
+    return JobResponse(**job)
+
+
+async def get_user_job(user_id: int, job_id: str) -> dict:
+    job = await run_in_threadpool(jobs.get_job, job_id)
+    if not job or job["user_id"] != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post(
+    "/jobs/{user_id}/reports/custom",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_active_licence)],
+)
+async def submit_custom_report_job(
+    user_id: int, request_body: CustomReportRequest, db: AsyncSession = Depends(get_db)
+):
+    """Queues POST /reports/{user_id}/custom as a background job (Licence Required)."""
+    return await enqueue_job(
+        db, user_id, "custom_report", request_body.model_dump(mode="json")
+    )
+
+
+@app.post(
+    "/jobs/{user_id}/reports/custom_unlicensed_output",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_custom_unlicensed_report_job(
+    user_id: int, request_body: CustomReportRequest, db: AsyncSession = Depends(get_db)
+):
+    """Queues POST /reports/{user_id}/custom_unlicensed_output as a background job."""
+    return await enqueue_job(
+        db, user_id, "custom_unlicensed_report", request_body.model_dump(mode="json")
+    )
+
+
+@app.post(
+    "/jobs/{user_id}/reports/expenses",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_expense_report_job(
+    user_id: int, format: str = "pdf", db: AsyncSession = Depends(get_db)
+):
+    """Queues GET /expenses/{user_id}/report as a background job."""
+    if format.lower() not in ("json", "csv", "xlsx", "pdf"):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error processing report data during validation.",
+            status_code=400, detail="Unsupported format. Use json, csv, xlsx, or pdf"
         )
-    return report_data
+    return await enqueue_job(db, user_id, "expense_report", {"format": format})
+
+
+@app.post(
+    "/jobs/{user_id}/import/{kind}",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_import_job(
+    user_id: int,
+    kind: str,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+):
+    """Queues an expense/income CSV import or a full JSON restore.
+
+    ``kind`` is ``expenses``, ``income`` or ``all``; the job's result is the
+    same ImportResponse the synchronous endpoint returns.
+    """
+    if kind not in ("expenses", "income", "all"):
+        raise HTTPException(
+            status_code=404, detail="Unknown import type. Use expenses, income or all"
+        )
+    return await enqueue_job(db, user_id, f"import_{kind}", {}, file=file)
+
+
+@app.get("/jobs/{user_id}", response_model=List[JobResponse])
+async def list_user_jobs(user_id: int):
+    """Lists a user's most recent jobs, newest first."""
+    return await run_in_threadpool(jobs.list_jobs, user_id)
+
+
+@app.get("/jobs/{user_id}/{job_id}", response_model=JobResponse)
+async def get_job_status(user_id: int, job_id: str):
+    """Returns a job's status and progress (0-1) for polling."""
+    return await get_user_job(user_id, job_id)
+
+
+@app.get("/jobs/{user_id}/{job_id}/result")
+async def get_job_result(user_id: int, job_id: str):
+    """Downloads the result of a finished job."""
+    job = await get_user_job(user_id, job_id)
+    if job["status"] == jobs.JOB_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=f"Job failed: {job['error']}"
+        )
+    if job["status"] != jobs.JOB_SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Job has not finished yet."
+        )
+    if not os.path.exists(job["result_path"]):
+        raise HTTPException(status_code=410, detail="Job result has expired.")
+    return FileResponse(
+        job["result_path"],
+        media_type=job["result_media_type"],
+        filename=job["result_filename"],
+    )
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=False)
+    port = int(os.environ.get("SETA_API_PORT", "8000"))  # Electron expects 8000
+    uvicorn.run(app, host="0.0.0.0", port=port, reload=False)
@@ -4,7 +4,16 @@ import enum
 
 from sqlalchemy import Boolean, Column, Date, DateTime
 from sqlalchemy import Enum as SQLAlchemyEnum
-from sqlalchemy import ForeignKey, Integer, Interval, Numeric, String, create_engine
+from sqlalchemy import (
+    ForeignKey,
+    Index,
+    Integer,
+    Interval,
+    Numeric,
+    String,
+    Text,
+    create_engine,
+)
 from sqlalchemy.ext.declarative import (
     declarative_base,
 )  # Use this if you are on older SQLAlchemy, otherwise use DeclarativeBase
@@ -31,8 +40,21 @@ class FrequencyEnum(enum.Enum):
 # (Keep all your model definitions exactly as they were in the previous step)
 
 
+# Composite indexes follow the hot access paths: every list/report/total query
+# filters on user_id, then ranges or orders on the date column. The trailing id
+# lets keyset pagination (ORDER BY date, id) read straight from the index.
+# Keep these in sync with alembic revision a3f9c2d1e8b4.
+
+
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_user_id_date_id", "user_id", "date", "id"),
+        Index(
+            "ix_expenses_user_id_category_name_date", "user_id", "category_name", "date"
+        ),
+        Index("ix_expenses_user_id_account_id", "user_id", "account_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
@@ -51,6 +73,11 @@ class Expense(Base):
 
 class Income(Base):
     __tablename__ = "income"
+    __table_args__ = (
+        Index("ix_income_user_id_date_id", "user_id", "date", "id"),
+        Index("ix_income_user_id_source_date", "user_id", "source", "date"),
+        Index("ix_income_user_id_account_id", "user_id", "account_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
@@ -69,6 +96,15 @@ class Income(Base):
 
 class RecurringExpense(Base):
     __tablename__ = "recurring_expenses"
+    __table_args__ = (
+        Index("ix_recurring_expenses_user_id_start_date", "user_id", "start_date"),
+        Index(
+            "ix_recurring_expenses_user_id_category_name",
+            "user_id",
+            "category_name",
+        ),
+        Index("ix_recurring_expenses_user_id_account_id", "user_id", "account_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
@@ -90,6 +126,14 @@ class RecurringExpense(Base):
 
 class Budget(Base):
     __tablename__ = "budgets"
+    __table_args__ = (
+        Index(
+            "ix_budgets_user_id_category_name_start_date",
+            "user_id",
+            "category_name",
+            "start_date",
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
@@ -106,6 +150,7 @@ class Budget(Base):
 
 class Goal(Base):
     __tablename__ = "goals"
+    __table_args__ = (Index("ix_goals_user_id", "user_id"),)
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
@@ -121,6 +166,7 @@ class Goal(Base):
 
 class Account(Base):
     __tablename__ = "accounts"
+    __table_args__ = (Index("ix_accounts_user_id", "user_id"),)
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
@@ -135,6 +181,61 @@ class Account(Base):
     # Relationships defined below
 
 
+class MonthlySummary(Base):
+    """Per-user monthly rollup of expenses or income.
+
+    One row per (user, kind, month, category, account); kind is "expense"
+    (category is category_name) or "income" (category is source). Derived
+    data: maintained by the write endpoints via summaries.py and rebuilt with
+    script/rebuild_monthly_summaries.py. Keep in sync with alembic revision
+    c71e4b9a2d05.
+
+    Nothing here is unique (NULL months, categories and accounts would slip
+    past a unique constraint anyway); writers instead serialize per user, see
+    ``summaries.lock_statements``.
+    """
+
+    __tablename__ = "monthly_summaries"
+    __table_args__ = (
+        Index("ix_monthly_summaries_user_id_kind_month", "user_id", "kind", "month"),
+    )
+    id = Column(Integer, primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    kind = Column(String(10), nullable=False)
+    month = Column(String(7), nullable=True)  # YYYY-MM; NULL for undated rows
+    category = Column(String, nullable=True)
+    account_id = Column(Integer, nullable=True)  # No FK: accounts come and go
+    total = Column(Numeric, nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    max_amount = Column(Numeric, nullable=True)
+
+
+class EmailOutbox(Base):
+    """Transactional email waiting to be sent (or already sent / given up).
+
+    Rows are added in the same transaction as the change that triggers the
+    mail (signup, password reset) and delivered in the background by
+    mailer.OutboxWorker. Keep in sync with alembic revision e4d2a7c91f36.
+    """
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+    id = Column(Integer, primary_key=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)  # HTML
+    status = Column(String(10), nullable=False, default="pending")  # sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
@@ -0,0 +1,211 @@
+# seta-api/app/passwords.py
+"""Password hashing with a salted, tunable KDF.
+
+Stored hashes describe how they were made, so the cost can be raised later
+without invalidating existing passwords:
+
+    scrypt$<n>$<r>$<p>$<salt b64>$<hash b64>
+    pbkdf2_sha256$<iterations>$<salt b64>$<hash b64>
+
+Bare 64-character hex digests are the original unsalted SHA-256 hashes.
+They still verify, and ``needs_rehash`` reports them (and any hash made with
+other parameters than the current hasher) so login can upgrade them.
+
+The KDFs are deliberately slow and CPU/memory bound: call these functions
+from a worker thread (hashlib releases the GIL), never on the event loop.
+"""
+
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data.encode("ascii"))
+
+
+class ScryptHasher:
+    """hashlib.scrypt; memory use is about 128 * n * r bytes per hash."""
+
+    algorithm = "scrypt"
+
+    def __init__(self, n: int = 2**15, r: int = 8, p: int = 1):
+        self.n, self.r, self.p = n, r, p
+
+    def _derive(self, password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode("utf-8"),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r * p,
+            dklen=HASH_BYTES,
+        )
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(SALT_BYTES)
+        derived = self._derive(password, salt, self.n, self.r, self.p)
+        return (
+            f"{self.algorithm}${self.n}${self.r}${self.p}"
+            f"${_b64encode(salt)}${_b64encode(derived)}"
+        )
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, n, r, p, salt, expected = encoded.split("$")
+        derived = self._derive(password, _b64decode(salt), int(n), int(r), int(p))
+        return hmac.compare_digest(derived, _b64decode(expected))
+
+    def needs_update(self, encoded: str) -> bool:
+        _, n, r, p, _salt, _hash = encoded.split("$")
+        return (int(n), int(r), int(p)) != (self.n, self.r, self.p)
+
+
+class PBKDF2Hasher:
+    """hashlib.pbkdf2_hmac with SHA-256, for platforms without scrypt."""
+
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations: int = 600_000):
+        self.iterations = iterations
+
+    def _derive(self, password: str, salt: bytes, iterations: int) -> bytes:
+        return hashlib.pbkdf2_hmac(
+            "sha256", password.encode("utf-8"), salt, iterations, dklen=HASH_BYTES
+        )
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(SALT_BYTES)
+        derived = self._derive(password, salt, self.iterations)
+        return (
+            f"{self.algorithm}${self.iterations}"
+            f"${_b64encode(salt)}${_b64encode(derived)}"
+        )
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, iterations, salt, expected = encoded.split("$")
+        derived = self._derive(password, _b64decode(salt), int(iterations))
+        return hmac.compare_digest(derived, _b64decode(expected))
+
+    def needs_update(self, encoded: str) -> bool:
+        return int(encoded.split("$")[1]) != self.iterations
+
+
+class LegacySHA256Hasher:
+    """Unsalted single-pass SHA-256 hex digests; verify only."""
+
+    algorithm = "sha256"
+
+    def hash(self, password: str) -> str:
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password: str, encoded: str) -> bool:
+        return hmac.compare_digest(self.hash(password), encoded)
+
+    def needs_update(self, encoded: str) -> bool:
+        return True
+
+
+class VerificationCache:
+    """Remembers recent successful verifications for a short time.
+
+    Entries are keyed by an HMAC (with a per-process random key) of the
+    stored hash and the password, so neither is kept in memory in clear,
+    and a changed password hash can never match an old entry. Failed
+    verifications are never cached.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._key = secrets.token_bytes(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry_key(self, password: str, encoded: str) -> bytes:
+        message = encoded.encode("utf-8") + b"\0" + password.encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def contains(self, password: str, encoded: str) -> bool:
+        key = self._entry_key(password, encoded)
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False
+            return True
+
+    def add(self, password: str, encoded: str) -> None:
+        key = self._entry_key(password, encoded)
+        with self._lock:
+            self._entries[key] = time.monotonic() + self.ttl_seconds
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+HASHERS = {
+    hasher.algorithm: hasher
+    for hasher in (ScryptHasher(), PBKDF2Hasher(), LegacySHA256Hasher())
+}
+
+# Used for every new hash; ~0.1 s and 32 MB per hash on a typical desktop CPU.
+default_hasher = (
+    HASHERS["scrypt"] if hasattr(hashlib, "scrypt") else HASHERS["pbkdf2_sha256"]
+)
+verification_cache = VerificationCache()
+
+
+def identify_hasher(encoded: str):
+    algorithm = encoded.split("$", 1)[0] if "$" in encoded else "sha256"
+    hasher = HASHERS.get(algorithm)
+    if hasher is None:
+        raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+    return hasher
+
+
+def hash_password(password: str, hasher=None) -> str:
+    """Hash a password for storing."""
+    return (hasher or default_hasher).hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: Optional[str]) -> bool:
+    """Verify a stored password against a provided password."""
+    if not hashed_password:
+        return False
+    if verification_cache.contains(plain_password, hashed_password):
+        return True
+    try:
+        valid = identify_hasher(hashed_password).verify(plain_password, hashed_password)
+    except (ValueError, TypeError):  # malformed or unknown stored hash
+        return False
+    if valid:
+        verification_cache.add(plain_password, hashed_password)
+    return valid
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True if the hash is legacy or not made with ``default_hasher``'s settings."""
+    try:
+        hasher = identify_hasher(hashed_password)
+    except ValueError:
+        return True
+    return hasher is not default_hasher or hasher.needs_update(hashed_password)
@@ -0,0 +1,314 @@
+# seta-api/app/pdf_reports.py
+"""PDF rendering for the report endpoints.
+
+A reportlab ``Table`` holding every row of a report is laid out in one
+piece, and each page break splits it by re-measuring all the rows that are
+left, so a 20,000-row table costs hundreds of full passes. ``ChunkedTable``
+knows its row heights up front: it splits by arithmetic and only ever builds
+a page-sized ``Table``, with the header repeated on each page as before.
+
+Table styles are built once per layout and shared by every table. Large
+reports with several sections are rendered in a process pool, one section
+per worker (each starting on a new page), and merged with PyPDF2; background
+job workers render them in-thread instead of nesting a pool.
+"""
+
+import asyncio
+import io
+import multiprocessing
+import os
+import sys
+from bisect import bisect_right
+from itertools import accumulate
+
+from fastapi.concurrency import run_in_threadpool
+from PyPDF2 import PdfReader, PdfWriter
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import (
+    Flowable,
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
+
+# Sections render in parallel once the sections other than the largest hold
+# this many rows: below that the pool can't beat rendering in one go
+PARALLEL_MIN_ROWS = 2000
+MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+PAGE_MARGIN = 0.5 * inch
+CELL_PADDING = 6  # reportlab's default left/right cell padding
+
+# name -> (table style, font size, column widths "auto" or "equal", alignment)
+LAYOUTS = {
+    # Licensed custom report: centred cells, columns sized to their content
+    "custom": (
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+                ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+                ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ]
+        ),
+        8,
+        "auto",
+        "CENTER",
+    ),
+    # General (unlicensed) and expense reports: left-aligned, equal columns
+    # spread over the page width
+    "general": (
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+                ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+                ("FONTSIZE", (0, 0), (-1, -1), 7),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ]
+        ),
+        7,
+        "equal",
+        "LEFT",
+    ),
+}
+
+_executor = None
+
+
+class ChunkedTable(Flowable):
+    """A long table that is split into page-sized ``Table``s as it flows.
+
+    ``heights`` are the data rows' heights; rows ``start:`` of ``rows`` are
+    the part of the table this instance still has to place.
+    """
+
+    def __init__(
+        self, header, rows, col_widths, style, heights, header_height, start=0
+    ):
+        super().__init__()
+        self.header = header
+        self.rows = rows
+        self.col_widths = col_widths
+        self.style = style
+        self.heights = heights
+        self.header_height = header_height
+        self.start = start
+        self._offsets = None
+
+    @property
+    def offsets(self):
+        # offsets[i]: height of rows[:i]; shared with the split-off remainders
+        if self._offsets is None:
+            self._offsets = [0, *accumulate(self.heights)]
+        return self._offsets
+
+    def wrap(self, availWidth, availHeight):
+        self.width = sum(self.col_widths)
+        body = self.offsets[-1] - self.offsets[self.start]
+        self.height = self.header_height + body
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        limit = self.offsets[self.start] + availHeight - self.header_height
+        end = bisect_right(self.offsets, limit) - 1
+        if end <= self.start:
+            return []  # Not even one row fits: move on to the next frame
+        rest = ChunkedTable(
+            self.header,
+            self.rows,
+            self.col_widths,
+            self.style,
+            self.heights,
+            self.header_height,
+            end,
+        )
+        rest._offsets = self.offsets
+        rest.hAlign = self.hAlign
+        return [self._table(self.start, end), rest]
+
+    def draw(self):
+        table = self._table(self.start, len(self.rows))
+        table.wrapOn(self.canv, self.width, self.height)
+        table.drawOn(self.canv, 0, 0)
+
+    def _table(self, start, end):
+        return Table(
+            [self.header, *self.rows[start:end]],
+            colWidths=self.col_widths,
+            rowHeights=[self.header_height, *self.heights[start:end]],
+            style=self.style,
+            repeatRows=1,
+            hAlign=self.hAlign,
+        )
+
+
+def _row_height_probe(style, col_count):
+    """Returns ``height(lines)`` for data rows and the header row's height."""
+    cache = {}
+    probe_header = None
+
+    def height(lines):
+        nonlocal probe_header
+        if lines not in cache:
+            table = Table(
+                [["H"] * col_count, ["\n".join(["x"] * lines)] * col_count],
+                style=style,
+            )
+            table.wrap(0, 0)
+            probe_header, cache[lines] = table._rowHeights
+        return cache[lines]
+
+    height(1)
+    return height, probe_header
+
+
+def _column_widths(header, rows, font_size, mode, page_width):
+    if mode == "equal" or not header:
+        return [page_width / max(len(header), 1)] * len(header)
+    widths = [stringWidth(str(name), "Helvetica-Bold", font_size) for name in header]
+    for row in rows:
+        for index, value in enumerate(row):
+            for line in value.split("\n"):
+                width = stringWidth(line, "Helvetica", font_size)
+                if width > widths[index]:
+                    widths[index] = width
+    return [width + 2 * CELL_PADDING for width in widths]
+
+
+def section_flowables(layout: str, heading: str, header, rows, page_width):
+    """Heading, table and spacing of one report section (rows of strings)."""
+    style, font_size, width_mode, h_align = LAYOUTS[layout]
+    styles = getSampleStyleSheet()
+    height, header_height = _row_height_probe(style, len(header))
+    table = ChunkedTable(
+        list(header),
+        rows,
+        _column_widths(header, rows, font_size, width_mode, page_width),
+        style,
+        [height(max(value.count("\n") for value in row) + 1) for row in rows],
+        header_height,
+    )
+    table.hAlign = h_align
+    return [
+        Paragraph(heading, styles["h2"]),
+        Spacer(1, 0.1 * inch),
+        table,
+        Spacer(1, 0.2 * inch),
+    ]
+
+
+def render_report(layout: str, title_lines, sections) -> bytes:
+    """Renders a report to PDF bytes.
+
+    ``title_lines`` are ``(text, sample style name)`` paragraphs opening the
+    report; ``sections`` are ``(heading, header, rows)`` with every cell
+    already formatted as a string.
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        leftMargin=PAGE_MARGIN,
+        rightMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=PAGE_MARGIN,
+    )
+    styles = getSampleStyleSheet()
+    story = [Paragraph(text, styles[style]) for text, style in title_lines]
+    if story:
+        story.append(Spacer(1, 0.2 * inch))
+    for heading, header, rows in sections:
+        story.extend(section_flowables(layout, heading, header, rows, doc.width))
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def merge_pdfs(documents) -> bytes:
+    """Concatenates PDF documents (bytes) into one."""
+    writer = PdfWriter()
+    for document in documents:
+        for page in PdfReader(io.BytesIO(document)).pages:
+            writer.add_page(page)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # spawn, not fork: workers don't inherit the API's connections or
+        # event loop. They still re-run the parent's __main__ on start-up:
+        # from source (python main.py) that is all of main.py's set-up, once
+        # per worker; the frozen build skips it (freeze_support at the top).
+        _executor = ProcessPoolExecutor(
+            max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def in_job_worker() -> bool:
+    """Whether this is a background job worker process (see jobs.py).
+
+    Those are already one of a pool sized to the machine, so they don't start
+    a pool of their own. Looked up rather than imported, so PDF workers
+    don't load jobs (and config_manager) just to find out they aren't one.
+    """
+    jobs = sys.modules.get("jobs")
+    return jobs is not None and jobs.IN_WORKER
+
+
+async def build_report(layout: str, title_lines, sections) -> bytes:
+    """Renders a report off the event loop; see ``render_report``.
+
+    Sections of large reports are rendered concurrently in worker processes
+    and merged (see PARALLEL_MIN_ROWS), otherwise, or inside a background job
+    worker, the whole report is rendered in one worker thread.
+    """
+    sections = list(sections)
+    sizes = [len(section[2]) for section in sections]
+    if (
+        len(sections) < 2
+        or sum(sizes) - max(sizes) < PARALLEL_MIN_ROWS
+        or MAX_WORKERS < 2
+        or in_job_worker()
+    ):
+        return await run_in_threadpool(render_report, layout, title_lines, sections)
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    documents = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                executor,
+                render_report,
+                layout,
+                title_lines if index == 0 else [],
+                [section],
+            )
+            for index, section in enumerate(sections)
+        )
+    )
+    return await run_in_threadpool(merge_pdfs, documents)
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,121 @@
+# seta-api/app/recurrence.py
+"""Occurrences and periods of recurring rules (recurring expenses, budgets).
+
+The n-th occurrence of a rule is computed directly from its start date:
+``start + n * step`` days for daily and weekly rules, and ``start + n * step``
+months for monthly, quarterly and yearly ones, with the day clamped to the
+end of shorter months. A rule starting on Jan 31 therefore falls on Feb 28
+(or 29), Mar 31, Apr 30... and never drifts to the 28th. The first
+occurrence inside a window is found by arithmetic too, so expanding a window
+costs O(occurrences in the window) however old the rule is.
+"""
+
+import calendar
+from datetime import date, timedelta
+from typing import Iterator, Optional, Tuple
+
+from models import FrequencyEnum
+
+STEP_DAYS = {FrequencyEnum.daily: 1, FrequencyEnum.weekly: 7}
+STEP_MONTHS = {
+    FrequencyEnum.monthly: 1,
+    FrequencyEnum.quarterly: 3,
+    FrequencyEnum.yearly: 12,
+}
+
+
+def add_months(value: date, months: int) -> date:
+    """``value`` moved by ``months`` months, clamped to the month's last day."""
+    month_index = value.year * 12 + value.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+    return date(year, month, min(value.day, calendar.monthrange(year, month)[1]))
+
+
+def nth_occurrence(frequency: FrequencyEnum, start_date: date, n: int) -> date:
+    """Date of occurrence ``n`` (0 is ``start_date``) of a rule."""
+    if frequency in STEP_DAYS:
+        return start_date + timedelta(days=n * STEP_DAYS[frequency])
+    if frequency in STEP_MONTHS:
+        return add_months(start_date, n * STEP_MONTHS[frequency])
+    if n == 0:  # one_time
+        return start_date
+    raise ValueError(f"A {frequency.value} rule only occurs once")
+
+
+def first_index_on_or_after(
+    frequency: FrequencyEnum, start_date: date, day: date
+) -> Optional[int]:
+    """Index of the first occurrence on or after ``day``; None if there is none."""
+    if day <= start_date:
+        return 0
+    if frequency in STEP_DAYS:
+        return -(-(day - start_date).days // STEP_DAYS[frequency])
+    if frequency in STEP_MONTHS:
+        step = STEP_MONTHS[frequency]
+        months = (day.year - start_date.year) * 12 + day.month - start_date.month
+        n = months // step
+        # Clamping can only pull an occurrence earlier, so one step is enough
+        if nth_occurrence(frequency, start_date, n) < day:
+            n += 1
+        return n
+    return None  # one_time, and day is after its only occurrence
+
+
+def occurrences(
+    frequency: FrequencyEnum,
+    start_date: date,
+    end_date: Optional[date],
+    window_start: date,
+    window_end: date,
+) -> Iterator[date]:
+    """Occurrence dates of a rule within ``[window_start, window_end]``.
+
+    ``end_date`` is the rule's own (inclusive) end, None for open-ended rules.
+    """
+    last = window_end if end_date is None else min(window_end, end_date)
+    if frequency not in STEP_DAYS and frequency not in STEP_MONTHS:  # one_time
+        if window_start <= start_date <= last:
+            yield start_date
+        return
+    n = first_index_on_or_after(frequency, start_date, window_start)
+    while True:
+        day = nth_occurrence(frequency, start_date, n)
+        if day > last:
+            return
+        yield day
+        n += 1
+
+
+def next_occurrence(
+    frequency: FrequencyEnum,
+    start_date: date,
+    end_date: Optional[date],
+    day: date,
+) -> Optional[date]:
+    """The rule's first occurrence on or after ``day``, if it has one."""
+    return next(occurrences(frequency, start_date, end_date, day, date.max), None)
+
+
+def period_containing(
+    frequency: FrequencyEnum,
+    start_date: date,
+    end_date: Optional[date],
+    day: date,
+) -> Optional[Tuple[date, Optional[date]]]:
+    """(first, last) day of the rule's period that contains ``day``.
+
+    Periods run from one occurrence to the day before the next, and the last
+    one stops at ``end_date``. A one_time rule has a single period from
+    ``start_date`` to ``end_date`` (None: open). Returns None when ``day`` is
+    outside the rule's lifetime.
+    """
+    if day < start_date or (end_date is not None and day > end_date):
+        return None
+    if frequency not in STEP_DAYS and frequency not in STEP_MONTHS:  # one_time
+        return start_date, end_date
+    n = first_index_on_or_after(frequency, start_date, day + timedelta(days=1)) - 1
+    last = nth_occurrence(frequency, start_date, n + 1) - timedelta(days=1)
+    if end_date is not None:
+        last = min(last, end_date)
+    return nth_occurrence(frequency, start_date, n), last
@@ -0,0 +1,174 @@
+# seta-api/app/report_cache.py
+"""Per-user response cache for the read-heavy report endpoints.
+
+Every user has a data version that changes whenever any of their rows is
+committed. Cached bodies and ETags are keyed by that version, so nothing is
+ever invalidated by hand: a write makes the old entries unreachable, and a
+client sending the current ETag in ``If-None-Match`` gets a 304 without the
+database being touched.
+
+The only exception is switching to another database, which drops
+everything with ``invalidate_all``.
+
+Versions change automatically for ORM writes. Objects flushed in a session
+are recorded by their ``user_id`` and bumped once the session commits.
+Core statements (bulk inserts and deletes) carry no objects, so their
+callers must call ``touch(session, user_id)`` before committing.
+
+The default backend is in-process. Swap it with ``set_backend`` to share
+versions and bodies between several API processes.
+"""
+
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import models
+
+_PENDING_KEY = "report_cache_users"
+
+
+class LRUCacheBackend:
+    """Thread-safe in-process LRU bounded by entry count and total bytes.
+
+    Versions start from a random per-process epoch, so ETags handed out by
+    an earlier run of the app never match after a restart.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._epoch = secrets.token_hex(4)
+        self._versions = {}
+        self._entries = OrderedDict()  # (user_id, name) -> (version, body)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_version(self, user_id: int) -> str:
+        with self._lock:
+            return f"{self._epoch}.{self._versions.get(user_id, 0)}"
+
+    def bump_version(self, user_id: int) -> None:
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            for key in [key for key in self._entries if key[0] == user_id]:
+                self._size -= len(self._entries.pop(key)[1])
+
+    def get(self, user_id: int, name: str, version: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get((user_id, name))
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end((user_id, name))
+            return entry[1]
+
+    def set(self, user_id: int, name: str, version: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if f"{self._epoch}.{self._versions.get(user_id, 0)}" != version:
+                return  # Built from data that has changed since
+            old = self._entries.pop((user_id, name), None)
+            if old is not None:
+                self._size -= len(old[1])
+            self._entries[(user_id, name)] = (version, body)
+            self._size += len(body)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._size > self.max_bytes
+            ):
+                self._size -= len(self._entries.popitem(last=False)[1][1])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def reset(self) -> None:
+        """Drops every entry and version; no earlier ETag matches again."""
+        with self._lock:
+            self._epoch = secrets.token_hex(4)
+            self._versions.clear()
+            self._entries.clear()
+            self._size = 0
+
+
+backend = LRUCacheBackend()
+
+
+def set_backend(new_backend) -> None:
+    """Replaces the backend (anything with the LRUCacheBackend methods)."""
+    global backend
+    backend = new_backend
+
+
+def invalidate_all() -> None:
+    """Forgets everything cached, e.g. after switching to another database."""
+    backend.reset()
+
+
+def data_version(user_id: int) -> str:
+    return backend.get_version(user_id)
+
+
+def bump(user_id: int) -> None:
+    """Marks all of a user's cached responses stale."""
+    backend.bump_version(user_id)
+
+
+def get(user_id: int, name: str, version: str) -> Optional[bytes]:
+    return backend.get(user_id, name, version)
+
+
+def put(user_id: int, name: str, version: str, body: bytes) -> None:
+    backend.set(user_id, name, version, body)
+
+
+def etag(user_id: int, name: str, version: str) -> str:
+    # Weak: bodies carry a generated_at timestamp, the data is what matches
+    return f'W/"{name}-{user_id}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], current: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``current``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = current.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def touch(session, user_id: Optional[int]) -> None:
+    """Bumps ``user_id``'s version when ``session`` (sync or async) commits."""
+    if user_id is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+
+def _owner_of(obj) -> Optional[int]:
+    if isinstance(obj, models.User):
+        return obj.id
+    return getattr(obj, "user_id", None)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_owners(session, _flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        touch(session, _owner_of(obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_owners(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        bump(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_owners(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,176 @@
+# seta-api/app/summaries.py
+"""Incrementally maintained monthly summaries of expenses and income.
+
+``monthly_summaries`` holds one row per (user, kind, month, category,
+account) with the sum, count and largest amount of the matching
+transactions, so totals and trend widgets read a few hundred rows instead of
+scanning every transaction a user has ever entered.
+
+Rows are never patched with deltas. Every write path instead recomputes the
+months it touched with a DELETE plus an INSERT ... SELECT ... GROUP BY in the
+same transaction as the write, so the summaries can't drift from the source
+tables and a rebuild is the same statements without the month filter.
+
+On PostgreSQL two writers recomputing the same user's months at READ
+COMMITTED would each miss the other's freshly inserted rows in their DELETE
+and both rollups would stay, so the statements start by taking a per-user
+advisory lock (the whole table for an all-users rebuild). SQLite allows one
+writer at a time anyway.
+"""
+
+from datetime import date
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    and_,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    text,
+)
+
+import models
+
+# kind -> (source model, column stored as the summary's category)
+KIND_SOURCES = {
+    "expense": (models.Expense, models.Expense.category_name),
+    "income": (models.Income, models.Income.source),
+}
+MODEL_KINDS = {models.Expense: "expense", models.Income: "income"}
+# First key of the (class, user_id) advisory locks taken on PostgreSQL
+SUMMARY_LOCK_CLASS = 0x5E7A
+
+
+def month_of(value: Optional[date]) -> Optional[str]:
+    """The summary month label (YYYY-MM) of a transaction date."""
+    return value.strftime("%Y-%m") if value else None
+
+
+def month_bucket(column, dialect_name: str):
+    """SQL month label of a date column; matches ``month_of``.
+
+    The format is inlined rather than bound so the expression is identical in
+    the SELECT list and the GROUP BY on servers that bind parameters.
+    """
+    if dialect_name == "postgresql":
+        return func.to_char(column, literal_column("'YYYY-MM'"))
+    return func.strftime(literal_column("'%Y-%m'"), column)
+
+
+def _date_in_months(column, months):
+    conditions = []
+    for month in months:
+        if month is None:
+            conditions.append(column.is_(None))
+            continue
+        year, month_number = (int(part) for part in month.split("-"))
+        start = date(year, month_number, 1)
+        end = date(year + month_number // 12, month_number % 12 + 1, 1)
+        conditions.append(and_(column >= start, column < end))
+    return or_(*conditions)
+
+
+def _month_in(column, months):
+    labels = [month for month in months if month is not None]
+    conditions = [column.in_(labels)] if labels else []
+    if None in months:
+        conditions.append(column.is_(None))
+    return or_(*conditions)
+
+
+def lock_statements(dialect_name: str, user_id: Optional[int] = None) -> list:
+    """Statements serializing summary writers for ``user_id`` (None: all users).
+
+    The locks are held until the transaction ends. Empty except on PostgreSQL.
+    """
+    if dialect_name != "postgresql":
+        return []
+    if user_id is None:
+        table = models.MonthlySummary.__tablename__
+        # Conflicts with the ROW EXCLUSIVE lock every per-user DELETE takes
+        return [text(f"LOCK TABLE {table} IN EXCLUSIVE MODE")]
+    return [select(func.pg_advisory_xact_lock(SUMMARY_LOCK_CLASS, user_id))]
+
+
+def refresh_statements(
+    dialect_name: str,
+    kind: str,
+    user_id: Optional[int] = None,
+    months: Optional[Iterable[Optional[str]]] = None,
+) -> list:
+    """Lock, DELETE and INSERT ... SELECT statements recomputing summary rows.
+
+    Limited to ``user_id`` and ``months`` (YYYY-MM labels, None for undated
+    rows) when given; ``None`` means all users / all months.
+    """
+    model, category = KIND_SOURCES[kind]
+    table = models.MonthlySummary.__table__
+    target = [table.c.kind == kind]
+    source = []
+    if user_id is not None:
+        target.append(table.c.user_id == user_id)
+        source.append(model.user_id == user_id)
+    if months is not None:
+        months = set(months)
+        if not months:
+            return []
+        target.append(_month_in(table.c.month, months))
+        source.append(_date_in_months(model.date, months))
+
+    month = month_bucket(model.date, dialect_name)
+    rollup = (
+        select(
+            model.user_id,
+            literal(kind),
+            month,
+            category,
+            model.account_id,
+            func.sum(model.amount),
+            func.count(model.id),
+            func.max(model.amount),
+        )
+        .where(*source)
+        .group_by(model.user_id, month, category, model.account_id)
+    )
+    return [
+        *lock_statements(dialect_name, user_id),
+        delete(table).where(*target),
+        insert(table).from_select(
+            [
+                table.c.user_id,
+                table.c.kind,
+                table.c.month,
+                table.c.category,
+                table.c.account_id,
+                table.c.total,
+                table.c.transaction_count,
+                table.c.max_amount,
+            ],
+            rollup,
+        ),
+    ]
+
+
+async def refresh_monthly_summaries(db, model, user_id: int, months=None) -> None:
+    """Recomputes a user's summaries for ``model`` (Expense or Income).
+
+    Call after the write is flushed and before the commit. ``months`` is an
+    iterable of YYYY-MM labels (see ``month_of``); omit it to recompute all
+    of the user's months.
+    """
+    statements = refresh_statements(
+        db.bind.dialect.name, MODEL_KINDS[model], user_id, months
+    )
+    for statement in statements:
+        await db.execute(statement)
+
+
+def rebuild_monthly_summaries(connection, user_id: Optional[int] = None) -> None:
+    """Rebuilds all summaries (or one user's) on a sync connection."""
+    for kind in KIND_SOURCES:
+        for statement in refresh_statements(connection.dialect.name, kind, user_id):
+            connection.execute(statement)
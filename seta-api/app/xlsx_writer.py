@@ -0,0 +1,269 @@
+# seta-api/app/xlsx_writer.py
+"""Streaming .xlsx writer for the Excel report outputs.
+
+Each worksheet's XML is deflated straight into the zip as rows arrive, so a
+report costs the same memory at 100 rows as at 100,000: nothing is kept per
+cell, unlike an openpyxl or pandas workbook. Cells are typed. Numbers stay
+numbers (two decimals for amounts), dates and datetimes become Excel
+serials with a date format, and text is written as inline strings, so no
+shared-strings table has to be held until the end.
+
+Only what the reports need is supported: one header row in bold, then
+values of the types listed in ``StreamingXlsxWriter.write_rows``.
+"""
+
+import re
+import zipfile
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from xml.sax.saxutils import escape
+
+EXCEL_EPOCH = datetime(1899, 12, 30)
+MAX_CELL_CHARS = 32767
+MAX_TITLE_CHARS = 31
+
+# cellXfs indexes in STYLES_XML
+STYLE_AMOUNT = 1
+STYLE_DATE = 2
+STYLE_DATETIME = 3
+STYLE_HEADER = 4
+
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_ILLEGAL_TITLE_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "{overrides}</Types>"
+)
+SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/'
+    '2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    "<sheets>{sheets}</sheets></workbook>"
+)
+WORKBOOK_SHEET = '<sheet name="{name}" sheetId="{index}" r:id="rId{index}"/>'
+WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    "{sheets}"
+    '<Relationship Id="rId{styles}" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    "</Relationships>"
+)
+WORKBOOK_SHEET_REL = (
+    '<Relationship Id="rId{index}" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{index}.xml"/>'
+)
+STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="2">'
+    '<numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>'
+    '<numFmt numFmtId="165" formatCode="yyyy-mm-dd hh:mm:ss"/>'
+    "</numFmts>"
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border>'
+    "</borders>"
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/>'
+    "</cellStyleXfs>"
+    '<cellXfs count="5">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    "</cellXfs>"
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+SHEET_TAIL = "</sheetData></worksheet>"
+
+
+def column_letter(index: int) -> str:
+    """Excel column name of a 0-based column index (0 -> A, 26 -> AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def sheet_title(title: str, taken=()) -> str:
+    """``title`` made valid as a unique worksheet name."""
+    base = _ILLEGAL_TITLE_CHARS.sub("_", title).strip("'")[:MAX_TITLE_CHARS] or "Sheet"
+    candidate, number = base, 1
+    while candidate.lower() in {name.lower() for name in taken}:
+        number += 1
+        suffix = f" ({number})"
+        candidate = base[: MAX_TITLE_CHARS - len(suffix)] + suffix
+    return candidate
+
+
+def _text(value: str) -> str:
+    text = escape(_ILLEGAL_XML_CHARS.sub("", value[:MAX_CELL_CHARS]))
+    if text != text.strip():
+        return f'<is><t xml:space="preserve">{text}</t></is>'
+    return f"<is><t>{text}</t></is>"
+
+
+def _cell(ref: str, value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, int):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    if isinstance(value, (Decimal, float)):
+        if value != value or value in (float("inf"), float("-inf")):
+            return f'<c r="{ref}" t="inlineStr">{_text(str(value))}</c>'
+        return f'<c r="{ref}" s="{STYLE_AMOUNT}"><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:  # Excel has no time zones: store UTC
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        serial = (value - EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c r="{ref}" s="{STYLE_DATETIME}"><v>{serial!r}</v></c>'
+    if isinstance(value, date):
+        serial = (value - EXCEL_EPOCH.date()).days
+        return f'<c r="{ref}" s="{STYLE_DATE}"><v>{serial}</v></c>'
+    return f'<c r="{ref}" t="inlineStr">{_text(str(value))}</c>'
+
+
+class StreamingXlsxWriter:
+    """Writes a workbook into ``fileobj`` (seekable, binary) sheet by sheet.
+
+    Call ``add_sheet`` and then ``write_rows`` any number of times per sheet;
+    sheets can't be revisited. ``close`` (or leaving the ``with`` block)
+    writes the workbook parts and finishes the zip.
+    """
+
+    def __init__(self, fileobj):
+        self._zip = zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED)
+        self._titles = []
+        self._sheet = None
+        self._columns = []
+        self._row = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_sheet()
+            self._zip.close()
+
+    def add_sheet(self, title: str, header) -> str:
+        """Starts a sheet with a bold ``header`` row; returns its final title."""
+        self._close_sheet()
+        title = sheet_title(title, self._titles)
+        self._titles.append(title)
+        self._sheet = self._zip.open(
+            f"xl/worksheets/sheet{len(self._titles)}.xml", "w", force_zip64=True
+        )
+        self._sheet.write(SHEET_HEAD.encode())
+        self._columns = []
+        self._row = 0
+        header = list(header)
+        self._extend_columns(len(header))
+        self._row = 1
+        cells = "".join(
+            f'<c r="{letter}1" s="{STYLE_HEADER}" t="inlineStr">{_text(str(name))}</c>'
+            for letter, name in zip(self._columns, header)
+        )
+        self._sheet.write(f'<row r="1">{cells}</row>'.encode())
+        return title
+
+    def write_rows(self, rows) -> None:
+        """Appends rows (sequences of None, str, int, float, Decimal, date,
+        datetime, bool or Enum; anything else is written as text)."""
+        parts = []
+        row_number = self._row
+        for row in rows:
+            row_number += 1
+            if len(row) > len(self._columns):
+                self._extend_columns(len(row))
+            cells = "".join(
+                _cell(f"{letter}{row_number}", value)
+                for letter, value in zip(self._columns, row)
+            )
+            parts.append(f'<row r="{row_number}">{cells}</row>')
+        self._row = row_number
+        self._sheet.write("".join(parts).encode())
+
+    def close(self) -> None:
+        if self._zip.fp is None:
+            return
+        self._close_sheet()
+        if not self._titles:
+            self.add_sheet("Sheet1", [])
+            self._close_sheet()
+        count = len(self._titles)
+        indexes = range(1, count + 1)
+        self._zip.writestr(
+            "[Content_Types].xml",
+            CONTENT_TYPES_XML.format(
+                overrides="".join(SHEET_CONTENT_TYPE.format(index=i) for i in indexes)
+            ),
+        )
+        self._zip.writestr("_rels/.rels", ROOT_RELS_XML)
+        self._zip.writestr(
+            "xl/workbook.xml",
+            WORKBOOK_XML.format(
+                sheets="".join(
+                    WORKBOOK_SHEET.format(name=escape(title, {'"': "&quot;"}), index=i)
+                    for i, title in zip(indexes, self._titles)
+                )
+            ),
+        )
+        self._zip.writestr(
+            "xl/_rels/workbook.xml.rels",
+            WORKBOOK_RELS_XML.format(
+                sheets="".join(WORKBOOK_SHEET_REL.format(index=i) for i in indexes),
+                styles=count + 1,
+            ),
+        )
+        self._zip.writestr("xl/styles.xml", STYLES_XML)
+        self._zip.close()
+
+    def _extend_columns(self, count: int) -> None:
+        self._columns.extend(
+            column_letter(index) for index in range(len(self._columns), count)
+        )
+
+    def _close_sheet(self) -> None:
+        if self._sheet is not None:
+            self._sheet.write(SHEET_TAIL.encode())
+            self._sheet.close()
+            self._sheet = None
@@ -6,7 +6,13 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('app', 'app'), ('alembic', 'alembic'), ('alembic.ini', '.')],
-    hiddenimports=[],
+    hiddenimports=[
+        'main',  # loaded by background job worker processes
+        'aiosqlite',
+        'asyncpg',
+        'sqlalchemy.dialects.sqlite.aiosqlite',
+        'sqlalchemy.dialects.postgresql.asyncpg',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
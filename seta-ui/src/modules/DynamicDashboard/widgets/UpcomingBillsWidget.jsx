@@ -3,7 +3,7 @@ import React, { useState, useEffect } from 'react';
 import { Box, Typography, CircularProgress, List, ListItem, ListItemText, Divider } from '@mui/material';
 import EventNoteIcon from '@mui/icons-material/EventNote';
 import axios from 'axios';
-import { format, parseISO, addDays, isWithinInterval, addMonths, addWeeks, addYears } from 'date-fns'; // Import date functions
+import { format, parseISO, addDays } from 'date-fns'; // Import date functions
 import T from '../../../utils/T';
 import { useTranslation } from 'react-i18next';
 import { useLocalizedDateFormat } from '../../../utils/useLocalizedDateFormat';
@@ -11,41 +11,6 @@ import { useLocalizedDateFormat } from '../../../utils/useLocalizedDateFormat';
 const API_URL = 'http://localhost:8000';
 const UPCOMING_DAYS = 14; // Show bills due in the next 14 days
 
-// Basic function to estimate next due date (Needs refinement for accuracy)
-const estimateNextDueDate = (recExp) => {
-    try {
-        const startDate = parseISO(recExp.start_date);
-        const today = new Date();
-        let nextDate = startDate;
-
-        if (nextDate > today) return nextDate; // If start date is in the future
-
-        // Crude calculation - assumes it started in the past and repeats regularly
-        // This doesn't handle end dates or complex frequencies perfectly
-        switch (recExp.frequency) {
-            case 'weekly':
-                while (nextDate <= today) nextDate = addWeeks(nextDate, 1);
-                break;
-            case 'monthly':
-                while (nextDate <= today) nextDate = addMonths(nextDate, 1);
-                break;
-            case 'quarterly':
-                 while (nextDate <= today) nextDate = addMonths(nextDate, 3);
-                 break;
-            case 'yearly':
-                while (nextDate <= today) nextDate = addYears(nextDate, 1);
-                break;
-            default: // daily or one_time - won't show as upcoming after start
-                 return null;
-        }
-        return nextDate;
-    } catch (e) {
-        console.error("Error calculating next due date:", e);
-        return null;
-    }
-};
-
-
 export function UpcomingBillsWidget({ userId }) {
     const { t } = useTranslation();
     const [upcomingBills, setUpcomingBills] = useState([]);
@@ -59,16 +24,16 @@ export function UpcomingBillsWidget({ userId }) {
             setIsLoading(true);
             setError(null);
             try {
-                const response = await axios.get(`${API_URL}/recurring/${userId}`);
+                // Due dates are expanded on the server, already sorted by date
                 const today = new Date();
-                const upcomingLimit = addDays(today, UPCOMING_DAYS);
-
-                const upcoming = response.data
-                    .map(rec => ({ ...rec, nextDueDate: estimateNextDueDate(rec) }))
-                    .filter(rec => rec.nextDueDate && isWithinInterval(rec.nextDueDate, { start: today, end: upcomingLimit }))
-                    .sort((a, b) => a.nextDueDate - b.nextDueDate); // Sort by next due date
+                const response = await axios.get(`${API_URL}/recurring/${userId}/occurrences`, {
+                    params: {
+                        from: format(today, 'yyyy-MM-dd'),
+                        to: format(addDays(today, UPCOMING_DAYS), 'yyyy-MM-dd'),
+                    },
+                });
 
-                setUpcomingBills(upcoming);
+                setUpcomingBills(response.data.map(bill => ({ ...bill, nextDueDate: parseISO(bill.due_date) })));
             } catch (err) {
                 console.error("Error fetching recurring expenses:", err);
                 setError(t('dynamicDashboard.fetchError')); // Add generic fetch error translation
@@ -102,7 +67,7 @@ export function UpcomingBillsWidget({ userId }) {
     return (
         <List dense sx={{ height: '100%', overflowY: 'auto', p: 0 }}>
             {upcomingBills.map((bill, index) => (
-                <React.Fragment key={bill.id}>
+                <React.Fragment key={`${bill.recurring_expense_id}-${bill.due_date}`}>
                     <ListItem sx={{ py: 1 }}>
                         <ListItemText
                             primary={
@@ -25,6 +25,63 @@ export const getUserExpenses = async (userId) => {
   }
 };
 
+// Fetches one keyset-paginated page. Pass the previous response's next_cursor
+// as params.cursor to get the following page; next_cursor is null on the last page.
+export const getUserExpensesPage = async (userId, params = {}) => {
+  try {
+    const response = await axios.get(`${API_URL}/expenses/${userId}/page`, {
+      params,
+      paramsSerializer: { indexes: null }, // category=a&category=b
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching expenses page:', error);
+    throw error;
+  }
+};
+
+// Due dates of the user's recurring expenses between from and to (YYYY-MM-DD,
+// inclusive), expanded on the server: [{ recurring_expense_id, due_date, name, ... }]
+export const getRecurringOccurrences = async (userId, from, to) => {
+  try {
+    const response = await axios.get(`${API_URL}/recurring/${userId}/occurrences`, {
+      params: { from, to },
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching recurring occurrences:', error);
+    throw error;
+  }
+};
+
+// Spend against each budget in its current period (or the one containing asOf,
+// YYYY-MM-DD), computed on the server: [{ budget_id, spent, remaining, ... }]
+export const getBudgetStatus = async (userId, asOf) => {
+  try {
+    const response = await axios.get(`${API_URL}/budgets/${userId}/status`, {
+      params: asOf ? { as_of: asOf } : {},
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching budget status:', error);
+    throw error;
+  }
+};
+
+// Projected daily balances per account for the next `months` months:
+// { start_date, accounts: [{ account_id, balances, ... }], total }
+export const getForecast = async (userId, months = 12) => {
+  try {
+    const response = await axios.get(`${API_URL}/forecast/${userId}`, {
+      params: { months },
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching forecast:', error);
+    throw error;
+  }
+};
+
 export const getTotalExpenses = async (userId) => {
   try {
     const response = await axios.get(`${API_URL}/expenses/${userId}/total`);